@@ -1,9 +1,19 @@
 import streamlit as st
 import os
-import json
-import random
+import time
 from dotenv import load_dotenv
 
+from snowbridge.cards import CardCache
+from snowbridge.changes import CHANGE_INSERT
+from snowbridge.dispatch import Dispatcher
+from snowbridge.llm import BREAKER_CLOSED
+from snowbridge.loadgen import storm_jobs
+from snowbridge.metrics import METRICS, serve as serve_metrics, write_periodically as write_metrics_periodically
+from snowbridge.service import MAX_NEARBY_RESULTS, SnowBridgeService
+from snowbridge.stats import STALE_CRITICAL_MINUTES
+from snowbridge.store import EVENT_CREATE, STATUS_CLAIMED, STATUS_OPEN, ClaimResult
+from snowbridge.triage import rescore_backlog
+
 # Load environment variables
 load_dotenv()
 
@@ -14,175 +24,91 @@ st.set_page_config(
     layout="wide"
 )
 
-# 2. AI Triage Function
-def triage_request(request_text, title="", location=""):
+# Rerun timing; with the admin profiling toggle on, every span of this rerun is kept too
+rerun_started = time.perf_counter()
+profiling = st.session_state.get("profile_reruns", False)
+if profiling:
+    METRICS.start_profile()
+
+@st.cache_resource
+def start_metrics_exporters():
+    """Prometheus metrics on SNOWBRIDGE_METRICS_PORT (/metrics) and/or in SNOWBRIDGE_METRICS_FILE, if set."""
+    port = os.getenv("SNOWBRIDGE_METRICS_PORT")
+    path = os.getenv("SNOWBRIDGE_METRICS_FILE")
+    server = serve_metrics(int(port)) if port else None
+    writer = write_metrics_periodically(path) if path else None
+    return server, writer
+
+start_metrics_exporters()
+
+# 2. Shared Services (one job store, its indexes and the AI triage worker for every session)
+# Triage, seeding, submit, feed and claim logic live in snowbridge/service.py, which the JSON API shares
+@st.cache_resource
+def get_service():
     """
-    Analyzes natural language request and returns structured JSON with urgency score.
-    Uses OpenAI API if available, otherwise falls back to keyword-based logic.
+    Opens the process-wide job store once (seeding it on first run) with its
+    indexes, and AI triage when OPENAI_API_KEY is set. Calls time out after
+    LLM_BUDGET_SECONDS (retries included). The search, duplicate and stats
+    indexes finish building in the background.
     """
-    try:
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if api_key:
-            client = OpenAI(api_key=api_key)
-            
-            system_prompt = """You are an Emergency Dispatcher for a snow removal crisis response platform.
-Analyze the user's request and determine urgency. Look for keywords like: dialysis, chemo, oxygen, medicine, 
-stuck, emergency exit, doctor appointment, medical, mobility issues, wheelchair, etc.
-
-Return ONLY valid JSON in this exact format:
-{
-  "urgency_score": [Integer 1-10],  // 10 = Medical Emergency, 1 = Low priority
-  "category": [String: "Medical", "Mobility", "Access", "General"],
-  "summary": [String: Max 5 words],
-  "is_critical": [Boolean]
-}"""
-
-            user_prompt = f"Title: {title}\nLocation: {location}\nRequest: {request_text}\n\nAnalyze urgency and return JSON only."
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=150
-            )
-            
-            result_text = response.choices[0].message.content.strip()
-            # Extract JSON from response (handle markdown code blocks)
-            if "```" in result_text:
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-            
-            analysis = json.loads(result_text)
-            return analysis
-            
-    except Exception as e:
-        st.warning(f"⚠️ OpenAI API error: {str(e)}. Using fallback logic.")
-    
-    # Fallback: Keyword-based urgency scoring
-    request_lower = (title + " " + request_text).lower()
-    
-    # Critical keywords (score 8-10)
-    critical_keywords = ["dialysis", "chemo", "oxygen", "emergency", "stuck", "trapped", 
-                        "can't breathe", "heart", "stroke", "ambulance", "911"]
-    # High priority keywords (score 6-8)
-    high_keywords = ["medicine", "meds", "doctor", "appointment", "medical", "wheelchair",
-                    "disabled", "elderly", "can't walk", "mobility"]
-    # Medium keywords (score 4-6)
-    medium_keywords = ["mailbox", "door", "driveway", "access", "need to leave"]
-    
-    urgency_score = 3  # Default low
-    category = "General"
-    is_critical = False
-    
-    if any(kw in request_lower for kw in critical_keywords):
-        urgency_score = random.randint(9, 10)
-        category = "Medical"
-        is_critical = True
-    elif any(kw in request_lower for kw in high_keywords):
-        urgency_score = random.randint(6, 8)
-        category = "Medical" if any(kw in request_lower for kw in ["medical", "doctor", "medicine"]) else "Mobility"
-    elif any(kw in request_lower for kw in medium_keywords):
-        urgency_score = random.randint(4, 6)
-        category = "Access"
-    
-    summary_words = title.split()[:5] if title else request_text.split()[:5]
-    summary = " ".join(summary_words)
-    
-    return {
-        "urgency_score": urgency_score,
-        "category": category,
-        "summary": summary,
-        "is_critical": is_critical
-    }
+    service = SnowBridgeService.from_env()
+    service.warm_up(freeze=True)
+    return service
+
+service = get_service()
+job_store = service.store
+# Pick up jobs written by other processes (e.g. bulk ingestion, API workers)
+service.sync()
+triage_worker = service.triage_worker
+
+@st.cache_resource
+def get_card_cache():
+    """Rendered feed cards shared by every session, keyed on job id + version."""
+    return CardCache()
+
+card_cache = get_card_cache()
+
+# Seconds between live feed refreshes
+FEED_REFRESH_SECONDS = 5
+# Requests loaded by the "Load Storm Test Data" admin button
+STORM_TEST_JOBS = 1000
+# Status filter choices for volunteer search (None: any status)
+SEARCH_STATUSES = {"Open": STATUS_OPEN, "Claimed": STATUS_CLAIMED, "All": None}
+
+# Starting roster for the dispatcher view; equipment is comma-separated
+DEFAULT_ROSTER = [
+    {"name": "Sam", "location": "Cambridge MA", "capacity": 3, "equipment": "shovel, salt"},
+    {"name": "Priya", "location": "Somerville MA", "capacity": 2, "equipment": "snowblower"},
+    {"name": "Alex", "location": "Boston MA", "capacity": 4, "equipment": "shovel, roof rake"},
+]
+
+def confirmed_button(label, key, warning, **kwargs):
+    """
+    Two-step button for admin actions that delete requests: the first click
+    only asks, and True comes back once "Yes" is clicked.
+    """
+    if st.session_state.get("confirming") != key:
+        if st.button(label, key=key, **kwargs):
+            st.session_state.confirming = key
+            st.rerun()
+        return False
+    st.warning(warning)
+    col1, col2 = st.columns(2)
+    if col1.button("Yes", key=f"{key}_yes", type="primary", use_container_width=True):
+        st.session_state.confirming = None
+        return True
+    if col2.button("Cancel", key=f"{key}_cancel", use_container_width=True):
+        st.session_state.confirming = None
+        st.rerun()
+    return False
 
-# 3. Seeder Function
-def seed_demo_jobs():
-    """Creates 5 diverse demo jobs for testing."""
-    return [
-        {
-            "id": 1,
-            "title": "Dialysis Patient - Emergency Access",
-            "location": "123 Maple St, Boston MA",
-            "request_text": "Dialysis patient here. Driveway blocked by 3 feet of snow. Emergency exit inaccessible. Need to get to treatment center by 2 PM today.",
-            "ai_analysis": {
-                "urgency_score": 10,
-                "category": "Medical",
-                "summary": "Dialysis Patient Emergency",
-                "is_critical": True
-            },
-            "status": "OPEN"
-        },
-        {
-            "id": 2,
-            "title": "Medicine in Mailbox",
-            "location": "456 Oak Ave, Cambridge MA",
-            "request_text": "I can't get to my mailbox. My meds are in there and I need them today. I'm 78 and use a walker.",
-            "ai_analysis": {
-                "urgency_score": 7,
-                "category": "Access",
-                "summary": "Meds in Mailbox",
-                "is_critical": False
-            },
-            "status": "OPEN"
-        },
-        {
-            "id": 3,
-            "title": "Wheelchair Access Blocked",
-            "location": "789 Pine Rd, Somerville MA",
-            "request_text": "My wheelchair ramp is completely covered. I can't leave my apartment. No emergency, but I need groceries.",
-            "ai_analysis": {
-                "urgency_score": 6,
-                "category": "Mobility",
-                "summary": "Wheelchair Ramp Blocked",
-                "is_critical": False
-            },
-            "status": "OPEN"
-        },
-        {
-            "id": 4,
-            "title": "Driveway Clearing",
-            "location": "321 Elm St, Brookline MA",
-            "request_text": "Just need my driveway cleared so I can get to work tomorrow. Not urgent, but would appreciate help.",
-            "ai_analysis": {
-                "urgency_score": 3,
-                "category": "General",
-                "summary": "Driveway Clearing",
-                "is_critical": False
-            },
-            "status": "OPEN"
-        },
-        {
-            "id": 5,
-            "title": "Oxygen Delivery Blocked",
-            "location": "555 Cedar Ln, Newton MA",
-            "request_text": "Oxygen tank delivery can't reach my house. Driveway and walkway completely blocked. I have backup but running low.",
-            "ai_analysis": {
-                "urgency_score": 9,
-                "category": "Medical",
-                "summary": "Oxygen Delivery Blocked",
-                "is_critical": True
-            },
-            "status": "OPEN"
-        }
-    ]
-
-# 4. State Initialization (Mock DB)
-if 'jobs' not in st.session_state:
-    st.session_state['jobs'] = seed_demo_jobs()
-
-# 5. Sidebar Navigation
+# 3. Sidebar Navigation
 with st.sidebar:
     st.title("❄️ SnowBridge")
     st.markdown("---")
     view = st.radio(
         "Navigation",
-        ["I Need Help", "I Can Help"],
+        ["I Need Help", "I Can Help", "Dispatch", "Dashboard"],
         index=0,
         help="Switch between requester and volunteer views."
     )
@@ -200,27 +126,60 @@ with st.sidebar:
     
     # Clear Database Button (for testing)
     st.subheader("🔧 Admin Tools")
-    if st.button("🗑️ Clear Database", use_container_width=True, help="Reset all requests (for testing)"):
-        st.session_state['jobs'] = seed_demo_jobs()
+    if confirmed_button("🗑️ Clear Database", "clear_database", "Delete every request and go back to the demo data?",
+                        use_container_width=True, help="Reset all requests (for testing)"):
+        service.reset(actor="admin")
         st.success("Database reset to demo data!")
         st.rerun()
     
-    if st.button("🌱 Seed Demo Data", use_container_width=True, help="Load 5 sample requests"):
-        st.session_state['jobs'] = seed_demo_jobs()
+    # Seeding an empty store deletes nothing, so only a store with requests asks first
+    if service.count_by_status():
+        seeded = confirmed_button("🌱 Seed Demo Data", "seed_demo_data", "Replace every request with the 5 demo requests?",
+                                  use_container_width=True, help="Load 5 sample requests")
+    else:
+        seeded = st.button("🌱 Seed Demo Data", key="seed_demo_data", use_container_width=True, help="Load 5 sample requests")
+    if seeded:
+        service.reset(actor="admin")
         st.success("Demo data loaded!")
         st.rerun()
     
+    if confirmed_button("⛈️ Load Storm Test Data", "load_storm_data",
+                        f"Replace every request with {STORM_TEST_JOBS:,} synthetic ones?",
+                        use_container_width=True, help="Replace all requests with 1,000 synthetic storm-day requests"):
+        service.reset(storm_jobs(STORM_TEST_JOBS), actor="admin")
+        st.success(f"Loaded {STORM_TEST_JOBS:,} synthetic requests!")
+        st.rerun()
+    
+    if st.button("🔁 Re-score Keyword Jobs", use_container_width=True, help="Apply the current keyword model to every job not yet scored by AI"):
+        changed = rescore_backlog(job_store)
+        st.success(f"Re-scored {changed} job(s)!")
+    
+    if st.button("🧠 Clear Triage Cache", use_container_width=True, help="Forget cached AI results (e.g. after editing the prompt)"):
+        service.triage_cache.invalidate()
+        st.success("Triage cache cleared!")
+    
+    st.toggle("⏱️ Profile this page", key="profile_reruns", help="Show where the time of each rerun goes, at the bottom of the page")
+    
     st.markdown("---")
     
     # Project Info
     st.info("Crisis response platform connecting residents with local volunteers for snow removal.")
     
     # Stats
-    total_jobs = len(st.session_state['jobs'])
-    open_jobs = len([j for j in st.session_state['jobs'] if j['status'] == 'OPEN'])
+    status_counts = service.count_by_status()
+    total_jobs = sum(status_counts.values())
+    open_jobs = status_counts.get('OPEN', 0)
     st.caption(f"📊 Total Requests: {total_jobs} | Open: {open_jobs}")
+    cache_stats = service.triage_cache.stats()
+    st.caption(f"🧠 Triage Cache: {cache_stats['hits']} hits | {cache_stats['misses']} misses")
+    if service.llm:
+        llm_stats = service.llm.stats()
+        st.caption(f"🤖 AI Triage: {llm_stats['breaker_state']} | Fallback rate: {llm_stats['fallback_rate']:.0%}")
+        st.caption(f"⏳ Awaiting AI review: {triage_worker.pending}")
+        if llm_stats['breaker_state'] != BREAKER_CLOSED:
+            st.error("AI triage degraded - using keyword scoring until the API recovers.")
 
-# 6. View Rendering
+# 4. View Rendering
 if view == "I Need Help":
     st.title("🆘 I Need Help")
     
@@ -279,21 +238,17 @@ if view == "I Need Help":
             
             # Handle form submission
             if submitted and title and location and request_text:
-                with st.spinner("🤖 Analyzing urgency with AI..."):
-                    # Call AI triage function
-                    ai_analysis = triage_request(request_text, title, location)
-                    
-                    # Store new request in session state
-                    new_job = {
-                        "id": max([j['id'] for j in st.session_state['jobs']], default=0) + 1,
-                        "title": title,
-                        "location": location,
-                        "request_text": request_text,
-                        "ai_analysis": ai_analysis,
-                        "status": "OPEN"
-                    }
-                    st.session_state['jobs'].append(new_job)
-                    
+                # Same household already on the feed? Checked before AI triage
+                # New requests get an instant keyword score, so they reach volunteers right away;
+                # AI review runs in the background and updates the score when it finishes
+                new_job, duplicate = service.submit(title, location, request_text)
+                if duplicate:
+                    st.info(f"🔁 This looks like request #{new_job['id']} (\"{new_job['title']}\"), which is already "
+                            f"{'on the volunteer feed' if new_job['status'] == 'OPEN' else 'claimed by a volunteer'}. "
+                            f"No need to submit it again.")
+                else:
+                    ai_analysis = new_job['ai_analysis']
+                
                     # Show urgency alert
                     if ai_analysis.get('is_critical', False):
                         st.error(f"🚨 **CRITICAL REQUEST** - Urgency Score: {ai_analysis['urgency_score']}/10")
@@ -301,7 +256,7 @@ if view == "I Need Help":
                         st.warning(f"⚠️ **HIGH PRIORITY** - Urgency Score: {ai_analysis['urgency_score']}/10")
                     else:
                         st.info(f"ℹ️ Urgency Score: {ai_analysis['urgency_score']}/10")
-                    
+                
                     st.success(f"✅ Request submitted! ID: {new_job['id']}")
                     st.balloons()
                     st.rerun()
@@ -335,87 +290,317 @@ elif view == "I Can Help":
     
     st.write("Browse snow removal requests in your area. Sorted by urgency.")
     
+    volunteer_name = st.text_input(
+        label="**Your Name**",
+        placeholder="e.g., Sam from Maple St",
+        help="Shown to coordinators as the person who claimed a job"
+    )
+    
+    with st.expander("📍 Only show jobs near me", expanded=False):
+        my_location = st.text_input(
+            label="**Your Location**",
+            placeholder="e.g., 10 Main St, Cambridge MA",
+            help="Looked up offline; used only to sort nearby jobs"
+        )
+        radius_km = st.slider("Within (km)", min_value=1, max_value=50, value=10)
+    
+    with st.expander("🔎 Search and filter", expanded=False):
+        search_query = st.text_input(
+            label="**Keywords**",
+            placeholder="e.g., ramp, oxygen, roof",
+            help="Matches requests containing every word, in the title, description or AI summary"
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status_label = st.selectbox("Status", list(SEARCH_STATUSES))
+        with col2:
+            search_category = st.selectbox("Category", ["All"] + service.categories())
+        with col3:
+            min_urgency = st.slider("Minimum urgency", min_value=0, max_value=10, value=0)
+    search = (search_query.strip(), SEARCH_STATUSES[status_label], None if search_category == "All" else search_category, min_urgency)
+    
     # Volunteer Feed
-    with st.container():
+    # Refreshes itself on a timer; each refresh only asks the store what changed since the last one
+    @st.fragment(run_every=FEED_REFRESH_SECONDS)
+    @METRICS.timed("render", view="feed")
+    def render_volunteer_feed():
         st.subheader("📋 Volunteer Feed")
         
-        # Filter open jobs and sort by urgency
-        open_jobs = [job for job in st.session_state['jobs'] if job['status'] == 'OPEN']
-        sorted_jobs = sorted(open_jobs, key=lambda x: x['ai_analysis']['urgency_score'], reverse=True)
+        job_store.sync()
+        last_version = st.session_state.get("feed_version")
+        changes = job_store.changes.since(last_version) if last_version is not None else None
+        st.session_state.feed_version = job_store.version
+        new_requests = sum(1 for change in changes or () if change.kind == CHANGE_INSERT)
+        if new_requests:
+            st.toast(f"🆕 {new_requests} new request(s) just came in")
+        
+        page = st.session_state.get("feed_page_number", 1)
+        view_key = (my_location, radius_km, page, search)
+        feed = st.session_state.get("feed_cache")
+        if changes != [] or feed is None or feed["key"] != view_key:
+            feed = {**service.feed_page(page, my_location, radius_km, *search), "key": view_key}
+            st.session_state.feed_cache = feed
         
-        if not sorted_jobs:
-            st.info("🎉 No open requests at the moment. Check back soon!")
+        if my_location and feed["my_point"] is None:
+            st.warning("📍 We couldn't find that location, so all open requests are shown.")
+        if feed["capped"]:
+            st.caption(f"📍 Only the {MAX_NEARBY_RESULTS} most urgent nearby requests are listed; shrink the radius to see others.")
+        if feed["nearby"] and search[1] != STATUS_OPEN:
+            st.caption("📍 \"Near me\" only lists open requests; clear your location to search claimed ones.")
+        if feed["page_count"] > 1:
+            if st.session_state.get("feed_page_number", 1) > feed["page_count"]:
+                st.session_state.feed_page_number = feed["page_count"]
+            st.number_input("Page", min_value=1, max_value=feed["page_count"], step=1, key="feed_page_number")
+        
+        if not feed["jobs"]:
+            if feed["searching"]:
+                st.info("🔎 No requests match your search.")
+            else:
+                st.info("🎉 No open requests at the moment. Check back soon!")
         else:
-            st.caption(f"Showing {len(sorted_jobs)} open request(s), sorted by urgency")
+            if feed["nearby"]:
+                scope = f"within {radius_km} km, sorted by urgency then distance"
+            elif feed["searching"] and search[0]:
+                scope = "sorted by best match, then urgency"
+            else:
+                scope = "sorted by urgency"
+            kind = "matching request(s)" if feed["searching"] else "open request(s)"
+            st.caption(f"Showing {len(feed['jobs'])} of {feed['total_open']} {kind}, {scope} (page {feed['page']} of {feed['page_count']})")
             
-            for job in sorted_jobs:
-                urgency_score = job['ai_analysis']['urgency_score']
-                category = job['ai_analysis']['category']
-                is_critical = job['ai_analysis'].get('is_critical', False)
-                
-                # Color coding based on urgency
-                if urgency_score >= 8 or is_critical:
-                    card_color = "#ff4444"  # Red
-                    badge_text = "🚨 CRITICAL"
-                    badge_color = "#cc0000"
-                elif urgency_score >= 4:
-                    card_color = "#ff8800"  # Orange
-                    badge_text = "⚠️ HIGH PRIORITY"
-                    badge_color = "#cc6600"
-                else:
-                    card_color = "#44aa44"  # Green
-                    badge_text = "ℹ️ STANDARD"
-                    badge_color = "#228822"
-                
-                # Create job card
+            for job in feed["jobs"]:
+                # Only this page's cards are formatted, and unchanged ones come from the cache
                 with st.container():
-                    st.markdown(f"""
-                    <div style="
-                        border-left: 5px solid {card_color};
-                        padding: 15px;
-                        margin: 10px 0;
-                        background-color: #ffffff;
-                        border-radius: 5px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    ">
-                        <div style="display: flex; justify-content: space-between; align-items: start;">
-                            <div>
-                                <h3 style="margin: 0; color: #333;">{job.get('title', 'Snow Removal Request')}</h3>
-                                <p style="margin: 5px 0; color: #666;">📍 {job['location']}</p>
-                            </div>
-                            <span style="
-                                background-color: {badge_color};
-                                color: white;
-                                padding: 5px 10px;
-                                border-radius: 15px;
-                                font-size: 12px;
-                                font-weight: bold;
-                            ">{badge_text}</span>
-                        </div>
-                        <p style="margin: 10px 0; color: #444;">{job['request_text']}</p>
-                        <div style="display: flex; gap: 15px; margin-top: 10px;">
-                            <span style="color: #666;">📊 Urgency: <strong>{urgency_score}/10</strong></span>
-                            <span style="color: #666;">🏷️ Category: <strong>{category}</strong></span>
-                            <span style="color: #666;">🆔 ID: <strong>#{job['id']}</strong></span>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(card_cache.get(job, feed["distances"].get(job['id']), feed["towns"].get(job['id'])), unsafe_allow_html=True)
                     
-                    # Claim button
+                    # Claim button (search can also list jobs that are already claimed)
                     col1, col2 = st.columns([1, 4])
                     with col1:
-                        if st.button(f"✅ Claim Job #{job['id']}", key=f"claim_{job['id']}", use_container_width=True):
-                            # Update job status
-                            for idx, j in enumerate(st.session_state['jobs']):
-                                if j['id'] == job['id']:
-                                    st.session_state['jobs'][idx]['status'] = 'CLAIMED'
-                                    break
-                            st.success(f"✅ You've claimed Job #{job['id']}! Thank you for helping!")
-                            st.rerun()
+                        if job["status"] != STATUS_OPEN:
+                            st.caption(f"🤝 Claimed by {job.get('claimed_by') or 'a volunteer'}")
+                        elif st.button(f"✅ Claim Job #{job['id']}", key=f"claim_{job['id']}", use_container_width=True):
+                            # Update job status (only succeeds if nobody claimed it first)
+                            result = job_store.claim(job['id'], claimant=volunteer_name)
+                            if result == ClaimResult.CLAIMED:
+                                st.success(f"✅ You've claimed Job #{job['id']}! Thank you for helping!")
+                                st.rerun()
+                            else:
+                                st.warning(f"⚠️ Job #{job['id']} was already claimed by another volunteer.")
                     
                     st.markdown("---")
+    
+    render_volunteer_feed()
+
+elif view == "Dispatch":
+    st.title("🚚 Dispatch")
+    st.write("On storm days, plan the whole roster at once: each open job goes to the volunteer who gets the most urgency covered for the least travel, within their capacity and equipment.")
+    
+    roster = st.data_editor(
+        st.session_state.get("roster", DEFAULT_ROSTER),
+        num_rows="dynamic",
+        use_container_width=True,
+        key="roster_editor"
+    )
+    
+    if st.button("📋 Plan Assignments", use_container_width=True):
+        geocoder = service.geocoder
+        volunteers, unknown = [], []
+        for row in roster:
+            if not row.get("name"):
+                continue
+            point = geocoder.geocode(row.get("location") or "") if geocoder else None
+            if point is None:
+                unknown.append(row["name"])
+                continue
+            volunteers.append({
+                "name": row["name"],
+                "lat": point[0],
+                "lon": point[1],
+                "capacity": int(row.get("capacity") or 0),
+                "equipment": [item for item in (row.get("equipment") or "").split(",") if item.strip()],
+            })
+        if unknown:
+            st.warning(f"📍 Couldn't find the location of: {', '.join(unknown)}")
+        try:
+            dispatcher = Dispatcher(volunteers)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+        else:
+            dispatcher.solve(job_store.list_open())
+            st.session_state.roster = roster
+            st.session_state.dispatcher = dispatcher
+    
+    dispatcher = st.session_state.get("dispatcher")
+    if dispatcher is not None:
+        # The plan follows new requests and claims since it was made, without re-solving
+        dispatcher.sync(job_store.list_open())
+        plan_stats = dispatcher.stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Assigned", f"{plan_stats['assigned']} of {plan_stats['jobs']}")
+        col2.metric("Slots Used", f"{plan_stats['assigned']} of {plan_stats['capacity']}")
+        col3.metric("No Location", plan_stats["unplaced"])
+        
+        assignments = dispatcher.assignments()
+        rows = []
+        for name, job_ids in assignments.items():
+            for job_id in job_ids:
+                job = job_store.get(job_id)
+                if job is None or job["status"] != STATUS_OPEN:
+                    continue  # Deleted or claimed since the last sync
+                rows.append({
+                    "Volunteer": name,
+                    "Job": f"#{job_id}",
+                    "Title": job["title"],
+                    "Location": job["location"],
+                    "Urgency": job["ai_analysis"]["urgency_score"],
+                })
+        if not rows:
+            st.info("No open job is within reach of this roster.")
+        else:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+            if st.button("✅ Claim All Assignments", use_container_width=True):
+                claimed = {}
+                for name, job_ids in assignments.items():
+                    for job_id in job_ids:
+                        if job_store.claim(job_id, claimant=name) == ClaimResult.CLAIMED:
+                            claimed[name] = claimed.get(name, 0) + 1
+                # Claimed jobs use up capacity; plan again to fill what's left
+                st.session_state.roster = [
+                    {**row, "capacity": max(0, int(row.get("capacity") or 0) - claimed.get(row.get("name"), 0))}
+                    for row in roster
+                ]
+                del st.session_state.dispatcher
+                st.success(f"✅ Claimed {sum(claimed.values())} job(s) for {len(claimed)} volunteer(s)!")
+
+elif view == "Dashboard":
+    st.title("📈 Dashboard")
+    st.write("Live figures for coordinators. They're kept up to date as requests come in and get claimed, so refreshing is cheap.")
+    
+    auto_refresh = st.toggle("🔄 Auto-refresh every 10 seconds", value=True)
+    
+    @st.fragment(run_every=10 if auto_refresh else None)
+    @METRICS.timed("render", view="dashboard")
+    def render_dashboard():
+        job_stats = service.built("stats")
+        if job_stats is None:
+            st.info("⏳ Loading the figures, they'll appear in a moment.")
+            return
+        snapshot = job_stats.snapshot()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Open Requests", snapshot["by_status"].get("OPEN", 0))
+        col2.metric("Claimed", snapshot["by_status"].get("CLAIMED", 0))
+        col3.metric("Submissions / min", f"{snapshot['submissions_per_minute']:.1f}", help="Average over the last 15 minutes")
+        median = snapshot["median_minutes_to_claim"]
+        col4.metric(
+            "Median Time to Claim",
+            f"≤ {median:.0f} min" if median is not None else "—",
+            help=f"Over the {snapshot['claims_last_hour']} claim(s) in the last hour"
+        )
+        
+        if snapshot["stale_critical"]:
+            st.error(f"🚨 {snapshot['stale_critical']} critical request(s) unclaimed for more than {STALE_CRITICAL_MINUTES} minutes "
+                     f"(oldest: {snapshot['oldest_critical_minutes']:.0f} min).")
+        elif snapshot["open_critical"]:
+            st.warning(f"⚠️ {snapshot['open_critical']} critical request(s) open, none waiting longer than {STALE_CRITICAL_MINUTES} minutes.")
+        else:
+            st.success("✅ No critical requests waiting.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Open by Urgency")
+            urgency_counts = snapshot["open_by_urgency"]
+            st.bar_chart({"Urgency": [bucket.title() for bucket in urgency_counts], "Open": list(urgency_counts.values())},
+                         x="Urgency", y="Open")
+        with col2:
+            st.subheader("Open by Category")
+            if snapshot["open_by_category"]:
+                category_counts = dict(sorted(snapshot["open_by_category"].items()))
+                st.bar_chart({"Category": list(category_counts), "Open": list(category_counts.values())},
+                             x="Category", y="Open")
+            else:
+                st.info("🎉 No open requests.")
+
+    render_dashboard()
+
+    st.markdown("---")
+    st.subheader("🔁 Possible Duplicates")
+    st.caption("Open requests much like another open one from a different address: the same situation reported twice, or neighbors with the same problem.")
+    duplicates = service.built("duplicates")
+    flagged = duplicates.flagged(limit=50) if duplicates is not None else None
+    if flagged is None:
+        st.info("⏳ Still comparing requests, check back in a moment.")
+    elif flagged:
+        rows = []
+        for job_id, similar_id in flagged:
+            job, similar = job_store.get(job_id), job_store.get(similar_id)
+            if job is None:
+                continue
+            rows.append({
+                "Job": f"#{job_id}",
+                "Location": job["location"],
+                "Similar To": f"#{similar_id}",
+                "Its Location": similar["location"] if similar else "—",
+                "Its Status": similar["status"] if similar else "—",
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ No open request looks like a repeat.")
 
-# 7. Global CSS/Styling (Combined Architecture & UI)
+    st.markdown("---")
+    st.subheader("🧾 Audit Trail")
+
+    def event_rows(events):
+        return [
+            {
+                "Seq": event["seq"],
+                "When": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["at"])),
+                "Event": event["kind"],
+                "Job": f"#{event['job_id']}" if event["job_id"] is not None else "—",
+                "By": event["actor"] or "—",
+                # Create events carry the whole job; the title is enough here
+                "Details": event["data"].get("title", "") if event["kind"] == EVENT_CREATE else
+                           ", ".join(f"{key}={value}" for key, value in event["data"].items()),
+            }
+            for event in events
+        ]
+
+    audit_job_id = st.number_input("Job ID", min_value=0, value=0, step=1, help="Every change to one request, oldest first (0 for none)")
+    if audit_job_id:
+        history = job_store.history(int(audit_job_id))
+        if history:
+            st.dataframe(event_rows(history), use_container_width=True, hide_index=True)
+        else:
+            st.info(f"No events logged for job #{int(audit_job_id)}.")
+
+    st.caption("Latest events")
+    st.dataframe(event_rows(job_store.recent_events(20)), use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.subheader("⏱️ Performance")
+    st.caption("Timings since this server started. Percentiles are histogram bucket bounds, so read \"≤\".")
+    timing_rows = []
+    for (name, labels), histogram in sorted(METRICS.histograms().items()):
+        _, count, total = histogram.snapshot()
+        if not count:
+            continue
+        p50, p95 = histogram.quantile(0.5), histogram.quantile(0.95)
+        timing_rows.append({
+            "Span": name.removesuffix("_seconds"),
+            "Labels": ", ".join(f"{key}={value}" for key, value in labels),
+            "Count": count,
+            "Mean ms": round(total / count * 1000, 3),
+            "p50 ≤ ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95 ≤ ms": round(p95 * 1000, 3) if p95 is not None else None,
+        })
+    if timing_rows:
+        st.dataframe(timing_rows, use_container_width=True, hide_index=True)
+    counters = {name + "".join(f" ({value})" for _, value in labels): value
+                for (name, labels), value in sorted(METRICS.counters().items())}
+    if counters:
+        st.caption(" | ".join(f"{name}: {value:,}" for name, value in counters.items()))
+    st.download_button("⬇️ Download Prometheus Metrics", METRICS.render(), file_name="snowbridge.prom", mime="text/plain")
+
+# 5. Global CSS/Styling (Combined Architecture & UI)
 st.markdown("""
     <style>
     .main {
@@ -530,3 +715,23 @@ if view == "I Can Help":
         st.markdown(get_urgency_badge(2), unsafe_allow_html=True)
         st.caption("Standard Style")
     st.markdown("---")
+
+# Rerun timing and the admin profile (only full reruns; fragment refreshes are timed as "render")
+rerun_seconds = time.perf_counter() - rerun_started
+METRICS.observe("rerun", rerun_seconds, view=view)
+if profiling:
+    spans = METRICS.stop_profile()
+    with st.expander(f"⏱️ Profile of this rerun: {rerun_seconds * 1000:.1f} ms", expanded=True):
+        st.dataframe(
+            [
+                {
+                    "Span": name,
+                    "Labels": ", ".join(f"{key}={value}" for key, value in labels.items()),
+                    "ms": round(seconds * 1000, 3),
+                }
+                for name, labels, seconds in spans
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Spans are listed in the order they finished; nested spans come before the span that contains them.")
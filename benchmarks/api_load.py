@@ -0,0 +1,238 @@
+"""
+Load test for the JSON API (snowbridge.api) with one or more worker processes.
+
+For each worker count, a fresh store is filled with synthetic storm load,
+`python -m snowbridge.api` is started on it, and `--connections` keep-alive
+clients send a mix of requests for `--seconds`:
+  - feed      a volunteer feed page (plain, keyword search, or near a town)
+  - submit    a new request
+  - claim     one of the open jobs the client last saw on the feed
+Then every connection claims the SAME job at once (exactly one must win),
+and the event log is checked: no job was claimed twice, whichever worker
+each claim reached.
+
+The clients share one asyncio loop in this process, so on a small machine
+they compete with the workers for CPU; compare worker counts on the same box.
+
+Run from the project root:
+    python -m benchmarks.api_load
+    python -m benchmarks.api_load --jobs 100000 --workers 1,4 --connections 256
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.suite import SEARCH_QUERIES, summarize
+from snowbridge.loadgen import load_towns, storm_jobs
+from snowbridge.store import EVENT_CLAIM, JobStore
+
+# Share of requests per kind; the rest are feed reads
+SUBMIT_SHARE = 0.1
+CLAIM_SHARE = 0.1
+# Of the feed reads: keyword searches and "near me" reads; the rest are plain pages
+SEARCH_SHARE = 0.2
+NEARBY_SHARE = 0.2
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection sending JSON requests."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method, path, payload=None):
+        """(status, decoded JSON body); reconnects if the server closed the connection."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self._writer.drain()
+        head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.lower().split(": ", 1) for line in head[1:] if ": " in line)
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            self.close()
+        return int(head[0].split(" ")[1]), json.loads(data)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def feed_path(rng, towns):
+    roll = rng.random()
+    if roll < SEARCH_SHARE:
+        return f"/feed?q={rng.choice(SEARCH_QUERIES).replace(' ', '+')}"
+    if roll < SEARCH_SHARE + NEARBY_SHARE:
+        town, state, _, _ = rng.choice(towns)
+        return f"/feed?location={town.replace(' ', '+')}+{state}&radius_km=5"
+    return f"/feed?page={rng.randint(1, 5)}"
+
+
+async def run_client(number, host, port, deadline, towns, submissions, samples, statuses, claimed):
+    rng = random.Random(number)
+    client = Client(host, port)
+    open_ids = []
+    try:
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < SUBMIT_SHARE:
+                route, method, path = "submit", "POST", "/jobs"
+                payload = submissions[rng.randrange(len(submissions))]
+                payload = {**payload, "request_text": f"{payload['request_text']} (client {number}, {time.perf_counter()})"}
+            elif roll < SUBMIT_SHARE + CLAIM_SHARE and open_ids:
+                job_id = open_ids.pop(rng.randrange(len(open_ids)))
+                route, method, path, payload = "claim", "POST", f"/jobs/{job_id}/claim", {"claimant": f"volunteer-{number}"}
+            else:
+                route, method, path, payload = "feed", "GET", feed_path(rng, towns), None
+            started = time.perf_counter()
+            status, body = await client.request(method, path, payload)
+            samples[route].append(time.perf_counter() - started)
+            statuses[route][status] += 1
+            if route == "feed" and status == 200:
+                open_ids = [job["id"] for job in body["jobs"] if job["status"] == "OPEN"]
+            elif route == "claim" and status == 200:
+                claimed.append(job_id)
+    finally:
+        client.close()
+
+
+async def run_load(host, port, connections, seconds, towns, submissions):
+    samples = defaultdict(list)
+    statuses = defaultdict(Counter)
+    claimed = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(i, host, port, started + seconds, towns, submissions, samples, statuses, claimed)
+        for i in range(connections)
+    ))
+    return samples, statuses, claimed, time.perf_counter() - started
+
+
+async def race_for_one_job(host, port, connections, job_id):
+    """Every connection claims `job_id` at once; returns the status counts."""
+    clients = [Client(host, port) for _ in range(connections)]
+    try:
+        results = await asyncio.gather(*(
+            client.request("POST", f"/jobs/{job_id}/claim", {"claimant": f"racer-{i}"}) for i, client in enumerate(clients)
+        ))
+    finally:
+        for client in clients:
+            client.close()
+    return Counter(status for status, _ in results)
+
+
+def start_server(db_path, port, workers):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "snowbridge.api", "--db", db_path, "--port", str(port), "--workers", str(workers)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    line = server.stdout.readline()
+    if "SnowBridge API on" not in line:
+        server.kill()
+        raise RuntimeError(f"API didn't start: {line!r}")
+    return server
+
+
+def stop_server(server):
+    server.terminate()
+    server.wait(timeout=30)
+
+
+def double_claims(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT job_id, COUNT(*) FROM events WHERE kind = ? GROUP BY job_id HAVING COUNT(*) > 1", (EVENT_CLAIM,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def bench_workers(workers, args, towns, submissions):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "api-load.db")
+        store = JobStore(db_path)
+        jobs = storm_jobs(args.jobs, seed=args.seed)
+        for start in range(0, len(jobs), 5000):
+            store.insert_many(jobs[start:start + 5000], actor="loadgen")
+        hot_job = store.insert({**submissions[0], "ai_analysis": jobs[0]["ai_analysis"]}, actor="loadgen")["id"]
+        store.close()
+
+        server = start_server(db_path, args.port, workers)
+        try:
+            samples, statuses, claimed, elapsed = asyncio.run(
+                run_load("127.0.0.1", args.port, args.connections, args.seconds, towns, submissions)
+            )
+            race = asyncio.run(race_for_one_job("127.0.0.1", args.port, args.connections, hot_job))
+        finally:
+            stop_server(server)
+
+        total = sum(len(durations) for durations in samples.values())
+        print(f"{workers} worker(s), {args.connections} connections: {total / elapsed:,.0f} req/s over {elapsed:.1f}s")
+        for route in ("feed", "submit", "claim"):
+            if not samples[route]:
+                continue
+            figures = summarize(samples[route])
+            codes = ", ".join(f"{status}: {count}" for status, count in sorted(statuses[route].items()))
+            print(f"  {route:<7} {figures['runs']:>7} requests   p50 {figures['p50_ms']:7.1f} ms   "
+                  f"p95 {figures['p95_ms']:7.1f} ms   max {figures['max_ms']:7.1f} ms   ({codes})")
+
+        failures = []
+        errors = sum(count for counter in statuses.values() for status, count in counter.items() if status >= 500)
+        if errors:
+            failures.append(f"{errors} server errors")
+        if len(claimed) != len(set(claimed)):
+            failures.append("a job was claimed by two clients")
+        if race[200] != 1 or race[409] != args.connections - 1:
+            failures.append(f"race for one job: {dict(race)}")
+        doubled = double_claims(db_path)
+        if doubled:
+            failures.append(f"jobs with more than one claim event: {doubled[:5]}")
+        print(f"  race    {args.connections} claims of job #{hot_job} -> {race[200]} won, {race[409]} already claimed")
+        return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000, help="backlog size")
+    parser.add_argument("--workers", default="1,2", help="comma-separated worker process counts")
+    parser.add_argument("--connections", type=int, default=64, help="concurrent keep-alive clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load duration per worker count")
+    parser.add_argument("--port", type=int, default=8612)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    towns = load_towns()
+    submissions = [
+        {key: job[key] for key in ("title", "location", "request_text")}
+        for job in storm_jobs(500, seed=args.seed + 1)
+    ]
+    failures = []
+    for workers in (int(count) for count in args.workers.split(",")):
+        failures += [f"{workers} worker(s): {failure}" for failure in bench_workers(workers, args, towns, submissions)]
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
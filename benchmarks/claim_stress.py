@@ -0,0 +1,104 @@
+"""
+Concurrency stress check for job claiming and id allocation.
+
+Many threads hammer one shared JobStore at once:
+  1. every thread claims the SAME job -> exactly one must win
+  2. threads claim overlapping sets of DIFFERENT jobs -> every job claimed exactly once
+  3. threads insert jobs concurrently -> ids are unique and strictly increasing per thread
+
+Run from the project root:
+    python -m benchmarks.claim_stress
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from snowbridge.store import ClaimResult, JobStore
+
+
+def make_job(n):
+    return {
+        "title": f"Stress job {n}",
+        "location": f"{n} Test St",
+        "request_text": "Driveway blocked",
+        "ai_analysis": {"urgency_score": 1 + n % 10, "category": "General", "summary": "Stress", "is_critical": False},
+    }
+
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def check_same_job(store, threads):
+    job = store.insert(make_job(0))
+    results = run_threads(threads, lambda i: store.claim(job["id"], claimant=f"volunteer-{i}"))
+    counts = Counter(results)
+    assert counts[ClaimResult.CLAIMED] == 1, counts
+    assert counts[ClaimResult.ALREADY_CLAIMED] == threads - 1, counts
+    winner = store.get(job["id"])
+    assert winner["claimed_by"] == f"volunteer-{results.index(ClaimResult.CLAIMED)}", winner
+    assert winner["claimed_at"] is not None
+    print(f"same job:       {threads} threads -> 1 CLAIMED, {threads - 1} ALREADY_CLAIMED")
+
+
+def check_different_jobs(store, threads, jobs):
+    ids = [store.insert(make_job(n))["id"] for n in range(jobs)]
+
+    def claim_shuffled(i):
+        order = ids[:]
+        random.Random(i).shuffle(order)
+        return [(job_id, store.claim(job_id, claimant=f"volunteer-{i}")) for job_id in order]
+
+    started = time.perf_counter()
+    results = run_threads(threads, claim_shuffled)
+    elapsed = time.perf_counter() - started
+    winners = Counter(job_id for attempts in results for job_id, result in attempts if result == ClaimResult.CLAIMED)
+    assert set(winners) == set(ids), "some jobs were never claimed"
+    assert max(winners.values()) == 1, "a job was claimed twice"
+    attempts = threads * jobs
+    print(f"different jobs: {threads} threads x {jobs} jobs -> each claimed once "
+          f"({attempts} attempts, {attempts / elapsed:,.0f} claims/s)")
+
+
+def check_id_allocation(store, threads, per_thread):
+    results = run_threads(threads, lambda i: [store.insert(make_job(n))["id"] for n in range(per_thread)])
+    all_ids = [job_id for ids in results for job_id in ids]
+    assert len(set(all_ids)) == len(all_ids), "duplicate ids allocated"
+    assert all(ids == sorted(ids) for ids in results), "ids went backwards"
+    print(f"id allocation:  {threads} threads x {per_thread} inserts -> {len(all_ids)} unique, monotonic ids")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--jobs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "stress.db"))
+        check_same_job(store, args.threads)
+        check_different_jobs(store, args.threads, args.jobs)
+        check_id_allocation(store, args.threads, args.jobs // 4)
+        store.close()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Cold-start benchmark: how long a restarted app server or API worker takes
+to open its SnowBridgeService and serve the feed after a storm's worth of
+activity.
+
+Builds a store of `--jobs` jobs with a long event log behind it (creates,
+batched re-scores and claims), then opens the service on it twice:
+  1. without a snapshot -> every job is read from the jobs table
+  2. from the snapshot plus the rows changed since it
+Both must load exactly the same jobs. The open covers what a restart does
+(`SnowBridgeService.from_env()`: gazetteer, jobs, feed and "near me"
+indexes); the search, duplicate and stats indexes are built afterwards by
+`warm_up()`, which is timed and checked separately. The first submit and
+the first feed render run while it builds, and mustn't wait for it.
+
+Run from the project root:
+    python -m benchmarks.cold_start
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from snowbridge.cards import CardCache
+from snowbridge.service import SnowBridgeService
+from snowbridge.store import JobStore
+
+CATEGORIES = ["Medical", "Access", "Mobility", "General"]
+REQUESTS = [
+    "Driveway blocked, need to get to work",
+    "Elderly neighbor can't get out the front door",
+    "Roof is sagging under the snow",
+    "Icy steps, I use a walker",
+    "Need to get to dialysis tomorrow morning",
+    "Mailbox buried",
+]
+
+
+def make_job(n, rng):
+    return {
+        "title": f"Request {n}",
+        "location": f"{n} Test St, Boston MA",
+        "request_text": f"{rng.choice(REQUESTS)} (#{n})",
+        "ai_analysis": {
+            "urgency_score": rng.randint(1, 10),
+            "category": rng.choice(CATEGORIES),
+            "summary": "Benchmark",
+            "is_critical": False,
+        },
+    }
+
+
+def build(path, jobs, events, rng):
+    """Fills a fresh store; returns how many events were logged."""
+    store = JobStore(path)
+    for start in range(0, jobs, 5000):
+        store.insert_many([make_job(n, rng) for n in range(start, min(jobs, start + 5000))], actor="import")
+    ids = [job["id"] for job in store.list_all()]
+
+    logged = jobs
+    claims = jobs // 3
+    while logged < events - claims:
+        batch = rng.sample(ids, min(len(ids), 5000, events - claims - logged))
+        store.update_analyses(
+            {job_id: {"urgency_score": rng.randint(1, 10), "category": rng.choice(CATEGORIES),
+                      "summary": "Re-scored", "is_critical": False} for job_id in batch},
+            actor="rescore",
+        )
+        logged += len(batch)
+    for job_id in rng.sample(ids, claims):
+        store.claim(job_id, claimant=f"volunteer-{job_id % 50}")
+    logged += claims
+    store.close()
+    return logged
+
+
+def fingerprint(store):
+    """{id: job as JSON} of every job. Strings aren't tracked by the garbage
+    collector, so holding it doesn't slow the timed open like 100k job dicts would."""
+    return {job["id"]: json.dumps(job, sort_keys=True) for job in store.list_all()}
+
+
+def render_feed(service, cards):
+    """What the volunteer view reads on its first run: sidebar counts, categories and one page of cards."""
+    service.count_by_status()
+    service.categories()
+    return [cards.get(job) for job in service.feed_page()["jobs"]]
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def timed_open(path):
+    started = time.perf_counter()
+    service = SnowBridgeService.from_env(path, seed=False)
+    return service, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=500000, help="total events in the log (creates + re-scores + claims)")
+    parser.add_argument("--tail", type=int, default=2000, help="changes made after the snapshot")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="fail if opening the service from the snapshot takes longer")
+    parser.add_argument("--max-first-seconds", type=float, default=0.5,
+                        help="fail if the first submit or feed render during the warm-up takes longer")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cold_start.db")
+        started = time.perf_counter()
+        logged = build(path, args.jobs, args.events, rng)
+        print(f"build:     {args.jobs} jobs, {logged} events in {time.perf_counter() - started:.1f}s")
+
+        if os.path.exists(path + ".snapshot"):
+            os.remove(path + ".snapshot")
+        service, full_seconds = timed_open(path)
+        print(f"full load: {full_seconds:.2f}s (no snapshot, every row read)")
+
+        # Snapshot, then a tail of changes the snapshot doesn't have
+        store = service.store
+        store.save_snapshot()
+        ids = rng.sample([job["id"] for job in store.list_open()], args.tail)
+        for job_id in ids:
+            service.claim(job_id, claimant="late-volunteer")
+        expected = fingerprint(store)
+        service.close()
+        # A restarted process starts without the old service's jobs on the heap
+        store = service = None
+        gc.collect()
+
+        service, snapshot_seconds = timed_open(path)
+        started = time.perf_counter()
+        feed = service.feed_page()
+        feed_seconds = time.perf_counter() - started
+        print(f"snapshot:  {snapshot_seconds:.2f}s (snapshot + {args.tail} changed rows), "
+              f"{full_seconds / snapshot_seconds:.1f}x faster; first feed page {feed_seconds * 1000:.1f} ms")
+        store = service.store
+        assert fingerprint(store) == expected, "snapshot load differs from the jobs table"
+        assert feed["total_open"] == store.count_by_status().get("OPEN", 0)
+
+        # Like a restarted server: the warm-up starts, and the first visitors don't wait for it
+        started = time.perf_counter()
+        warming = service.warm_up()
+        submit_seconds = timed(service.submit, "Request", "1 First St, Boston MA", "Front steps iced over")
+        render_seconds = timed(render_feed, service, CardCache())
+        print(f"first use: submit {submit_seconds * 1000:.0f} ms, feed render {render_seconds * 1000:.0f} ms "
+              f"(indexes still building: {warming.is_alive()})")
+
+        # The store keeps taking claims while the lazy indexes build; they must catch up with them
+        open_ids = [job["id"] for job in store.list_open(limit=args.tail)]
+        slowest = 0.0
+        while warming.is_alive() and open_ids:
+            claim_started = time.perf_counter()
+            service.claim(open_ids.pop(), claimant="warm-up-volunteer")
+            slowest = max(slowest, time.perf_counter() - claim_started)
+            time.sleep(0.005)
+        warming.join()
+        print(f"warm-up:   {time.perf_counter() - started:.2f}s to build the search, duplicate and stats "
+              f"indexes in the background ({args.tail - len(open_ids)} claims meanwhile, slowest "
+              f"{slowest * 1000:.0f} ms)")
+        loaded = {job["id"]: job for job in store.list_all()}
+        assert service.stats.count_by_status() == store.count_by_status(), "stats index differs from the store"
+        assert service.search_index.match() == set(loaded), "search index differs from the store"
+        service.close()
+
+    if snapshot_seconds > args.max_seconds:
+        print(f"FAIL: opening the service took more than {args.max_seconds:.1f}s")
+        return 1
+    if max(submit_seconds, render_seconds) > args.max_first_seconds:
+        print(f"FAIL: the first submit or feed render took more than {args.max_first_seconds:.1f}s")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark for the dispatcher: a full solve of a storm-day roster, then
+incremental updates as jobs arrive and get claimed.
+
+Volunteers and jobs are scattered over the Boston area with a fixed seed.
+The plan is checked (capacity, equipment, travel limit, one volunteer per
+job) and must beat the greedy-only value, so the improvement step has to
+pay for itself even when every volunteer is full.
+
+Run from the project root:
+    python -m benchmarks.dispatch_bench
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from snowbridge.dispatch import Dispatcher, distances_km, required_equipment
+
+# Roughly Greater Boston
+LAT_RANGE = (42.20, 42.55)
+LON_RANGE = (-71.35, -70.90)
+EQUIPMENT = ["shovel", "snowblower", "roof rake", "salt"]
+REQUESTS = [
+    "Driveway blocked, need to get to work",
+    "Elderly neighbor can't get out the front door",
+    "Roof is sagging under the snow",
+    "Icy steps, I use a walker",
+    "Need to get to dialysis tomorrow morning",
+    "Mailbox buried",
+]
+
+
+def make_volunteers(count, rng):
+    return [
+        {
+            "name": f"volunteer-{n}",
+            "lat": rng.uniform(*LAT_RANGE),
+            "lon": rng.uniform(*LON_RANGE),
+            "capacity": rng.randint(1, 5),
+            "equipment": rng.sample(EQUIPMENT, rng.randint(1, 3)),
+        }
+        for n in range(count)
+    ]
+
+
+def make_job(n, rng):
+    return {
+        "id": n,
+        "title": f"Request {n}",
+        "request_text": rng.choice(REQUESTS),
+        "status": "OPEN",
+        "lat": rng.uniform(*LAT_RANGE),
+        "lon": rng.uniform(*LON_RANGE),
+        "ai_analysis": {"urgency_score": rng.randint(1, 10)},
+    }
+
+
+def check_plan(dispatcher, volunteers, jobs):
+    """Every constraint holds for the current plan."""
+    by_name = {volunteer["name"]: volunteer for volunteer in volunteers}
+    seen = set()
+    for name, job_ids in dispatcher.assignments().items():
+        volunteer = by_name[name]
+        assert len(job_ids) <= volunteer["capacity"], f"{name} over capacity"
+        for job_id in job_ids:
+            assert job_id not in seen, f"job {job_id} assigned twice"
+            seen.add(job_id)
+            job = jobs[job_id]
+            assert required_equipment(job) <= set(volunteer["equipment"]), f"{name} lacks equipment for {job_id}"
+            distance = float(distances_km(job["lat"], job["lon"], volunteer["lat"], volunteer["lon"]))
+            assert distance <= dispatcher.max_travel_km + 1e-9, f"{name} too far from {job_id}"
+    return len(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--volunteers", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=1000, help="incremental arrivals and claims after the solve")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="fail if the full solve takes longer")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    volunteers = make_volunteers(args.volunteers, rng)
+    jobs = {n: make_job(n, rng) for n in range(args.jobs)}
+
+    # Greedy only, for comparison
+    greedy = Dispatcher(volunteers, improvement_rounds=0)
+    greedy.solve(list(jobs.values()))
+    greedy_value = greedy.stats()["value"]
+
+    dispatcher = Dispatcher(volunteers)
+    started = time.perf_counter()
+    dispatcher.solve(list(jobs.values()))
+    solve_seconds = time.perf_counter() - started
+    stats = dispatcher.stats()
+    solved_value = stats["value"]
+    assert check_plan(dispatcher, volunteers, jobs) == stats["assigned"]
+    print(f"solve:       {args.volunteers} volunteers x {args.jobs} jobs in {solve_seconds:.2f}s -> "
+          f"{stats['assigned']} assigned of {stats['capacity']} slots, value {stats['value']:,.1f} "
+          f"(greedy alone {greedy_value:,.1f}, +{stats['value'] - greedy_value:,.1f})")
+
+    started = time.perf_counter()
+    for n in range(args.jobs, args.jobs + args.updates):
+        job = jobs[n] = make_job(n, rng)
+        dispatcher.add(job)
+        claimed = jobs.pop(rng.choice(list(jobs)))
+        dispatcher.remove(claimed)
+    update_seconds = time.perf_counter() - started
+    stats = dispatcher.stats()
+    assert check_plan(dispatcher, volunteers, jobs) == stats["assigned"]
+    print(f"incremental: {args.updates} arrivals + {args.updates} claims in {update_seconds:.2f}s "
+          f"({update_seconds / (2 * args.updates) * 1000:.2f} ms each) -> {stats['assigned']} assigned, "
+          f"value {stats['value']:,.1f}")
+
+    if solve_seconds > args.max_seconds:
+        print(f"FAIL: solve took more than {args.max_seconds:.1f}s")
+        return 1
+    if solved_value <= greedy_value:
+        print("FAIL: the improvement step didn't beat greedy alone")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
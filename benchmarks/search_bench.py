@@ -0,0 +1,105 @@
+"""
+Benchmark for volunteer search: query latency over a large backlog.
+
+Fills a SearchIndex with `--jobs` jobs built from a handful of request
+templates (so common words match thousands of jobs, the slow case), then
+times a mix of keyword and filter queries for the first page and a deep
+page. Every result is checked against a plain filter + sort of all jobs.
+
+Run from the project root:
+    python -m benchmarks.search_bench
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from snowbridge.search import SearchIndex, terms
+
+CATEGORIES = ["Medical", "Access", "Mobility", "General"]
+REQUESTS = [
+    "Driveway blocked, need to get to work",
+    "Elderly neighbor can't get out the front door",
+    "Roof is sagging under the snow",
+    "Icy steps, I use a walker",
+    "Need to get to dialysis tomorrow morning",
+    "Mailbox buried, my meds are in there",
+    "Wheelchair ramp covered in ice",
+    "Oxygen delivery can't reach the house",
+]
+PLACES = "maple oak pine cedar elm birch garage porch stairs walkway sidewalk car hydrant".split()
+QUERIES = [
+    ("oxygen", {}),
+    ("driveway", {"status": "OPEN"}),
+    ("ramp wheelchair", {"status": "OPEN"}),
+    ("snow", {"status": "OPEN", "category": "Medical", "min_urgency": 5}),
+    ("", {"status": "OPEN", "category": "Access"}),
+    ("porch steps", {"min_urgency": 7}),
+]
+
+
+def make_job(n, rng):
+    request = rng.choice(REQUESTS)
+    return {
+        "id": n,
+        "title": f"{rng.choice(PLACES).title()} request",
+        "request_text": f"{request} near the {rng.choice(PLACES)} {rng.choice(PLACES)}",
+        "status": "OPEN" if rng.random() < 0.67 else "CLAIMED",
+        "created_at": float(n),
+        "ai_analysis": {"urgency_score": rng.randint(1, 10), "category": rng.choice(CATEGORIES), "summary": request[:25]},
+    }
+
+
+def expected(jobs, query, status=None, category=None, min_urgency=0):
+    """Matching ids by the slow route, in urgency then age order (relevance not included)."""
+    wanted = set(terms(query))
+    matches = []
+    for job in jobs:
+        analysis = job["ai_analysis"]
+        words = set(terms(f"{job['title']} {job['request_text']} {analysis['summary']}"))
+        if (wanted <= words and (status is None or job["status"] == status)
+                and (category is None or analysis["category"] == category) and analysis["urgency_score"] >= min_urgency):
+            matches.append(job["id"])
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query")
+    parser.add_argument("--max-ms", type=float, default=20.0, help="fail if any query averages longer")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = [make_job(n, rng) for n in range(args.jobs)]
+    index = SearchIndex()
+    started = time.perf_counter()
+    for job in jobs:
+        index.add(job)
+    print(f"build: {args.jobs} jobs in {time.perf_counter() - started:.2f}s")
+
+    slowest = 0.0
+    for query, filters in QUERIES:
+        total, first = index.search(query, limit=20, **filters)
+        matches = expected(jobs, query, **filters)
+        assert total == len(matches), f"{query!r}: {total} matches, expected {len(matches)}"
+        assert index.match(query, **filters) == set(matches), f"{query!r}: match() differs"
+        for label, offset in (("page 1", 0), ("deep page", max(0, total // 2))):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                index.search(query, offset=offset, limit=20, **filters)
+            ms = (time.perf_counter() - started) / args.repeat * 1000
+            slowest = max(slowest, ms)
+            print(f"{query or '(filters only)':>16} {filters}: {total} matches, {label} {ms:.1f} ms")
+
+    if slowest > args.max_ms:
+        print(f"FAIL: a query took more than {args.max_ms:.0f} ms")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Local OpenAI-compatible stub for measuring the AI triage path without an API key.
+
+Answers POST /v1/chat/completions after a configurable latency with a valid
+triage reply: the keyword model's analysis of each request, in the
+single-request or batch JSON format the prompt asks for. It can also fail a
+share of calls with HTTP 500, to exercise retries and the circuit breaker.
+It counts calls and the most calls in flight at once.
+
+    python -m benchmarks.stub_llm --port 8765 --latency 0.2
+    # then point LLMClient(api_key="stub", base_url="http://127.0.0.1:8765/v1") at it
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from snowbridge.triage import keyword_triage_batch
+
+ANALYSIS_FIELDS = ("urgency_score", "category", "summary", "is_critical")
+
+
+def _reply_text(messages):
+    """What the model would say: a JSON analysis, or a JSON array of them for a batch prompt."""
+    prompt = messages[-1]["content"]
+    if prompt.lstrip().startswith("["):
+        items = json.loads(prompt)
+        analyses = keyword_triage_batch([{"request_text": item["request"], "title": item.get("title", "")} for item in items])
+        return json.dumps([
+            {"id": item["id"], **{field: analysis[field] for field in ANALYSIS_FIELDS}}
+            for item, analysis in zip(items, analyses)
+        ])
+    fields = dict(line.split(": ", 1) for line in prompt.splitlines() if ": " in line)
+    analysis = keyword_triage_batch([{"request_text": fields.get("Request", ""), "title": fields.get("Title", "")}])[0]
+    return json.dumps({field: analysis[field] for field in ANALYSIS_FIELDS})
+
+
+class StubLLMServer:
+    """
+    The stub in a background thread. `latency` seconds per call (plus up to
+    `jitter` more), and `error_rate` of calls answered with HTTP 500.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.05, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub._lock:
+                    stub.calls += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    delay = stub.latency + stub._rng.uniform(0, stub.jitter)
+                    fail = stub._rng.random() < stub.error_rate
+                try:
+                    time.sleep(delay)
+                    if fail:
+                        with stub._lock:
+                            stub.errors += 1
+                        self._send(500, {"error": {"message": "stub failure", "type": "server_error"}})
+                        return
+                    text = _reply_text(body["messages"])
+                    prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+                    completion_tokens = len(text) // 4
+                    self._send(200, {
+                        "id": f"chatcmpl-stub-{stub.calls}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    })
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = self.errors = self.max_in_flight = 0
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "max_in_flight": self.max_in_flight}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.05, help="up to this many extra seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with HTTP 500")
+    args = parser.parse_args()
+
+    stub = StubLLMServer(args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Stub LLM listening on {stub.base_url} (Ctrl+C to stop)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
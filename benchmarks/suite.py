@@ -0,0 +1,269 @@
+"""
+Benchmark suite: how the app's hot paths behave as the backlog grows.
+
+For each backlog size, a fresh store is filled with synthetic storm load
+(snowbridge.loadgen) and the indexes the app registers, then these are timed:
+  - triage.fallback     keyword triage_request() for one submission
+  - feed.page           one page of the volunteer feed (priority index)
+  - feed.filter_sort    the same page by filtering + sorting every job
+  - feed.nearby         "near me" radius query
+  - feed.search         keyword search with a status filter
+  - claim               claiming one job
+  - cards.render        formatting one page of cards, and the same from the card cache
+  - stats.sidebar       sidebar totals, and stats.dashboard for the dashboard figures
+The AI path runs against a local OpenAI-compatible stub (benchmarks.stub_llm)
+at several concurrency levels, plus a batch run and a flaky-API run.
+
+Results go to a JSON file (one record per benchmark and size) so runs can be
+compared; --compare prints the change from an earlier file.
+
+Run from the project root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 1000,10000 --compare benchmarks/results/<earlier>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_llm import StubLLMServer
+from snowbridge.cards import CardCache, render_card
+from snowbridge.feed import priority_key
+from snowbridge.geo import SpatialIndex
+from snowbridge.llm import LLMClient
+from snowbridge.loadgen import load_towns, storm_jobs
+from snowbridge.search import SearchIndex
+from snowbridge.stats import JobStats
+from snowbridge.store import STATUS_OPEN, JobStore
+from snowbridge.triage import triage_batch, triage_request
+
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PAGE_SIZE = 20
+SEARCH_QUERIES = ["oxygen", "wheelchair ramp", "driveway", "roof", "doctor appointment"]
+# A benchmark this much slower than in the compared run is flagged, unless it only
+# lost a few microseconds (timer noise on the sub-millisecond paths)
+REGRESSION_RATIO = 1.2
+REGRESSION_MIN_MS = 0.05
+
+
+def summarize(samples):
+    """Timing figures in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(call, runs):
+    """Times `call(i)` for i in range(runs)."""
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_backlog(size, seed, runs):
+    """Every backlog benchmark at one size; returns result records."""
+    results = []
+
+    def record(name, figures):
+        results.append({"benchmark": name, "size": size, **figures})
+        print(f"  {name:<18} p50 {figures['p50_ms']:9.3f} ms   p95 {figures['p95_ms']:9.3f} ms   ({figures['runs']} runs)")
+
+    jobs = storm_jobs(size, seed=seed)
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "suite.db"))
+        started = time.perf_counter()
+        for start in range(0, size, 5000):
+            store.insert_many(jobs[start:start + 5000], actor="loadgen")
+        load_seconds = time.perf_counter() - started
+        results.append({"benchmark": "store.load", "size": size, "seconds": load_seconds, "jobs_per_second": size / load_seconds})
+        print(f"  {'store.load':<18} {load_seconds:.2f}s ({size / load_seconds:,.0f} jobs/s)")
+
+        # The indexes app.py registers
+        spatial_index, job_stats, search_index = SpatialIndex(), JobStats(), SearchIndex()
+        for index in (spatial_index, job_stats, search_index):
+            store.register_index(index)
+
+        sample = rng.sample(jobs, min(len(jobs), 500))
+        record("triage.fallback", measure(lambda i: triage_request(sample[i % len(sample)]["request_text"],
+                                                                   sample[i % len(sample)]["title"]), runs * 5))
+
+        pages = max(1, store.count_open() // PAGE_SIZE)
+        record("feed.page", measure(lambda i: store.list_open(limit=PAGE_SIZE, offset=rng.randrange(pages) * PAGE_SIZE), runs * 5))
+        record("feed.filter_sort", measure(
+            lambda i: sorted((job for job in store.list_all() if job["status"] == STATUS_OPEN), key=priority_key)[:PAGE_SIZE],
+            max(3, runs // 10),
+        ))
+        towns = load_towns()
+        record("feed.nearby", measure(lambda i: spatial_index.nearby(*towns[i % len(towns)][2:], 10, limit=500), runs))
+        record("feed.search", measure(
+            lambda i: search_index.search(SEARCH_QUERIES[i % len(SEARCH_QUERIES)], status=STATUS_OPEN, limit=PAGE_SIZE), runs
+        ))
+
+        open_ids = [job["id"] for job in store.list_open()]
+        claim_ids = rng.sample(open_ids, min(len(open_ids), runs * 2))
+        record("claim", measure(lambda i: store.claim(claim_ids[i], claimant="bench"), len(claim_ids)))
+
+        page = store.list_open(limit=PAGE_SIZE)
+        record("cards.render", measure(lambda i: [render_card(job) for job in page], runs))
+        cache = CardCache()
+        for job in page:
+            cache.get(job)
+        record("cards.cached", measure(lambda i: [cache.get(job) for job in page], runs * 5))
+
+        record("stats.sidebar", measure(lambda i: job_stats.count_by_status(), runs * 5))
+        record("stats.dashboard", measure(lambda i: job_stats.snapshot(), runs * 5))
+        store.close()
+    return results
+
+
+def bench_llm(latency, concurrency_levels, seed):
+    """AI triage against the stub: latency and throughput by concurrency, batching, and a flaky API."""
+    results = []
+    requests = [{"id": i, "title": job["title"], "location": job["location"], "request_text": f"{job['request_text']} (#{i})"}
+                for i, job in enumerate(storm_jobs(400, seed=seed))]
+    stub = StubLLMServer(latency=latency, seed=seed).start()
+    try:
+        for concurrency in concurrency_levels:
+            stub.reset_stats()
+            llm = LLMClient("stub", base_url=stub.base_url)
+            batch = requests[:max(16, 4 * concurrency)]
+            samples = []
+
+            def one(req):
+                started = time.perf_counter()
+                triage_request(req["request_text"], req["title"], req["location"], llm=llm)
+                samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(one, batch))
+            seconds = time.perf_counter() - started
+            figures = summarize(samples)
+            results.append({
+                "benchmark": "llm.single", "size": len(batch), "concurrency": concurrency, **figures,
+                "requests_per_second": len(batch) / seconds, "max_in_flight": stub.stats()["max_in_flight"],
+                "fallback_rate": llm.stats()["fallback_rate"],
+            })
+            print(f"  llm.single x{concurrency:<3} p50 {figures['p50_ms']:7.1f} ms   p95 {figures['p95_ms']:7.1f} ms   "
+                  f"{len(batch) / seconds:6.1f} req/s   {stub.stats()['max_in_flight']} in flight")
+
+        stub.reset_stats()
+        llm = LLMClient("stub", base_url=stub.base_url)
+        started = time.perf_counter()
+        triage_batch(requests, llm=llm)
+        seconds = time.perf_counter() - started
+        results.append({
+            "benchmark": "llm.batch", "size": len(requests), "seconds": seconds,
+            "requests_per_second": len(requests) / seconds, "calls": stub.stats()["calls"],
+        })
+        print(f"  llm.batch          {len(requests)} requests in {stub.stats()['calls']} calls, {seconds:.2f}s "
+              f"({len(requests) / seconds:.0f} req/s)")
+
+        # A third of calls fail: retries stretch latency, the breaker may trip and fall back to keywords
+        stub.error_rate = 0.33
+        stub.reset_stats()
+        llm = LLMClient("stub", base_url=stub.base_url)
+        flaky = requests[:64]
+        figures = measure(lambda i: triage_request(flaky[i]["request_text"], flaky[i]["title"], llm=llm), len(flaky))
+        stats = llm.stats()
+        results.append({
+            "benchmark": "llm.flaky", "size": len(flaky), **figures, "error_rate": stub.error_rate,
+            "fallback_rate": stats["fallback_rate"], "breaker_state": stats["breaker_state"],
+        })
+        print(f"  llm.flaky          p50 {figures['p50_ms']:7.1f} ms   p95 {figures['p95_ms']:7.1f} ms   "
+              f"fallback rate {stats['fallback_rate']:.0%}, breaker {stats['breaker_state']}")
+    finally:
+        stub.stop()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _key(result):
+    return result["benchmark"], result["size"], result.get("concurrency")
+
+
+def compare(results, path):
+    """Prints each benchmark's change from an earlier results file; returns how many got slower."""
+    with open(path, encoding="utf-8") as f:
+        earlier = {_key(result): result for result in json.load(f)["results"]}
+    slower = 0
+    print(f"\nCompared with {path}:")
+    for result in results:
+        before = earlier.get(_key(result))
+        metric = "p50_ms" if "p50_ms" in result else "seconds"
+        if not before or not before.get(metric):
+            continue
+        ratio = result[metric] / before[metric]
+        lost_ms = (result[metric] - before[metric]) * (1 if metric == "p50_ms" else 1000)
+        flag = "  SLOWER" if ratio > REGRESSION_RATIO and lost_ms > REGRESSION_MIN_MS else ""
+        slower += bool(flag)
+        name = result["benchmark"] + (f" x{result['concurrency']}" if result.get("concurrency") else "")
+        print(f"  {name:<18} {result['size']:>7}  {before[metric]:10.3f} -> {result[metric]:10.3f} ({ratio:.2f}x){flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated backlog sizes")
+    parser.add_argument("--runs", type=int, default=100, help="base number of runs per benchmark")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub seconds per call")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated AI triage concurrency levels")
+    parser.add_argument("--skip-llm", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help=f"results file (default: a timestamped file in {DEFAULT_RESULTS_DIR})")
+    parser.add_argument("--compare", help="earlier results file to compare with; exits 1 if anything got slower")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        print(f"Backlog of {size:,} jobs")
+        results.extend(bench_backlog(size, args.seed, args.runs))
+    if not args.skip_llm:
+        print(f"AI triage against the stub ({args.llm_latency * 1000:.0f} ms per call)")
+        results.extend(bench_llm(args.llm_latency, [int(level) for level in args.concurrency.split(",")], args.seed))
+
+    out = args.out or os.path.join(DEFAULT_RESULTS_DIR, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare and compare(results, args.compare):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
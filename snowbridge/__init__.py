@@ -0,0 +1,4 @@
+"""
+SnowBridge core: job storage and dispatch logic shared by the Streamlit views.
+Nothing in this package imports Streamlit, so it can be used from scripts too.
+"""
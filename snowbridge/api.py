@@ -0,0 +1,366 @@
+"""
+Local JSON HTTP API for the request and volunteer flows, so the dispatch
+backend can run headless, in several worker processes, and take load tests.
+
+    python -m snowbridge.api --port 8600 --workers 4
+
+    POST /jobs               {"title", "location", "request_text"}
+                             -> 201 {"job", "duplicate": false}, or 200 with the existing job and "duplicate": true
+    GET  /feed               ?page=1&location=...&radius_km=10&q=...&status=OPEN|CLAIMED|ALL&category=...&min_urgency=0
+                             -> 200 {"jobs", "total", "page", "page_count", "page_size", "location_found", "capped"}
+    POST /jobs/<id>/claim    {"claimant"} -> 200 claimed, 409 already claimed, 404 no such job
+
+Errors come back as {"error": "..."} with a 4xx status.
+
+Each worker is one asyncio event loop with its own SnowBridgeService (job
+store, indexes, AI triage worker) over the same SQLite file; with more than
+one, they share the port with SO_REUSEPORT. Store calls run on a small
+thread pool so a slow one never stalls the loop. A worker picks up other
+workers' writes every SYNC_INTERVAL seconds, so its feed can lag by that
+much; claims are always settled by the database, so a job is only ever
+claimed once whichever worker each volunteer reaches.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from snowbridge.ingest import RowError, validate_row
+from snowbridge.metrics import METRICS
+from snowbridge.service import FEED_PAGE_SIZE, SnowBridgeService, seed_if_empty
+from snowbridge.store import STATUS_CLAIMED, STATUS_OPEN, ClaimResult, JobStore
+
+logger = logging.getLogger(__name__)
+
+# Seconds between picking up other processes' writes
+SYNC_INTERVAL = 0.5
+# Store calls in flight per worker; the store serializes on one lock anyway
+STORE_THREADS = 4
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 30.0
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+MAX_CLAIMANT_LENGTH = 100
+MAX_RADIUS_KM = 50
+# Feed status filter values (None: any status)
+FEED_STATUSES = {"OPEN": STATUS_OPEN, "CLAIMED": STATUS_CLAIMED, "ALL": None}
+
+CLAIM_PATH = re.compile(r"^/jobs/(\d+)/claim$")
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    """A request the API refuses; answered with `status` and {"error": message}."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(params, name, default, low, high):
+    value = params.get(name, [""])[0]
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be a whole number") from None
+    if not low <= number <= high:
+        raise ApiError(400, f"{name} must be between {low} and {high}")
+    return number
+
+
+def feed_args(query_string):
+    """SnowBridgeService.feed_page() arguments from a /feed query string, or ApiError."""
+    params = parse_qs(query_string)
+    status = params.get("status", ["OPEN"])[0].upper()
+    if status not in FEED_STATUSES:
+        raise ApiError(400, f"status must be one of {', '.join(FEED_STATUSES)}")
+    return {
+        "page": _int_param(params, "page", 1, 1, 10 ** 9),
+        "my_location": params.get("location", [""])[0].strip(),
+        "radius_km": _int_param(params, "radius_km", 10, 1, MAX_RADIUS_KM),
+        "query": params.get("q", [""])[0].strip(),
+        "status": FEED_STATUSES[status],
+        "category": params.get("category", [""])[0].strip() or None,
+        "min_urgency": _int_param(params, "min_urgency", 0, 0, 10),
+    }
+
+
+def _json_object(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(400, "body must be JSON") from None
+    if not isinstance(data, dict):
+        raise ApiError(400, "body must be a JSON object")
+    return data
+
+
+class JsonApi:
+    """The HTTP/1.1 front of one SnowBridgeService, on the running event loop."""
+
+    def __init__(self, service, store_threads=STORE_THREADS):
+        self.service = service
+        self._executor = ThreadPoolExecutor(max_workers=store_threads, thread_name_prefix="api-store")
+        self._connections = set()
+
+    async def _call(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: function(*args, **kwargs))
+
+    async def route(self, method, target, body):
+        """(status, payload) for one request."""
+        url = urlsplit(target)
+        if url.path == "/feed":
+            if method != "GET":
+                raise ApiError(405, "use GET")
+            args = feed_args(url.query)
+            feed = await self._call(self.service.feed_page, **args)
+            distances, towns = feed["distances"], feed["towns"]
+            return 200, {
+                "jobs": [{**job, "distance_km": distances.get(job["id"]), "town": towns.get(job["id"])}
+                         for job in feed["jobs"]],
+                "total": feed["total_open"],
+                "page": feed["page"],
+                "page_count": feed["page_count"],
+                "page_size": FEED_PAGE_SIZE,
+                "location_found": feed["my_point"] is not None if args["my_location"] else None,
+                "capped": feed["capped"],
+            }
+        if url.path == "/jobs":
+            if method != "POST":
+                raise ApiError(405, "use POST")
+            try:
+                fields = validate_row(_json_object(body))
+            except RowError as e:
+                raise ApiError(400, str(e)) from None
+            job, duplicate = await self._call(self.service.submit, fields["title"], fields["location"], fields["request_text"])
+            return (200 if duplicate else 201), {"job": job, "duplicate": duplicate}
+        match = CLAIM_PATH.match(url.path)
+        if match:
+            if method != "POST":
+                raise ApiError(405, "use POST")
+            claimant = _json_object(body).get("claimant") or ""
+            if not isinstance(claimant, str) or len(claimant) > MAX_CLAIMANT_LENGTH:
+                raise ApiError(400, f"claimant must be text of at most {MAX_CLAIMANT_LENGTH} characters")
+            job_id = int(match.group(1))
+            result = await self._call(self.service.claim, job_id, claimant.strip())
+            if result == ClaimResult.NOT_FOUND:
+                raise ApiError(404, f"no job #{job_id}")
+            if result == ClaimResult.ALREADY_CLAIMED:
+                raise ApiError(409, f"job #{job_id} was already claimed")
+            return 200, {"job": await self._call(self.service.store.get, job_id)}
+        raise ApiError(404, f"no route for {url.path}")
+
+    async def _respond(self, method, target, body):
+        started = time.perf_counter()
+        try:
+            status, payload = await self.route(method, target, body)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        path = urlsplit(target).path
+        route = "feed" if path == "/feed" else "submit" if path == "/jobs" else "claim" if CLAIM_PATH.match(path) else "other"
+        METRICS.observe("api_request", time.perf_counter() - started, route=route, status=status)
+        return status, payload
+
+    async def handle(self, reader, writer):
+        """Serves one connection: requests one after another for as long as it's kept alive."""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 413, {"error": "headers too large"}, keep_alive=False)
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    await self._write(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    await self._write(writer, 400, {"error": "bad Content-Length"}, keep_alive=False)
+                    return
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {"error": f"body is over {MAX_BODY_BYTES} bytes"}, keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    status, payload = await self._respond(method, target, body)
+                except Exception:
+                    logger.exception("Unhandled error for %s %s", method, target)
+                    status, payload = 500, {"error": "internal error"}
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _write(writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    async def _sync_forever(self):
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            await self._call(self.service.sync)
+
+    async def serve(self, host="127.0.0.1", port=8600, reuse_port=False, on_ready=None):
+        """
+        Serves until cancelled, or until SIGTERM/SIGINT when run on the main
+        thread. `on_ready()` is called once the port is listening.
+        """
+        server = await asyncio.start_server(self.handle, host, port, reuse_port=reuse_port or None,
+                                            limit=MAX_HEADER_BYTES, backlog=1024)
+        syncing = asyncio.create_task(self._sync_forever())
+        loop = asyncio.get_running_loop()
+        serving = asyncio.current_task()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, serving.cancel)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # not the main thread, or no loop signal handlers on this platform
+        if on_ready is not None:
+            on_ready()
+        try:
+            await server.serve_forever()
+        finally:
+            server.close()
+            # Idle keep-alive connections would otherwise hold the shutdown open
+            for writer in list(self._connections):
+                writer.close()
+            syncing.cancel()
+            self._executor.shutdown(wait=False)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _run_worker(db_path, host, port, reuse_port, ready=None):
+    """
+    One worker process (or the only one): its own service and event loop
+    until interrupted. `ready` (an Event) is set once it's listening; without
+    one, it says so on stdout instead.
+    """
+    # SIGTERM (process managers, the parent shutting down) stops as cleanly as Ctrl+C;
+    # once serving, the event loop handles it instead
+    signal.signal(signal.SIGTERM, _interrupt)
+    if ready is not None:
+        on_ready = ready.set
+    else:
+        on_ready = functools.partial(print, f"SnowBridge API on http://{host}:{port} (1 worker)", flush=True)
+    service = None
+    try:
+        service = SnowBridgeService.from_env(db_path, seed=False)
+        service.warm_up(freeze=True)
+        asyncio.run(JsonApi(service).serve(host, port, reuse_port=reuse_port, on_ready=on_ready))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        if service is not None:
+            service.close()
+
+
+def run(db_path, host="127.0.0.1", port=8600, workers=1):
+    """
+    Seeds an empty store once, then serves from `workers` processes sharing
+    the port. Blocks until interrupted; returns the exit code.
+    """
+    from snowbridge.geo import load_default_geocoder
+
+    store = JobStore(db_path)
+    try:
+        seed_if_empty(store, load_default_geocoder())
+    finally:
+        store.close()
+
+    if workers == 1:
+        _run_worker(db_path, host, port, False)
+        return 0
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    # Fresh interpreters: nothing (threads, SQLite connections) is inherited from this one
+    context = multiprocessing.get_context("spawn")
+    ready = [context.Event() for _ in range(workers)]
+    processes = [
+        context.Process(target=_run_worker, args=(db_path, host, port, True, event), name=f"snowbridge-api-{i}")
+        for i, event in enumerate(ready)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for event, process in zip(ready, processes):
+            while not event.wait(0.1):
+                if not process.is_alive():
+                    print(f"{process.name} exited during startup", file=sys.stderr)
+                    return 1
+        print(f"SnowBridge API on http://{host}:{port} ({workers} workers)", flush=True)
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("SNOWBRIDGE_DB_PATH", "snowbridge.db"), help="job store path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="processes serving the port (default: 1)")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--workers above 1 needs SO_REUSEPORT, which this platform doesn't have")
+    return run(args.db, args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
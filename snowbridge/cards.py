@@ -0,0 +1,116 @@
+"""
+Volunteer feed cards, formatted to HTML once per job version.
+
+The feed reruns on every click, so cards are memoized on (job id, version,
+distance or town): a rerun only formats the cards that are new or changed since the
+last one, and the store bumps a job's version on every change.
+"""
+
+import html
+import threading
+from collections import OrderedDict
+
+from snowbridge.triage import SOURCE_KEYWORD
+
+
+def urgency_style(urgency_score, is_critical=False):
+    """(card color, badge text, badge color) for an urgency score."""
+    if urgency_score >= 8 or is_critical:
+        return "#ff4444", "🚨 CRITICAL", "#cc0000"
+    if urgency_score >= 4:
+        return "#ff8800", "⚠️ HIGH PRIORITY", "#cc6600"
+    return "#44aa44", "ℹ️ STANDARD", "#228822"
+
+
+def render_card(job, distance_km=None, town=None):
+    """
+    HTML for one job card (pass to st.markdown with unsafe_allow_html).
+    `town` replaces the distance for a job only placed at its town centroid.
+    """
+    analysis = job["ai_analysis"]
+    urgency_score = analysis["urgency_score"]
+    card_color, badge_text, badge_color = urgency_style(urgency_score, analysis.get("is_critical", False))
+    score_source = "Keywords (AI review pending)" if analysis.get("source") == SOURCE_KEYWORD else "AI"
+    keywords = analysis.get("keywords", [])
+    # Kept on the request's line: a blank line would end the HTML block in markdown
+    keyword_line = (
+        f'<p style="margin: 5px 0; color: #666;">🔑 Flagged for: <strong>{html.escape(", ".join(keywords))}</strong></p>'
+        if keywords else ""
+    )
+    if town is not None:
+        distance_text = f" · in {html.escape(town)}"
+    elif distance_km is not None:
+        distance_text = f" · {distance_km:.1f} km away"
+    else:
+        distance_text = ""
+    similar_line = (
+        f'<p style="margin: 5px 0; color: #666;">🔁 Much like request #{job["similar_to"]} from another address</p>'
+        if job.get("similar_to") is not None else ""
+    )
+    return f"""
+<div style="
+    border-left: 5px solid {card_color};
+    padding: 15px;
+    margin: 10px 0;
+    background-color: #ffffff;
+    border-radius: 5px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+">
+    <div style="display: flex; justify-content: space-between; align-items: start;">
+        <div>
+            <h3 style="margin: 0; color: #333;">{html.escape(job.get('title') or 'Snow Removal Request')}</h3>
+            <p style="margin: 5px 0; color: #666;">📍 {html.escape(job['location'])}{distance_text}</p>
+        </div>
+        <span style="
+            background-color: {badge_color};
+            color: white;
+            padding: 5px 10px;
+            border-radius: 15px;
+            font-size: 12px;
+            font-weight: bold;
+        ">{badge_text}</span>
+    </div>
+    <p style="margin: 10px 0; color: #444;">{html.escape(job['request_text'])}</p>{keyword_line}{similar_line}
+    <div style="display: flex; gap: 15px; margin-top: 10px;">
+        <span style="color: #666;">📊 Urgency: <strong>{urgency_score}/10</strong></span>
+        <span style="color: #666;">🏷️ Category: <strong>{html.escape(analysis['category'])}</strong></span>
+        <span style="color: #666;">🆔 ID: <strong>#{job['id']}</strong></span>
+        <span style="color: #666;">🤖 Scored by: <strong>{score_source}</strong></span>
+    </div>
+</div>
+"""
+
+
+class CardCache:
+    """
+    LRU of rendered cards keyed on (id, version, distance rounded as shown, town).
+    One instance is shared by every session; a stale version is never
+    served, it just ages out.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, job, distance_km=None, town=None):
+        key = (job["id"], job.get("version"), None if distance_km is None else round(distance_km, 1), town)
+        with self._lock:
+            card = self._cards.get(key)
+            if card is not None:
+                self._cards.move_to_end(key)
+                self.hits += 1
+                return card
+            self.misses += 1
+        card = render_card(job, distance_km, town)
+        with self._lock:
+            self._cards[key] = card
+            if len(self._cards) > self.max_entries:
+                self._cards.popitem(last=False)
+        return card
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._cards)}
@@ -0,0 +1,68 @@
+"""
+Change feed behind live feed updates.
+
+The store records every change it makes or picks up from other processes
+here, numbered by a process-local version that only goes up. A session that
+remembers the last version it saw can ask for just what changed since then,
+or wait until something does, instead of re-reading the whole feed.
+"""
+
+import threading
+from collections import deque, namedtuple
+
+# What happened to a job
+CHANGE_INSERT = "insert"
+CHANGE_UPDATE = "update"
+CHANGE_CLAIM = "claim"
+CHANGE_DELETE = "delete"
+
+Change = namedtuple("Change", "version job_id kind")
+
+
+class ChangeFeed:
+    """
+    The last `max_entries` changes in version order. A reader further
+    behind than that (or from before a reset) gets None from `since()` and
+    should reload instead.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.version = 0
+        self._floor = 0  # every change after this version is still buffered
+        self._entries = deque(maxlen=max_entries)
+        self._changed = threading.Condition()
+
+    def record(self, job_id, kind):
+        with self._changed:
+            if len(self._entries) == self._entries.maxlen:
+                self._floor = self._entries[0].version
+            self.version += 1
+            self._entries.append(Change(self.version, job_id, kind))
+            self._changed.notify_all()
+
+    def reset(self):
+        """Everything changed (the store was reset or reloaded)."""
+        with self._changed:
+            self.version += 1
+            self._entries.clear()
+            self._floor = self.version
+            self._changed.notify_all()
+
+    def since(self, version):
+        """Changes after `version`, oldest first; None if they're no longer all buffered."""
+        with self._changed:
+            if version < self._floor:
+                return None
+            newer = []
+            for change in reversed(self._entries):
+                if change.version <= version:
+                    break
+                newer.append(change)
+        newer.reverse()
+        return newer
+
+    def wait(self, version, timeout=None):
+        """Blocks until something changes after `version` (or `timeout`); returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
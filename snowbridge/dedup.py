@@ -0,0 +1,235 @@
+"""
+Near-duplicate request detection.
+
+Each job's request text is reduced to a MinHash signature and bucketed with
+LSH (locality-sensitive hashing): the signature is cut into bands, and jobs
+sharing any band land in the same bucket. A new request is only compared
+with the jobs in its buckets plus the jobs at the same normalized address,
+so checking it costs about the same with 100 jobs or 100,000.
+
+Only open jobs submitted within DEDUP_WINDOW_SECONDS are candidates: a
+request about a job a volunteer already took, or from yesterday's storm,
+is a new need.
+"""
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from snowbridge.store import STATUS_OPEN
+from snowbridge.text import normalize_location
+
+NUM_PERM = 64
+BANDS = 16            # 16 bands x 4 rows: pairs above ~0.5 similarity usually share a band
+ROWS = NUM_PERM // BANDS
+
+# Same normalized address and at least this similar: the same household again
+SAME_LOCATION_THRESHOLD = 0.5
+# This similar at another address: possibly the same situation reported from
+# elsewhere (e.g. a relative), but it may be a neighbor with the same problem,
+# so it's only flagged for a coordinator
+ANY_LOCATION_THRESHOLD = 0.8
+# Only jobs submitted this recently are matched
+DEDUP_WINDOW_SECONDS = 24 * 3600
+
+# Multiply-shift hash family: (a * x + b) mod 2**64, top 32 bits. a must be odd.
+_rng = np.random.default_rng(2024)  # fixed seed so signatures are reproducible
+_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+def shingles(text):
+    """Words and word pairs of the normalized text."""
+    words = re.findall(r"\w+", (text or "").lower().replace("’", "'"))
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint64s) of a request text."""
+    tokens = shingles(text)
+    if not tokens:
+        return np.full(NUM_PERM, 1 << 32, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    # uint64 arithmetic wraps, which is the "mod 2**64" of the hash family
+    return ((np.outer(_A, hashes) + _B[:, None]) >> _SHIFT).min(axis=1)
+
+
+# Shingle hashes per block in minhash_many(); bounds its temporary (NUM_PERM x block) array
+MINHASH_BLOCK = 65536
+
+
+def minhash_many(texts):
+    """
+    MinHash signatures of many texts at once (one row per text), equal to
+    calling minhash() on each: the hash family runs over every shingle of a
+    block of texts in one NumPy operation and reduceat() takes each text's minimum.
+    """
+    token_sets = [shingles(text) for text in texts]
+    counts = np.fromiter((len(tokens) for tokens in token_sets), dtype=np.int64, count=len(token_sets))
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for tokens in token_sets for token in tokens),
+        dtype=np.uint64,
+        count=int(counts.sum()),
+    )
+    signatures = np.full((len(texts), NUM_PERM), 1 << 32, dtype=np.uint64)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    first = 0
+    while first < len(texts):
+        # Texts [first, last) whose shingles fit in one block (always at least one text)
+        last = max(first + 1, int(np.searchsorted(ends, starts[first] + MINHASH_BLOCK, side="right")))
+        rows = np.arange(first, last)
+        rows = rows[counts[first:last] > 0]
+        if len(rows):
+            block = hashes[starts[first]:ends[last - 1]]
+            values = (np.outer(_A, block) + _B[:, None]) >> _SHIFT
+            signatures[rows] = np.minimum.reduceat(values, starts[rows] - starts[first], axis=1).T
+        first = last
+    return signatures
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERM
+
+
+# Each band's rows are mixed into one 64-bit int bucket key (salted per band so
+# bands never share buckets); a rare collision only adds a candidate to check
+_BAND_MIX = _rng.integers(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 2 ** 63, BANDS, dtype=np.uint64)
+
+
+def _band_keys(signatures):
+    """Bucket keys, one row of BANDS ints per signature row."""
+    rows = signatures.reshape(len(signatures), BANDS, ROWS)
+    return ((rows * _BAND_MIX).sum(axis=2, dtype=np.uint64) + _BAND_SALT).tolist()
+
+
+def _bands(signature):
+    return _band_keys(signature[None, :])[0]
+
+
+class DuplicateIndex:
+    """
+    LSH buckets plus an address index over open jobs. Register it with
+    `JobStore.register_index()` so it follows inserts, claims and resets.
+    It also lists the open jobs stored with a `similar_to` flag, for
+    coordinators to review.
+    """
+
+    def __init__(self, status=STATUS_OPEN, window_seconds=DEDUP_WINDOW_SECONDS, clock=time.time):
+        self.status = status
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._buckets = {}
+        self._by_location = {}
+        self._flagged = {}  # id -> id of the similar job
+        # id -> (request text, location key, signature, created_at)
+        self._entries = {}
+        # (id, entry) of the last removed job: the store replaces a job (re-score)
+        # as remove + add, so an unchanged job isn't re-hashed
+        self._removed = None
+        # find() is called from sessions while the store updates the index
+        self._lock = threading.Lock()
+
+    def _entry(self, job):
+        entry = self._entries.get(job["id"])
+        if entry is None and self._removed is not None and self._removed[0] == job["id"]:
+            entry = self._removed[1]
+        self._removed = None
+        if entry is None or entry[0] != job["request_text"]:
+            entry = (job["request_text"], normalize_location(job["location"]), minhash(job["request_text"]),
+                     job.get("created_at") or 0.0)
+            self._entries[job["id"]] = entry
+        return entry
+
+    def _insert(self, job, location_key, bands):
+        for band in bands:
+            self._buckets.setdefault(band, set()).add(job["id"])
+        self._by_location.setdefault(location_key, set()).add(job["id"])
+        if job.get("similar_to") is not None:
+            self._flagged[job["id"]] = job["similar_to"]
+
+    def add(self, job):
+        with self._lock:
+            if job["status"] != self.status:
+                # Claimed: never a candidate again, so its signature isn't worth keeping
+                self._entries.pop(job["id"], None)
+                self._removed = None
+                return
+            _, location_key, signature, _ = self._entry(job)
+            self._insert(job, location_key, _bands(signature))
+
+    def add_many(self, jobs):
+        """Bulk load with the signatures and bucket keys computed together (see minhash_many())."""
+        jobs = [job for job in jobs if job["status"] == self.status]
+        if not jobs:
+            return
+        with self._lock:
+            missing = [job for job in jobs if self._entries.get(job["id"], (None,))[0] != job["request_text"]]
+            for job, signature in zip(missing, minhash_many([job["request_text"] for job in missing])):
+                self._entries[job["id"]] = (job["request_text"], normalize_location(job["location"]), signature,
+                                            job.get("created_at") or 0.0)
+            entries = [self._entries[job["id"]] for job in jobs]
+            band_keys = _band_keys(np.stack([entry[2] for entry in entries]))
+            for job, entry, bands in zip(jobs, entries, band_keys):
+                self._insert(job, entry[1], bands)
+
+    def remove(self, job):
+        with self._lock:
+            entry = self._entries.pop(job["id"], None)
+            if entry is None:
+                return
+            self._removed = (job["id"], entry)
+            _, location_key, signature, _ = entry
+            for band in _bands(signature):
+                self._buckets.get(band, set()).discard(job["id"])
+            self._by_location.get(location_key, set()).discard(job["id"])
+            self._flagged.pop(job["id"], None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets = {}
+            self._by_location = {}
+            self._flagged = {}
+            self._entries = {}
+            self._removed = None
+
+    def find(self, location, request_text):
+        """
+        Best near-duplicate of a new request among recent open jobs, as
+        (job_id, similarity, same_location), or None. A match at the same
+        address is the same household asking again; one elsewhere is only a
+        lead for a coordinator. Needs no model call, so it can run before AI triage.
+        """
+        signature = minhash(request_text)
+        location_key = normalize_location(location)
+        oldest = self._clock() - self.window_seconds
+        with self._lock:
+            same_location = set(self._by_location.get(location_key, ()))
+            candidates = set(same_location)
+            for band in _bands(signature):
+                candidates |= self._buckets.get(band, set())
+            signatures = {
+                job_id: self._entries[job_id][2] for job_id in candidates
+                if job_id in self._entries and self._entries[job_id][3] >= oldest
+            }
+
+        best = None
+        for job_id, candidate in signatures.items():
+            score = similarity(signature, candidate)
+            same = job_id in same_location
+            threshold = SAME_LOCATION_THRESHOLD if same else ANY_LOCATION_THRESHOLD
+            # A match at the same address beats any match elsewhere
+            if score >= threshold and (best is None or (same, score) > (best[2], best[1])):
+                best = (job_id, score, same)
+        return best
+
+    def flagged(self, limit=None):
+        """[(job_id, similar job id)] of open jobs flagged as possibly repeating another, newest first."""
+        with self._lock:
+            flagged = sorted(self._flagged.items(), reverse=True)
+        return flagged[:limit] if limit is not None else flagged
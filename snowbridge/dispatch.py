@@ -0,0 +1,412 @@
+"""
+Dispatcher mode: assigns open jobs to a roster of volunteers in bulk.
+
+Each volunteer has a location, a capacity (how many jobs they can take) and
+some equipment. Giving a job to a volunteer is worth the job's urgency minus
+a travel cost per km, and the solver maximizes the total:
+
+  1. candidates: for every job, the CANDIDATES best-valued volunteers within
+     reach who carry the equipment it needs (NumPy, a chunk of jobs at a time)
+  2. greedy: candidate pairs are taken best first while capacity lasts
+  3. local improvement: an unassigned job takes a full volunteer's slot when
+     the job in that slot can move on (to spare capacity, or in place of a
+     weaker job elsewhere), and assigned jobs swap volunteers to cut travel
+
+After a solve, `add()` and `remove()` update the plan one job at a time, so a
+Dispatcher registered with `JobStore.register_index()` follows new requests
+and claims without solving again.
+"""
+
+import re
+import threading
+
+import numpy as np
+
+from snowbridge.geo import EARTH_RADIUS_KM
+from snowbridge.store import STATUS_OPEN
+
+MAX_TRAVEL_KM = 15.0
+# Urgency points an assignment loses per km travelled
+TRAVEL_COST_PER_KM = 0.2
+# Volunteers considered per job; keeps the greedy and improvement steps linear in jobs
+CANDIDATES = 10
+# Jobs per distance matrix (JOB_CHUNK x volunteers floats at a time)
+JOB_CHUNK = 2048
+MAX_IMPROVEMENT_ROUNDS = 3
+
+# Words in a request that mean a volunteer needs special equipment
+EQUIPMENT_NEEDS = {"roof": "roof rake", "ice": "salt", "icy": "salt"}
+_NEEDS_PATTERN = re.compile(r"\b(" + "|".join(map(re.escape, EQUIPMENT_NEEDS)) + r")\b", re.IGNORECASE)
+# Equipment kinds fit in the bits of an int64 mask
+MAX_EQUIPMENT_KINDS = 62
+
+
+def required_equipment(job):
+    """Equipment a job needs, from words in its title and request ("roof" -> roof rake)."""
+    text = f"{job.get('title', '')} {job.get('request_text', '')}"
+    return {EQUIPMENT_NEEDS[word.lower()] for word in _NEEDS_PATTERN.findall(text)}
+
+
+def distances_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in km between arrays of points (broadcasts)."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lon2 - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _unit_vectors(lat, lon):
+    """Points on the unit sphere, one row per (lat, lon); their dot product falls with distance."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+class Dispatcher:
+    """
+    Assignment of open jobs to `volunteers`, dicts with "name", "lat", "lon",
+    "capacity" and optionally "equipment" (names, e.g. ["snowblower", "salt"]).
+    Jobs without coordinates can't be routed and are only counted.
+    `improvement_rounds` caps the local-search rounds after the greedy
+    pass (0 keeps the greedy plan).
+    """
+
+    def __init__(self, volunteers, max_travel_km=MAX_TRAVEL_KM, travel_cost=TRAVEL_COST_PER_KM,
+                 candidates=CANDIDATES, status=STATUS_OPEN, improvement_rounds=MAX_IMPROVEMENT_ROUNDS):
+        self.names = [volunteer["name"] for volunteer in volunteers]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("volunteer names must be unique")
+        self.max_travel_km = max_travel_km
+        self.travel_cost = travel_cost
+        self.candidates = candidates
+        self.status = status
+        self.improvement_rounds = improvement_rounds
+        self._equipment_bits = {}
+        self._lat = np.array([float(volunteer["lat"]) for volunteer in volunteers])
+        self._lon = np.array([float(volunteer["lon"]) for volunteer in volunteers])
+        self._points = _unit_vectors(self._lat, self._lon)
+        # Dot product of unit vectors at exactly max_travel_km apart (slightly loosened for rounding)
+        self._min_closeness = np.cos(max_travel_km / EARTH_RADIUS_KM) - 1e-12
+        self._capacity = [max(0, int(volunteer.get("capacity", 1))) for volunteer in volunteers]
+        self._masks = np.array([self._mask(volunteer.get("equipment", ())) for volunteer in volunteers], dtype=np.int64)
+        self._available = np.array(self._capacity) > 0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._urgency = {}       # job id -> urgency score
+        self._values = {}        # job id -> {volunteer index: value}, best first
+        self._reachable = [set() for _ in self.names]  # volunteer index -> jobs listing it as a candidate
+        self._assigned = {}      # job id -> volunteer index
+        self._held = [set() for _ in self.names]       # volunteer index -> assigned job ids
+        self._unplaced = set()   # open jobs without coordinates
+
+    def _mask(self, equipment):
+        mask = 0
+        for name in equipment:
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name not in self._equipment_bits:
+                if len(self._equipment_bits) == MAX_EQUIPMENT_KINDS:
+                    raise ValueError(f"more than {MAX_EQUIPMENT_KINDS} kinds of equipment")
+                self._equipment_bits[name] = len(self._equipment_bits)
+            mask |= 1 << self._equipment_bits[name]
+        return mask
+
+    def _spare(self, volunteer):
+        return len(self._held[volunteer]) < self._capacity[volunteer]
+
+    def _candidate_values(self, jobs):
+        """For each job, {volunteer index: value} of its best reachable volunteers, best first."""
+        if not self.names:
+            return [{} for _ in jobs]
+        lat = np.array([float(job["lat"]) for job in jobs])
+        lon = np.array([float(job["lon"]) for job in jobs])
+        urgency = np.array([self._job_urgency(job) for job in jobs], dtype=float)[:, None]
+        needs = np.array([self._mask(required_equipment(job)) for job in jobs], dtype=np.int64)[:, None]
+
+        # Within a row urgency is fixed, so the best volunteers are the nearest usable ones:
+        # rank by the dot product of unit vectors (one matrix product), then measure those k
+        closeness = _unit_vectors(lat, lon) @ self._points.T
+        usable = (closeness >= self._min_closeness) & ((needs & ~self._masks[None, :]) == 0) & self._available
+        closeness = np.where(usable, closeness, -np.inf)
+
+        k = min(self.candidates, len(self.names))
+        top = np.argpartition(-closeness, k - 1, axis=1)[:, :k]
+        reachable = np.take_along_axis(closeness, top, axis=1) > -np.inf
+        value = urgency - self.travel_cost * distances_km(lat[:, None], lon[:, None], self._lat[top], self._lon[top])
+        value = np.where(reachable & (value > 0), value, -np.inf)
+        order = np.argsort(-value, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1).tolist()
+        value = np.take_along_axis(value, order, axis=1).tolist()
+        return [
+            {volunteer: score for volunteer, score in zip(volunteers, scores) if score != -np.inf}
+            for volunteers, scores in zip(top, value)
+        ]
+
+    @staticmethod
+    def _job_urgency(job):
+        return int(job["ai_analysis"]["urgency_score"])
+
+    def _track(self, job, values):
+        self._urgency[job["id"]] = self._job_urgency(job)
+        self._values[job["id"]] = values
+        for volunteer in values:
+            self._reachable[volunteer].add(job["id"])
+
+    def _untrack(self, job_id):
+        for volunteer in self._values.pop(job_id, {}):
+            self._reachable[volunteer].discard(job_id)
+        self._urgency.pop(job_id, None)
+
+    def _assign(self, job_id, volunteer):
+        previous = self._assigned.get(job_id)
+        if previous is not None:
+            self._held[previous].discard(job_id)
+        self._assigned[job_id] = volunteer
+        self._held[volunteer].add(job_id)
+
+    def _unassign(self, job_id):
+        volunteer = self._assigned.pop(job_id, None)
+        if volunteer is not None:
+            self._held[volunteer].discard(job_id)
+        return volunteer
+
+    def _routable(self, job):
+        return job.get("lat") is not None and job.get("lon") is not None
+
+    def solve(self, jobs):
+        """Plans `jobs` (the open ones) from scratch and returns `assignments()`."""
+        with self._lock:
+            self._reset()
+            routable = []
+            for job in jobs:
+                if job["status"] != self.status:
+                    continue
+                if self._routable(job):
+                    routable.append(job)
+                else:
+                    self._unplaced.add(job["id"])
+            for start in range(0, len(routable), JOB_CHUNK):
+                chunk = routable[start:start + JOB_CHUNK]
+                for job, values in zip(chunk, self._candidate_values(chunk)):
+                    self._track(job, values)
+
+            pairs = sorted(
+                (-value, job_id, volunteer)
+                for job_id, values in self._values.items()
+                for volunteer, value in values.items()
+            )
+            for _, job_id, volunteer in pairs:
+                if job_id not in self._assigned and self._spare(volunteer):
+                    self._assign(job_id, volunteer)
+            self._improve()
+        return self.assignments()
+
+    def _improve(self):
+        """
+        Local moves greedy alone never finds, repeated while the total value
+        goes up. Relocation: an unassigned job J takes a slot of volunteer V
+        whose job K moves on, to a volunteer W with spare capacity or, once
+        everyone is full, into the slot of W's weakest job, which is dropped.
+        Exchange: two assigned jobs trade volunteers when that shortens the
+        travel.
+        """
+        for _ in range(self.improvement_rounds):
+            improved = self._relocate()
+            if not self._exchange() and not improved:
+                return
+
+    def _weakest(self, volunteer):
+        return min(self._held[volunteer], key=lambda held: (self._values[held][volunteer], -held))
+
+    def _relocation_gain(self, job_id, volunteer, target, dropped):
+        """Value gained by moving assigned `job_id` from `volunteer` to `target`, dropping `dropped` there."""
+        if target == volunteer or target not in self._values[job_id]:
+            return None
+        if dropped is None:
+            if not self._spare(target):
+                return None
+            lost = 0
+        elif dropped == job_id or self._assigned.get(dropped) != target:
+            return None
+        else:
+            lost = self._values[dropped][target]
+        return self._values[job_id][target] - self._values[job_id][volunteer] - lost
+
+    def _relocate(self):
+        # Best place each assigned job could move to: (gain, volunteer, job dropped there or None)
+        weakest = {volunteer: self._weakest(volunteer) for volunteer in range(len(self.names))
+                   if self._held[volunteer] and not self._spare(volunteer)}
+        moves = {}
+        for job_id, holder in self._assigned.items():
+            for target in self._values[job_id]:
+                gain = self._relocation_gain(job_id, holder, target, weakest.get(target))
+                if gain is not None and (job_id not in moves or gain > moves[job_id][0]):
+                    moves[job_id] = (gain, target, weakest.get(target))
+
+        # Cheapest way into each full volunteer: (gain, held job, its target, job dropped there)
+        slots = {volunteer: self._best_slot(volunteer, moves) for volunteer in weakest}
+
+        improved = False
+        waiting = sorted((job_id for job_id in self._values if job_id not in self._assigned),
+                         key=lambda job_id: (-self._urgency[job_id], job_id))
+        for job_id in waiting:
+            while True:
+                best = None
+                for volunteer, value in self._values[job_id].items():
+                    if self._spare(volunteer):
+                        option = (value, volunteer)
+                    elif slots.get(volunteer) is not None:
+                        option = (value + slots[volunteer][0], volunteer)
+                    else:
+                        continue
+                    if option[0] > 0 and (best is None or option[0] > best[0]):
+                        best = option
+                if best is None:
+                    break
+                volunteer = best[1]
+                if not self._spare(volunteer):
+                    # Slots were priced before this round's changes; re-price the one chosen
+                    gain, held, target, dropped = slots[volunteer]
+                    if self._relocation_gain(held, volunteer, target, dropped) != gain:
+                        slots[volunteer] = self._best_slot(volunteer, moves)
+                        continue
+                    if dropped is not None:
+                        self._unassign(dropped)
+                    self._assign(held, target)
+                    moves.pop(held)
+                    slots[target] = self._best_slot(target, moves)
+                self._assign(job_id, volunteer)
+                slots[volunteer] = self._best_slot(volunteer, moves)
+                improved = True
+                break
+        return improved
+
+    def _best_slot(self, volunteer, moves):
+        """The job at a full `volunteer` that can make room at the least cost, as (gain, job, target, dropped)."""
+        best = None
+        for held in self._held[volunteer]:
+            if held not in moves:
+                continue
+            _, target, dropped = moves[held]
+            gain = self._relocation_gain(held, volunteer, target, dropped)
+            if gain is not None and (best is None or gain > best[0]):
+                best = (gain, held, target, dropped)
+        return best
+
+    def _exchange(self):
+        """Swaps two assigned jobs between their volunteers wherever that raises the value (works at full capacity)."""
+        improved = False
+        for job_id in sorted(self._assigned):
+            holder = self._assigned[job_id]
+            values = self._values[job_id]
+            for target, value in values.items():
+                if target == holder:
+                    continue
+                partner = max(
+                    (other for other in self._held[target] if holder in self._values[other]),
+                    key=lambda other: (self._values[other][holder] - self._values[other][target], -other),
+                    default=None,
+                )
+                if partner is None:
+                    continue
+                gain = (value + self._values[partner][holder]
+                        - values[holder] - self._values[partner][target])
+                if gain > 1e-9:
+                    self._assign(job_id, target)
+                    self._assign(partner, holder)
+                    improved = True
+                    break
+        return improved
+
+    def _place(self, job_id, bump=True):
+        """Gives a new or freed job the best slot: a spare one, or (with `bump`) a weaker job's."""
+        best = None
+        for volunteer, value in self._values[job_id].items():
+            if self._spare(volunteer):
+                option = (value, volunteer, None)
+            elif bump and self._held[volunteer]:
+                weakest = self._weakest(volunteer)
+                option = (value - self._values[weakest][volunteer], volunteer, weakest)
+            else:
+                continue
+            if option[0] > 0 and (best is None or option[0] > best[0]):
+                best = option
+        if best is None:
+            return
+        _, volunteer, bumped = best
+        if bumped is not None:
+            self._unassign(bumped)
+        self._assign(job_id, volunteer)
+        if bumped is not None:
+            self._place(bumped, bump=False)
+
+    def _backfill(self, volunteer):
+        """Fills a freed slot with the best waiting job that can use it."""
+        waiting = [job_id for job_id in self._reachable[volunteer] if job_id not in self._assigned]
+        if waiting and self._spare(volunteer):
+            self._assign(max(waiting, key=lambda job_id: (self._values[job_id][volunteer], -job_id)), volunteer)
+
+    def add(self, job):
+        if job["status"] != self.status:
+            return
+        with self._lock:
+            if not self._routable(job):
+                self._unplaced.add(job["id"])
+                return
+            self._track(job, self._candidate_values([job])[0])
+            self._place(job["id"])
+
+    def remove(self, job):
+        with self._lock:
+            self._unplaced.discard(job["id"])
+            volunteer = self._unassign(job["id"])
+            self._untrack(job["id"])
+            if volunteer is not None:
+                self._backfill(volunteer)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def sync(self, jobs):
+        """
+        Brings the plan up to date with `jobs` (the current open jobs) change
+        by change: new or re-scored jobs are placed, jobs no longer open free
+        their slot. For plans that aren't registered with the store.
+        """
+        current = {job["id"]: job for job in jobs if job["status"] == self.status}
+        with self._lock:
+            known = set(self._urgency) | self._unplaced
+            changed = [
+                job for job_id, job in current.items()
+                if job_id not in known or self._urgency.get(job_id) not in (None, self._job_urgency(job))
+            ]
+        for job_id in known - current.keys():
+            self.remove({"id": job_id})
+        for job in changed:
+            self.remove(job)
+            self.add(job)
+
+    def assignments(self):
+        """{volunteer name: [job ids, best first]} for volunteers with at least one job."""
+        with self._lock:
+            return {
+                self.names[volunteer]: sorted(held, key=lambda job_id: (-self._values[job_id][volunteer], job_id))
+                for volunteer, held in enumerate(self._held)
+                if held
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "jobs": len(self._values) + len(self._unplaced),
+                "assigned": len(self._assigned),
+                "unassigned": len(self._values) - len(self._assigned),
+                "unplaced": len(self._unplaced),
+                "capacity": sum(self._capacity),
+                "value": sum(self._values[job_id][volunteer] for job_id, volunteer in self._assigned.items()),
+                "urgency_covered": sum(self._urgency[job_id] for job_id in self._assigned),
+            }
@@ -0,0 +1,53 @@
+"""Priority index behind the volunteer feed."""
+
+from bisect import bisect_left, insort
+
+
+def priority_key(job):
+    """
+    Feed order: highest urgency first, then oldest first so equal-urgency
+    requests don't starve behind newer ones. The id settles exact ties.
+    """
+    return (-int(job["ai_analysis"]["urgency_score"]), job["created_at"], job["id"])
+
+
+class PriorityIndex:
+    """
+    Jobs kept pre-sorted by `priority_key`, one sorted list per status.
+    The store updates it on every insert/claim, so reading a page of the
+    feed is a slice instead of a filter + sort of the whole backlog.
+    """
+
+    def __init__(self):
+        self._by_status = {}
+
+    def add(self, job):
+        insort(self._by_status.setdefault(job["status"], []), priority_key(job))
+
+    def add_many(self, jobs):
+        """Bulk load: one sort per status instead of an insort per job."""
+        touched = set()
+        for job in jobs:
+            self._by_status.setdefault(job["status"], []).append(priority_key(job))
+            touched.add(job["status"])
+        for status in touched:
+            self._by_status[status].sort()
+
+    def remove(self, job):
+        keys = self._by_status.get(job["status"], [])
+        key = priority_key(job)
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            del keys[pos]
+
+    def clear(self):
+        self._by_status = {}
+
+    def count(self, status):
+        return len(self._by_status.get(status, []))
+
+    def page(self, status, offset=0, limit=None):
+        """Job ids for one page of `status`, in feed order."""
+        keys = self._by_status.get(status, [])
+        end = len(keys) if limit is None else offset + limit
+        return [key[2] for key in keys[offset:end]]
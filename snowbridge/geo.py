@@ -0,0 +1,167 @@
+"""
+Offline geocoding and a spatial index for "open jobs near me".
+
+Addresses are resolved against a local gazetteer CSV (no network calls):
+a street row gives street-level coordinates, a row with an empty street
+gives the town centroid used as a fallback. The default gazetteer in
+data/ only has town centroids for the Boston area; point
+SNOWBRIDGE_GAZETTEER_PATH at a fuller export (e.g. OpenAddresses) for
+street-level results.
+"""
+
+import csv
+import heapq
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+
+from snowbridge.store import STATUS_OPEN
+from snowbridge.text import STREET_ABBREVIATIONS
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.csv")
+
+STATE_CODES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "fl", "ga", "hi", "id", "il", "in", "ia", "ks", "ky",
+    "la", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh", "nj", "nm", "ny", "nc", "nd",
+    "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy", "dc",
+}
+# Longest town name, in words, tried when splitting an address
+MAX_TOWN_WORDS = 3
+
+EARTH_RADIUS_KM = 6371.0
+# Grid cell size in degrees (~5.5 km north-south)
+CELL_DEGREES = 0.05
+
+
+def _words(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def _street_key(words):
+    """Street name without the house number: ["123", "maple", "street"] -> "maple st"."""
+    while words and words[0].isdigit():
+        words = words[1:]
+    return " ".join(STREET_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Geocoder:
+    """
+    Resolves free-text addresses ("123 Maple St, Boston MA") to (lat, lon)
+    from a gazetteer CSV with columns street, town, state, lat, lon.
+    Results are memoized, so repeated addresses cost a dict lookup.
+    """
+
+    def __init__(self, path=DEFAULT_GAZETTEER_PATH, cache_size=4096):
+        self.streets = {}
+        self.towns = {}
+        self.centroids = {}  # (lat, lon) -> town name as written in the gazetteer
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                town = " ".join(_words(row["town"]))
+                point = (float(row["lat"]), float(row["lon"]))
+                street = _street_key(_words(row.get("street")))
+                if street:
+                    self.streets[(street, town)] = point
+                else:
+                    self.towns[town] = point
+                    self.centroids[point] = row["town"].strip()
+        self.geocode = lru_cache(maxsize=cache_size)(self._geocode)
+
+    def _geocode(self, location):
+        """(lat, lon) for an address, or None if its town isn't in the gazetteer."""
+        words = _words(location)
+        # Drop a trailing state code and/or ZIP code
+        while words and (words[-1] in STATE_CODES or words[-1].isdigit()):
+            words = words[:-1]
+        for size in range(min(MAX_TOWN_WORDS, len(words)), 0, -1):
+            town = " ".join(words[-size:])
+            if town in self.towns:
+                street = _street_key(words[:-size])
+                return self.streets.get((street, town), self.towns[town])
+        return None
+
+    def centroid_town(self, lat, lon):
+        """
+        The town whose centroid (lat, lon) is, or None. A job placed there
+        only matched its town, so a distance to it would be made up.
+        """
+        return self.centroids.get((lat, lon))
+
+
+def load_default_geocoder():
+    """Geocoder for SNOWBRIDGE_GAZETTEER_PATH (or the bundled file), or None if it's missing."""
+    path = os.getenv("SNOWBRIDGE_GAZETTEER_PATH", DEFAULT_GAZETTEER_PATH)
+    return Geocoder(path) if os.path.exists(path) else None
+
+
+class SpatialIndex:
+    """
+    Grid of CELL_DEGREES cells holding open jobs that have coordinates.
+    A radius query only visits the cells overlapping the search circle, so
+    its cost depends on how many jobs are nearby, not on the backlog size.
+    Register it with `JobStore.register_index()`.
+    """
+
+    def __init__(self, status=STATUS_OPEN):
+        self.status = status
+        self._cells = {}
+        self._points = {}  # id -> (lat, lon, urgency_score)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cell(lat, lon):
+        return (math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES))
+
+    def add(self, job):
+        if job["status"] != self.status or job.get("lat") is None or job.get("lon") is None:
+            return
+        with self._lock:
+            self._points[job["id"]] = (job["lat"], job["lon"], int(job["ai_analysis"]["urgency_score"]))
+            self._cells.setdefault(self._cell(job["lat"], job["lon"]), set()).add(job["id"])
+
+    def remove(self, job):
+        with self._lock:
+            point = self._points.pop(job["id"], None)
+            if point is not None:
+                self._cells.get(self._cell(point[0], point[1]), set()).discard(job["id"])
+
+    def clear(self):
+        with self._lock:
+            self._cells = {}
+            self._points = {}
+
+    def nearby(self, lat, lon, radius_km, limit=None, where=None):
+        """
+        [(job_id, distance_km)] within `radius_km`, highest urgency first, then
+        nearest. With `limit`, only that many are kept (a partial sort). With
+        `where` (a test on job ids), other jobs are skipped during the scan,
+        so the limit applies to the jobs that pass it.
+        """
+        dlat = radius_km / 111.0
+        dlon = radius_km / max(111.0 * math.cos(math.radians(lat)), 1e-6)
+        low_x, low_y = self._cell(lat - dlat, lon - dlon)
+        high_x, high_y = self._cell(lat + dlat, lon + dlon)
+        found = []
+        with self._lock:
+            for x in range(low_x, high_x + 1):
+                for y in range(low_y, high_y + 1):
+                    for job_id in self._cells.get((x, y), ()):
+                        if where is not None and not where(job_id):
+                            continue
+                        job_lat, job_lon, urgency = self._points[job_id]
+                        distance = haversine_km(lat, lon, job_lat, job_lon)
+                        if distance <= radius_km:
+                            found.append((-urgency, distance, job_id))
+        found = sorted(found) if limit is None else heapq.nsmallest(limit, found)
+        return [(job_id, distance) for _, distance, job_id in found]
@@ -0,0 +1,208 @@
+"""
+Headless bulk ingestion of requests from CSV or JSONL files (311 exports,
+partner agency lists).
+
+Rows are streamed, never loaded whole: a reader thread parses the file into
+fixed-size batches and hands them over a bounded queue, so reading pauses
+whenever triage/writing falls behind. Each batch is validated, checked for
+duplicates, triaged in one call and written in one transaction. Writes go
+through a JobWriter and duplicates are looked up in the database by key, so
+memory use doesn't grow with the file or the store.
+
+    python -m snowbridge.ingest requests.csv --errors errors.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from snowbridge.geo import load_default_geocoder
+from snowbridge.store import JobWriter, dedup_key
+from snowbridge.triage import triage_batch
+
+REQUIRED_FIELDS = ("location", "request_text")
+MAX_LENGTHS = {"title": 200, "location": 300, "request_text": 5000}
+
+# Errors kept in the returned report; the rest are only counted (and written to --errors)
+MAX_REPORTED_ERRORS = 100
+
+
+class RowError(ValueError):
+    """A row that can't be ingested; the message says why."""
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"can't tell the format of {path}; pass --format csv or --format jsonl")
+
+
+def read_rows(path, fmt):
+    """Yields (line_number, row) pairs; a row that can't be parsed is yielded as a RowError."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, RowError(f"invalid JSON: {e}")
+                    continue
+                if not isinstance(row, dict):
+                    row = RowError("expected a JSON object")
+                yield line_number, row
+
+
+def validate_row(row):
+    """Cleans one input row into a new job dict, or raises RowError."""
+    if isinstance(row, RowError):
+        raise row
+    job = {}
+    for field, max_length in MAX_LENGTHS.items():
+        value = row.get(field) or ""
+        if not isinstance(value, str):
+            raise RowError(f"{field} must be text")
+        value = value.strip()
+        if len(value) > max_length:
+            raise RowError(f"{field} is longer than {max_length} characters")
+        job[field] = value
+    missing = [field for field in REQUIRED_FIELDS if not job[field]]
+    if missing:
+        raise RowError(f"missing {', '.join(missing)}")
+    return job
+
+
+def _read_batches(rows, batch_size, batches):
+    """Reader thread: fills the bounded `batches` queue; None marks the end."""
+    try:
+        batch = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) == batch_size:
+                batches.put(batch)
+                batch = []
+        if batch:
+            batches.put(batch)
+    except Exception as e:
+        batches.put(e)
+    finally:
+        batches.put(None)
+
+
+def ingest(path, store, fmt=None, batch_size=500, queue_depth=4, llm=None, cache=None, geocoder=None,
+           errors_out=None):
+    """
+    Streams `path` into `store` (a JobWriter). Returns a report dict with row counts,
+    throughput and the first MAX_REPORTED_ERRORS per-row errors. Every error
+    is also written to `errors_out` (a text file object) as JSON lines.
+    With a `geocoder`, jobs get coordinates for the "near me" feed.
+    """
+    fmt = fmt or detect_format(path)
+    report = {"rows": 0, "inserted": 0, "duplicates": 0, "error_count": 0, "errors": []}
+
+    def record_error(line_number, message):
+        report["error_count"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_number, "error": message})
+        if errors_out is not None:
+            errors_out.write(json.dumps({"line": line_number, "error": message}) + "\n")
+
+    batches = queue.Queue(maxsize=queue_depth)
+    reader = threading.Thread(target=_read_batches, args=(read_rows(path, fmt), batch_size, batches), daemon=True)
+    started = time.perf_counter()
+    reader.start()
+
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if isinstance(batch, Exception):
+            raise batch
+
+        valid = {}
+        for line_number, row in batch:
+            report["rows"] += 1
+            try:
+                job = validate_row(row)
+            except RowError as e:
+                record_error(line_number, str(e))
+                continue
+            key = dedup_key(job)
+            if key in valid:
+                report["duplicates"] += 1
+                continue
+            valid[key] = job
+        # Skip known jobs before triage; insert_many checks again as it writes
+        stored = store.existing_keys(valid)
+        jobs = [job for key, job in valid.items() if key not in stored]
+        report["duplicates"] += len(valid) - len(jobs)
+
+        if jobs:
+            for job, analysis in zip(jobs, triage_batch(jobs, llm=llm, cache=cache)):
+                job["ai_analysis"] = analysis
+                point = geocoder.geocode(job["location"]) if geocoder else None
+                job["lat"], job["lon"] = point or (None, None)
+            inserted = store.insert_many(jobs, actor="import")
+            report["inserted"] += inserted
+            report["duplicates"] += len(jobs) - inserted
+
+    reader.join()
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load help requests from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (with a header row) or JSONL file with title, location, request_text")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--db", default=os.getenv("SNOWBRIDGE_DB_PATH", "snowbridge.db"), help="job store path")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows validated, triaged and written together")
+    parser.add_argument("--ai", action="store_true", help="triage with the OpenAI API (needs OPENAI_API_KEY)")
+    parser.add_argument("--errors", help="write every row error to this JSONL file")
+    args = parser.parse_args(argv)
+
+    llm = cache = None
+    if args.ai:
+        from snowbridge.llm import LLMClient
+        from snowbridge.triage import PROMPT_VERSION
+        from snowbridge.triage_cache import TriageCache
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            parser.error("--ai needs OPENAI_API_KEY")
+        llm = LLMClient(api_key)
+        cache = TriageCache(args.db, prompt_version=PROMPT_VERSION)
+
+    store = JobWriter(args.db)
+    errors_out = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    try:
+        report = ingest(args.path, store, fmt=args.format, batch_size=args.batch_size,
+                        llm=llm, cache=cache, geocoder=load_default_geocoder(), errors_out=errors_out)
+    finally:
+        if errors_out is not None:
+            errors_out.close()
+        store.close()
+
+    print(f"Read {report['rows']} rows in {report['seconds']:.1f}s ({report['rows_per_second']:,.0f} rows/s): "
+          f"{report['inserted']} inserted, {report['duplicates']} duplicates, {report['error_count']} errors")
+    for error in report["errors"][:10]:
+        print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+    return 0 if report["error_count"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Keyword tables for fallback triage, compiled into a single regex.
+
+All tiers are folded into one pattern built from a character trie, so a
+request is scanned once no matter how many terms there are, and shared
+prefixes ("medic", "medicine", "medication") are only tried once.
+"""
+
+import re
+
+# Tiers in priority order: a term listed in two tiers counts for the first
+KEYWORD_TIERS = {
+    # Critical keywords (score 8-10)
+    "critical": ["dialysis", "chemo", "oxygen", "emergency", "stuck", "trapped",
+                 "can't breathe", "heart", "stroke", "ambulance", "911"],
+    # High priority keywords (score 6-8)
+    "high": ["medicine", "meds", "doctor", "appointment", "medical", "wheelchair",
+             "disabled", "elderly", "can't walk", "mobility"],
+    # Medium keywords (score 4-6)
+    "medium": ["mailbox", "door", "driveway", "access", "need to leave"],
+}
+
+# High-tier hits that make the category "Medical" rather than "Mobility"
+MEDICAL_TERMS = {"medical", "doctor", "medicine"}
+
+
+def _trie_pattern(terms):
+    """Regex source matching any of `terms`, factored by common prefix."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        group = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A term ends here but longer ones continue; try the longer ones first
+            return f"(?:{group})?"
+        return group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds every whole-word keyword hit in one pass and reports its tier.
+    Plural forms ("doors", "appointments") match their singular term.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = {tier: sorted({term.lower() for term in terms}) for tier, terms in tiers.items()}
+        groups = "|".join(f"(?P<{tier}>{_trie_pattern(terms)})" for tier, terms in self.tiers.items() if terms)
+        self._pattern = re.compile(rf"(?<!\w)(?:{groups})(?:e?s)?(?!\w)")
+
+    def find(self, text):
+        """All hits in `text` as (term, tier) pairs, in order of appearance."""
+        text = text.lower().replace("’", "'")
+        return [(match.group(match.lastgroup), match.lastgroup) for match in self._pattern.finditer(text)]
+
+
+# Compiled once at import and shared by every triage call
+DEFAULT_MATCHER = KeywordMatcher(KEYWORD_TIERS)
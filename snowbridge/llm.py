@@ -0,0 +1,157 @@
+"""Shared OpenAI client with a latency budget, bounded retries and a circuit breaker."""
+
+import random
+import threading
+import time
+
+from snowbridge.metrics import METRICS
+
+# Circuit breaker states
+BREAKER_CLOSED = "CLOSED"        # calls go through
+BREAKER_OPEN = "OPEN"            # calls are skipped; triage uses keyword fallback
+BREAKER_HALF_OPEN = "HALF_OPEN"  # one probe call is let through to test recovery
+
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Trips OPEN after `failure_threshold` consecutive failures. After
+    `reset_timeout` seconds a single probe is allowed (HALF_OPEN); success
+    closes the breaker, failure opens it again for another timeout.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now."""
+        with self._lock:
+            if self.state == BREAKER_CLOSED:
+                return True
+            if self.state == BREAKER_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = BREAKER_HALF_OPEN
+            if self.state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = BREAKER_CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = BREAKER_OPEN
+                self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base_delay=0.25, max_delay=2.0):
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class LLMClient:
+    """
+    One OpenAI client for the whole process (connection pooling comes from
+    reusing it). Each `complete()` call gets `budget` seconds in total across
+    up to `max_retries` retries; transient errors are retried with jittered
+    backoff, and every final failure counts towards the breaker.
+    """
+
+    def __init__(self, api_key, budget=8.0, max_retries=2, breaker=None, base_url=None):
+        import openai
+
+        # Retries are done here so they share the budget and feed the breaker
+        self._client = openai.OpenAI(api_key=api_key, base_url=base_url, timeout=budget, max_retries=0)
+        self._retryable = (
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        )
+        self.budget = budget
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.requests = 0
+        self.fallbacks = 0
+        self.last_error = None
+        self._stats_lock = threading.Lock()
+
+    def complete(self, items=1, **kwargs):
+        """
+        Runs a chat completion and returns the message text. `items` is how
+        many triage requests the call covers (more than one for batch prompts).
+        """
+        with self._stats_lock:
+            self.calls += 1
+            self.requests += items
+        if not self.breaker.allow():
+            METRICS.observe("llm_call", 0.0, outcome="unavailable")
+            raise LLMUnavailable(f"AI triage paused after repeated failures (breaker {self.breaker.state})")
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise TimeoutError(f"AI triage exceeded its {self.budget:.0f}s budget")
+                response = self._client.with_options(timeout=remaining).chat.completions.create(**kwargs)
+                self.breaker.record_success()
+                METRICS.observe("llm_call", time.perf_counter() - started, outcome="retried" if attempt else "ok")
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    METRICS.counter("llm_tokens_total", kind="prompt").inc(usage.prompt_tokens or 0)
+                    METRICS.counter("llm_tokens_total", kind="completion").inc(usage.completion_tokens or 0)
+                return response.choices[0].message.content
+            except self._retryable as e:
+                delay = backoff_delay(attempt)
+                if attempt < self.max_retries and time.monotonic() + delay < deadline:
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                METRICS.observe("llm_call", time.perf_counter() - started, outcome="error")
+                self._record_error(e)
+                raise
+            except Exception as e:
+                METRICS.observe("llm_call", time.perf_counter() - started, outcome="error")
+                self._record_error(e)
+                raise
+
+    def _record_error(self, error):
+        self.last_error = str(error)
+        self.breaker.record_failure()
+
+    def note_fallback(self, count=1):
+        """Triage had to use keyword scoring for `count` requests this client was asked about."""
+        with self._stats_lock:
+            self.fallbacks += count
+        METRICS.counter("triage_fallbacks_total").inc(count)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "breaker_state": self.breaker.state,
+                "consecutive_failures": self.breaker.consecutive_failures,
+                "calls": self.calls,
+                "requests": self.requests,
+                "fallbacks": self.fallbacks,
+                "fallback_rate": self.fallbacks / self.requests if self.requests else 0.0,
+                "last_error": self.last_error,
+            }
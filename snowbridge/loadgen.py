@@ -0,0 +1,187 @@
+"""
+Synthetic storm-load generator for benchmarks and load tests.
+
+Builds realistic-looking requests at any scale: sentences are assembled from
+medical, mobility, access and general situations (so keyword hits come in
+the same mixes real requests have), addresses are spread around the towns
+in the gazetteer, submissions peak mid-storm, some requests get resubmitted,
+and a share of them are already claimed. Output is deterministic for a seed.
+
+    python -m snowbridge.loadgen 10000 --out storm.jsonl   # for snowbridge.ingest
+    python -m snowbridge.loadgen 10000 --db storm.db       # straight into a store
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+from snowbridge.geo import DEFAULT_GAZETTEER_PATH
+from snowbridge.store import STATUS_CLAIMED, STATUS_OPEN, JobStore
+from snowbridge.triage import keyword_triage_batch
+
+# Situation -> (share of requests, titles, opening sentences)
+SITUATIONS = {
+    "medical": (0.12, [
+        "Dialysis Patient - Need Access", "Oxygen Delivery Blocked", "Chemo Appointment Tomorrow",
+        "Medicine in Mailbox", "Need to Reach Doctor",
+    ], [
+        "I'm a dialysis patient and my treatment is at {hour}.",
+        "My oxygen tank delivery can't reach the house.",
+        "I have chemo tomorrow morning and can't get the car out.",
+        "My meds are in the mailbox and I can't reach it.",
+        "I have a doctor appointment at {hour} I can't miss.",
+        "My husband had a stroke last year and we need a clear path for the ambulance.",
+    ]),
+    "mobility": (0.23, [
+        "Wheelchair Ramp Covered", "Elderly Resident Snowed In", "Walker Can't Get Through",
+        "Disabled Veteran Needs Help", "Senior Needs Walkway Cleared",
+    ], [
+        "I use a wheelchair and the ramp is completely covered.",
+        "I'm {age} and use a walker, and I can't get down the steps.",
+        "My elderly mother lives alone and can't shovel.",
+        "I'm disabled and my mobility is limited after surgery.",
+        "I can't walk far and the sidewalk is blocked.",
+    ]),
+    "access": (0.35, [
+        "Driveway Blocked", "Front Door Snowed In", "Mailbox Buried", "Car Plowed In", "Can't Get Out",
+    ], [
+        "The driveway is buried and I need to leave for work.",
+        "Snow drifted against the front door and it won't open.",
+        "The plow left a wall of snow at the end of the driveway.",
+        "The mailbox is under a snowbank.",
+        "I need to leave by {hour} and the car is stuck.",
+    ]),
+    "general": (0.30, [
+        "Snow Removal Request", "Walkway Shoveling", "Help Clearing Snow", "Porch and Steps", "Roof Snow",
+    ], [
+        "Would appreciate help shoveling the walkway.",
+        "The porch and steps need clearing, no rush.",
+        "Looking for someone to clear the sidewalk in front of the house.",
+        "There's a lot of snow on the roof over the porch.",
+        "Just need a path to the trash bins.",
+    ]),
+}
+
+DETAILS = [
+    "There's about {depth} inches out there.",
+    "The steps are icy too.",
+    "I tried but my back can't take it.",
+    "I have a shovel you can use.",
+    "Neighbors are away for the week.",
+    "It's the {color} house on the corner.",
+    "",
+    "",
+]
+
+STREETS = ["Maple", "Oak", "Pine", "Elm", "Cedar", "Birch", "Walnut", "Chestnut", "Spruce", "Willow",
+           "Highland", "Washington", "Summer", "Winter", "Pleasant", "Park", "Prospect", "School"]
+SUFFIXES = ["St", "Ave", "Rd", "Ln", "Dr", "Ct", "Pl", "Ter"]
+HOURS = ["8 AM", "9 AM", "10 AM", "11 AM", "noon", "1 PM", "2 PM", "3 PM", "4 PM"]
+COLORS = ["blue", "white", "gray", "yellow", "green", "red"]
+CLAIMANTS = ["Sam", "Priya", "Alex", "Jordan", "Casey", "Morgan", "Riley", "Taylor", "Jamie", "Drew"]
+
+# Spread of addresses around a town centroid, in degrees (~2 km)
+TOWN_SPREAD = 0.02
+# Share of addresses in towns the gazetteer doesn't know (no coordinates)
+UNKNOWN_TOWN_SHARE = 0.03
+
+
+def load_towns(path=DEFAULT_GAZETTEER_PATH):
+    """[(town, state, lat, lon)] for the town rows of a gazetteer CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            (row["town"], row["state"], float(row["lat"]), float(row["lon"]))
+            for row in csv.DictReader(f) if not row.get("street")
+        ]
+
+
+def _request(rng, situation):
+    _, titles, openers = SITUATIONS[situation]
+    fill = {
+        "hour": rng.choice(HOURS),
+        "age": rng.randint(70, 94),
+        "depth": rng.choice([8, 12, 18, 24, 30, 36]),
+        "color": rng.choice(COLORS),
+    }
+    sentences = [rng.choice(openers)] + rng.sample(DETAILS, rng.randint(0, 2))
+    return rng.choice(titles), " ".join(sentence.format(**fill) for sentence in sentences if sentence)
+
+
+def storm_jobs(count, seed=0, now=None, hours=24.0, claimed_fraction=0.3, resubmit_fraction=0.02, towns=None):
+    """
+    `count` new jobs as `JobStore.insert_many()` takes them: keyword-triaged,
+    with coordinates (except for unknown towns), created over the last
+    `hours` with a mid-storm peak, and `claimed_fraction` of them claimed.
+    About `resubmit_fraction` repeat an earlier request from the same address.
+    """
+    rng = random.Random(seed)
+    now = time.time() if now is None else now
+    towns = towns if towns is not None else load_towns()
+    shares = [(name, share) for name, (share, _, _) in SITUATIONS.items()]
+    names, weights = zip(*shares)
+
+    jobs = []
+    for _ in range(count):
+        if jobs and rng.random() < resubmit_fraction:
+            # Same household again, worded a little differently
+            earlier = rng.choice(jobs)
+            job = {key: earlier[key] for key in ("title", "location", "lat", "lon")}
+            job["request_text"] = f"Still waiting for help. {earlier['request_text']}"
+        else:
+            title, request_text = _request(rng, rng.choices(names, weights)[0])
+            number, street, suffix = rng.randint(1, 999), rng.choice(STREETS), rng.choice(SUFFIXES)
+            if rng.random() < UNKNOWN_TOWN_SHARE:
+                location, lat, lon = f"{number} {street} {suffix}, Unlisted Town MA", None, None
+            else:
+                town, state, lat, lon = rng.choice(towns)
+                location = f"{number} {street} {suffix}, {town} {state}"
+                lat, lon = lat + rng.gauss(0, TOWN_SPREAD), lon + rng.gauss(0, TOWN_SPREAD)
+            job = {"title": title, "location": location, "request_text": request_text, "lat": lat, "lon": lon}
+
+        job["created_at"] = now - hours * 3600 * (1 - rng.triangular(0, 1, 0.5))
+        job["status"] = STATUS_OPEN
+        if rng.random() < claimed_fraction:
+            claimed_at = job["created_at"] + rng.expovariate(1 / 2400)  # ~40 minutes on average
+            if claimed_at < now:
+                job.update(status=STATUS_CLAIMED, claimed_by=rng.choice(CLAIMANTS), claimed_at=claimed_at)
+        jobs.append(job)
+
+    for job, analysis in zip(jobs, keyword_triage_batch(jobs)):
+        job["ai_analysis"] = analysis
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic storm-day help requests.")
+    parser.add_argument("count", type=int, help="how many requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hours", type=float, default=24.0, help="storm length; requests are spread over it")
+    parser.add_argument("--claimed", type=float, default=0.3, help="share of requests already claimed")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="write JSONL rows (title, location, request_text) for snowbridge.ingest")
+    target.add_argument("--db", help="insert straight into this job store, statuses included")
+    args = parser.parse_args(argv)
+
+    jobs = storm_jobs(args.count, seed=args.seed, hours=args.hours, claimed_fraction=args.claimed)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for job in jobs:
+                f.write(json.dumps({key: job[key] for key in ("title", "location", "request_text")}) + "\n")
+        print(f"Wrote {len(jobs)} requests to {args.out}")
+    else:
+        store = JobStore(args.db)
+        try:
+            for start in range(0, len(jobs), 5000):
+                store.insert_many(jobs[start:start + 5000], actor="loadgen")
+        finally:
+            store.close()
+        print(f"Inserted {len(jobs)} requests into {os.path.abspath(args.db)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Lightweight timing spans, histograms and counters for the hot paths.
+
+Every span is always recorded into a fixed-bucket histogram: two
+perf_counter() calls, a bisect and a short lock, a few microseconds. Spans
+are also collected one by one, with their labels, while a thread has a
+profile open (the admin "profile this page" toggle), and only then.
+
+Metrics come out in the Prometheus text format, from `render()`, a small
+HTTP endpoint (`serve()`) or a file rewritten on a timer (`write_periodically()`,
+e.g. for node_exporter's textfile collector).
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds (+Inf is implied)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = "snowbridge_"
+
+# HELP lines for the metrics the app records; anything else gets a generic one
+DESCRIPTIONS = {
+    "triage_seconds": "Time to triage one request, by path (ai, keyword, fallback)",
+    "triage_batch_seconds": "Time to triage a batch of requests",
+    "triage_parse_seconds": "Time to parse and validate a model reply",
+    "llm_call_seconds": "Model API call time including retries, by outcome (ok, retried, error, unavailable)",
+    "llm_tokens_total": "Model tokens used, by kind (prompt, completion)",
+    "triage_fallbacks_total": "Requests scored by keywords because AI triage failed or was paused",
+    "store_seconds": "Job store operation time, by operation",
+    "feed_read_seconds": "Time to read one page of the volunteer feed",
+    "render_seconds": "Time to render a view or fragment",
+    "rerun_seconds": "Time for a full Streamlit rerun, by view",
+    "api_request_seconds": "Time to answer one JSON API request, by route and status",
+}
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their count and sum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None if empty or past the last bound)."""
+        counts, count, _ = self.snapshot()
+        if not count:
+            return None
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            seen += bucket_count
+            if seen >= q * count:
+                return bound
+        return None
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Registry:
+    """Histograms and counters keyed on (name, labels), created on first use."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def histogram(self, name, **labels):
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def counter(self, name, **labels):
+        key = self._key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def observe(self, name, seconds, **labels):
+        """Records a duration for span `name` (metric `<name>_seconds`)."""
+        self._record(self.histogram(f"{name}_seconds", **labels), name, labels, seconds)
+
+    def _record(self, histogram, name, labels, seconds):
+        histogram.observe(seconds)
+        spans = getattr(self._local, "spans", None)
+        if spans is not None:
+            spans.append((name, labels, seconds))
+
+    def span(self, name, **labels):
+        """Context manager timing its block as span `name`."""
+        return _Span(self, name, labels)
+
+    def timed(self, name, **labels):
+        """Decorator timing every call of a function as span `name`."""
+        def decorate(function):
+            # Fixed labels, so the histogram is looked up once here rather than on every call
+            histogram = self.histogram(f"{name}_seconds", **labels)
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._record(histogram, name, labels, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def start_profile(self):
+        """Starts collecting this thread's spans; returns the list they're appended to."""
+        self._local.spans = []
+        return self._local.spans
+
+    def stop_profile(self):
+        """Stops collecting and returns [(name, labels, seconds)] in the order they finished."""
+        spans = getattr(self._local, "spans", None) or []
+        self._local.spans = None
+        return spans
+
+    def histograms(self):
+        """{(name, labels): Histogram}, for dashboards."""
+        with self._lock:
+            return dict(self._histograms)
+
+    def counters(self):
+        with self._lock:
+            return {key: counter.value for key, counter in self._counters.items()}
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {PREFIX}{name} {DESCRIPTIONS.get(name, name.replace('_', ' '))}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), histogram in histograms:
+            describe(name, "histogram")
+            counts, count, total = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total!r}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+        for (name, labels), counter in counters:
+            describe(name, "counter")
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {counter.value}")
+        return "\n".join(lines) + "\n"
+
+
+class _Span:
+    __slots__ = ("registry", "name", "labels", "started")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+# One registry per process, shared by every module and session
+METRICS = Registry()
+span = METRICS.span
+timed = METRICS.timed
+observe = METRICS.observe
+
+
+def serve(port, host="127.0.0.1", registry=METRICS):
+    """Serves GET /metrics on a background thread; returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_file(path, registry=METRICS):
+    """Writes the metrics to `path` atomically (scrapers never see half a file)."""
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(partial, path)
+
+
+def write_periodically(path, interval=15.0, registry=METRICS):
+    """Rewrites `path` every `interval` seconds on a daemon thread; returns the thread."""
+
+    def run():
+        while True:
+            try:
+                write_file(path, registry)
+            except OSError as e:
+                logger.warning("Couldn't write metrics to %s: %s", path, e)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,60 @@
+"""
+Deterministic urgency model for fallback triage.
+
+Each request becomes a row of keyword features; the urgency score is the
+row times a weight vector, rounded and clipped to 1-10. Scoring a whole
+backlog is one matrix-vector product, so weights can be retuned and every
+job re-scored in one shot.
+"""
+
+import numpy as np
+
+from snowbridge.keywords import DEFAULT_MATCHER
+
+# Column order of the feature matrix
+FEATURE_NAMES = [
+    "bias",
+    "has_critical",
+    "has_high",
+    "has_medium",
+    "critical_terms",  # distinct terms per tier, capped at MAX_TERMS
+    "high_terms",
+    "medium_terms",
+]
+TIERS = ["critical", "high", "medium"]
+MAX_TERMS = 3
+
+# Reproduces the old keyword bands without the randomness:
+# no hits -> 3, medium -> 4-5, high -> 6-8, critical -> 9-10
+DEFAULT_WEIGHTS = np.array([3.0, 5.5, 2.5, 0.5, 0.5, 0.5, 0.5])
+# Highest score per band (by the top tier hit), so extra lower-tier terms can
+# never lift a request into the band above: only critical terms reach 9-10
+BAND_CAPS = {"critical": 10, "high": 8, "medium": 5, None: 3}
+
+
+def featurize(hits):
+    """Feature row for one request's (term, tier) hits."""
+    terms = {tier: set() for tier in TIERS}
+    for term, tier in hits:
+        terms[tier].add(term)
+    counts = [min(len(terms[tier]), MAX_TERMS) for tier in TIERS]
+    return [1.0] + [float(count > 0) for count in counts] + [float(count) for count in counts]
+
+
+def feature_matrix(hit_lists):
+    return np.array([featurize(hits) for hits in hit_lists], dtype=float).reshape(-1, len(FEATURE_NAMES))
+
+
+def score_features(features, weights=DEFAULT_WEIGHTS):
+    """Urgency scores (int array, 1-10) for a feature matrix, capped at the band of the top tier hit."""
+    raw = features @ weights
+    has = {tier: features[:, FEATURE_NAMES.index(f"has_{tier}")] > 0 for tier in TIERS}
+    caps = np.select([has[tier] for tier in TIERS], [BAND_CAPS[tier] for tier in TIERS], BAND_CAPS[None])
+    # Round half up so x.5 scores don't depend on numpy's banker's rounding
+    return np.clip(np.floor(raw + 0.5), 1, caps).astype(int)
+
+
+def score_texts(texts, weights=DEFAULT_WEIGHTS, matcher=DEFAULT_MATCHER):
+    """Scores and keyword hits for a batch of texts."""
+    hit_lists = [matcher.find(text) for text in texts]
+    return score_features(feature_matrix(hit_lists), weights), hit_lists
@@ -0,0 +1,238 @@
+"""
+Full-text search over the job backlog.
+
+SearchIndex is an inverted index from words of a job's title, request text
+and AI summary to the jobs containing them, kept current by the store like
+the other indexes. A query intersects the postings of its words (and the
+status/category filters) as set operations, then ranks only the jobs that
+matched: best match first, then most urgent, then oldest.
+"""
+
+import heapq
+import math
+import re
+import threading
+
+# Where a word appears counts for this much; a word in several fields adds up
+FIELD_WEIGHTS = {"title": 2.0, "summary": 1.5, "request_text": 1.0}
+
+# Groups of matches up to this size are sorted directly instead of split by urgency first
+SMALL_GROUP = 512
+
+# Too common in requests to narrow anything down
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "at", "be", "but", "by", "can", "for", "from", "i", "in", "is", "it",
+    "me", "my", "need", "of", "on", "or", "our", "s", "t", "the", "to", "we", "with",
+})
+
+
+def _stem(word):
+    """Folds simple plurals ("ramps", "boxes") onto the singular."""
+    if len(word) > 4 and word.endswith("es") and word[-3] in "sxz":
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text):
+    """Index terms of `text`, in order: lowercased words, stop words dropped, plurals folded."""
+    words = re.findall(r"\w+", (text or "").lower().replace("’", "'"))
+    return [_stem(word) for word in words if word not in STOP_WORDS]
+
+
+def _field_text(job, field):
+    if field == "summary":
+        return job["ai_analysis"].get("summary", "")
+    return job.get(field) or ""
+
+
+class SearchIndex:
+    """
+    Inverted index of every job (any status). Register it with
+    `JobStore.register_index()`; `search()` ranks a page of matches and
+    `match()` returns the matching ids unranked, for combining with other
+    indexes.
+
+    Postings are split by field weight and jobs are also grouped by urgency,
+    so matching and ranking are set intersections: only the jobs on the
+    requested page are ever looked at one by one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}     # term -> {field weight: {job_id}}
+            self._df = {}           # term -> number of jobs containing it
+            self._docs = {}         # job_id -> ({term: field weight}, status, category, urgency, created_at)
+            self._by_status = {}    # status -> {job_id}
+            self._by_category = {}  # category -> {job_id}
+            self._by_urgency = {}   # urgency score -> {job_id}
+
+    def add(self, job):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in set(terms(_field_text(job, field))):
+                weights[term] = weights.get(term, 0.0) + weight
+        analysis = job["ai_analysis"]
+        category = analysis.get("category", "General")
+        urgency = int(analysis["urgency_score"])
+        with self._lock:
+            self._remove(job["id"])
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {}).setdefault(weight, set()).add(job["id"])
+                self._df[term] = self._df.get(term, 0) + 1
+            self._docs[job["id"]] = (weights, job["status"], category, urgency, job["created_at"])
+            self._by_status.setdefault(job["status"], set()).add(job["id"])
+            self._by_category.setdefault(category, set()).add(job["id"])
+            self._by_urgency.setdefault(urgency, set()).add(job["id"])
+
+    def remove(self, job):
+        with self._lock:
+            self._remove(job["id"])
+
+    def _remove(self, job_id):
+        doc = self._docs.pop(job_id, None)
+        if doc is None:
+            return
+        weights, status, category, urgency = doc[:4]
+        for term, weight in weights.items():
+            levels = self._postings[term]
+            levels[weight].discard(job_id)
+            if not levels[weight]:
+                del levels[weight]
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._postings[term], self._df[term]
+        self._by_status[status].discard(job_id)
+        self._by_category[category].discard(job_id)
+        self._by_urgency[urgency].discard(job_id)
+
+    def categories(self, status=None):
+        """Categories with at least one job (of `status`, if given), sorted."""
+        with self._lock:
+            ids = self._by_status.get(status, set()) if status else None
+            return sorted(
+                category for category, members in self._by_category.items()
+                if members and (ids is None or not members.isdisjoint(ids))
+            )
+
+    def _groups(self, query, status, category, min_urgency):
+        """
+        {relevance: {job_id}} for the jobs with every word of `query` that
+        pass the filters. Call with the lock held; the sets may be the
+        index's own, so they're read, never modified.
+        """
+        query_terms = list(dict.fromkeys(terms(query)))
+        if any(term not in self._postings for term in query_terms):
+            return {}
+        filters = [members.get(key, set()) for key, members in zip((status, category), (self._by_status, self._by_category)) if key]
+        # Rarest word first, so the groups only get smaller
+        query_terms.sort(key=self._df.get)
+        idf = {term: math.log(1 + len(self._docs) / self._df[term]) for term in query_terms}
+
+        # Grouped by the matched field weights, one per word; scored once at the end
+        if query_terms:
+            groups = {}
+            for weight, ids in self._postings[query_terms[0]].items():
+                for members in filters:
+                    ids = ids & members
+                if ids:
+                    groups[(weight,)] = ids
+        else:
+            ids = set(min(filters, key=len)) if filters else set(self._docs)
+            for members in filters:
+                ids &= members
+            groups = {(): ids}
+
+        for term in query_terms[1:]:
+            narrowed = {}
+            for weights, ids in groups.items():
+                for weight, members in self._postings[term].items():
+                    both = ids & members
+                    if both:
+                        narrowed[weights + (weight,)] = both
+            groups = narrowed
+
+        below = [members for score, members in self._by_urgency.items() if score < min_urgency and members]
+        scored = {}
+        for weights, ids in groups.items():
+            for members in below:
+                ids = ids - members
+            if ids:
+                # Rounded so weights that add up the same tie exactly
+                relevance = round(sum(weight * idf[term] for weight, term in zip(weights, query_terms)), 9)
+                scored[relevance] = scored[relevance] | ids if relevance in scored else ids
+        return scored
+
+    def _ranked(self, ids, skip, count):
+        """
+        `count` of `ids` after the first `skip`, by urgency (highest first),
+        then age. Call with the lock held.
+        """
+        docs = self._docs
+        if len(ids) <= SMALL_GROUP:
+            ranked = sorted(ids, key=lambda job_id: (-docs[job_id][3], docs[job_id][4], job_id))
+            return ranked[skip:skip + count]
+        # Big group: split it by urgency, most urgent first; levels before the page are only counted
+        page = []
+        for score in sorted(self._by_urgency, reverse=True):
+            bucket = ids & self._by_urgency[score]
+            if skip >= len(bucket):
+                skip -= len(bucket)
+                continue
+            page.extend(heapq.nsmallest(skip + count - len(page), bucket, key=lambda job_id: (docs[job_id][4], job_id))[skip:])
+            skip = 0
+            if len(page) >= count:
+                break
+        return page
+
+    def match(self, query="", status=None, category=None, min_urgency=0):
+        """Set of ids matching every word of `query` and the filters (all jobs for an empty query)."""
+        with self._lock:
+            return set().union(*self._groups(query, status, category, min_urgency).values())
+
+    def matcher(self, query="", status=None, category=None, min_urgency=0):
+        """
+        A test on one job id that agrees with `match()`, for filtering another
+        index's results (e.g. "near me") without building every match first.
+        """
+        query_terms = set(terms(query))
+
+        def matches(job_id):
+            doc = self._docs.get(job_id)
+            return (
+                doc is not None
+                and query_terms <= doc[0].keys()
+                and (not status or doc[1] == status)
+                and (not category or doc[2] == category)
+                and doc[3] >= min_urgency
+            )
+
+        return matches
+
+    def search(self, query="", status=None, category=None, min_urgency=0, offset=0, limit=None):
+        """
+        (number of matches, job ids for one page). Matches have every word
+        of `query` and pass the filters; they're ranked by relevance (TF-IDF
+        style: rarer words and title/summary hits count more), then
+        urgency, then oldest first. Matches ranked before the page are
+        counted in bulk (a relevance or urgency level at a time), not sorted.
+        """
+        with self._lock:
+            groups = self._groups(query, status, category, min_urgency)
+            total = sum(len(ids) for ids in groups.values())
+            end = total if limit is None else min(total, offset + limit)
+            page, seen = [], 0
+            for relevance in sorted(groups, reverse=True):
+                if seen >= end:
+                    break
+                ids = groups[relevance]
+                if seen + len(ids) > offset:
+                    skip = max(0, offset - seen)
+                    page.extend(self._ranked(ids, skip, end - seen - skip))
+                seen += len(ids)
+        return total, page
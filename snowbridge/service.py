@@ -0,0 +1,337 @@
+"""
+The request/volunteer flow without a UI: submit, feed pages and claims.
+
+`SnowBridgeService` owns one job store and the indexes and workers built on
+it (duplicates, "near me", search, stats, background AI triage). The
+Streamlit app holds one per process, and so does each worker of the JSON
+API in `snowbridge.api`. Importing this module doesn't load Streamlit or
+OpenAI; the OpenAI client is only created when an API key is given.
+"""
+
+import gc
+import os
+import threading
+import time
+
+from snowbridge.dedup import DEDUP_WINDOW_SECONDS, DuplicateIndex
+from snowbridge.geo import SpatialIndex, load_default_geocoder
+from snowbridge.metrics import METRICS
+from snowbridge.search import SearchIndex
+from snowbridge.stats import JobStats
+from snowbridge.store import STATUS_OPEN, JobStore, dedup_key
+from snowbridge.triage import PROMPT_VERSION, keyword_triage
+from snowbridge.triage_cache import TriageCache
+from snowbridge.worker import TriageWorker
+
+# Volunteer feed cards per page; a read never returns more jobs than this
+FEED_PAGE_SIZE = 20
+# "Near me" results kept per read, so a huge radius can't make a read slow
+MAX_NEARBY_RESULTS = 500
+# Indexes that take seconds to build over a big backlog; they're built on first
+# use (or by warm_up(), in this order: submit needs duplicates soonest)
+# instead of holding up opening the store
+LAZY_INDEXES = {"duplicates": DuplicateIndex, "stats": JobStats, "search_index": SearchIndex}
+
+
+def seed_demo_jobs():
+    """Creates 5 diverse demo jobs for testing."""
+    return [
+        {
+            "title": "Dialysis Patient - Emergency Access",
+            "location": "123 Maple St, Boston MA",
+            "request_text": "Dialysis patient here. Driveway blocked by 3 feet of snow. Emergency exit inaccessible. Need to get to treatment center by 2 PM today.",
+            "ai_analysis": {
+                "urgency_score": 10,
+                "category": "Medical",
+                "summary": "Dialysis Patient Emergency",
+                "is_critical": True
+            },
+            "status": "OPEN"
+        },
+        {
+            "title": "Medicine in Mailbox",
+            "location": "456 Oak Ave, Cambridge MA",
+            "request_text": "I can't get to my mailbox. My meds are in there and I need them today. I'm 78 and use a walker.",
+            "ai_analysis": {
+                "urgency_score": 7,
+                "category": "Access",
+                "summary": "Meds in Mailbox",
+                "is_critical": False
+            },
+            "status": "OPEN"
+        },
+        {
+            "title": "Wheelchair Access Blocked",
+            "location": "789 Pine Rd, Somerville MA",
+            "request_text": "My wheelchair ramp is completely covered. I can't leave my apartment. No emergency, but I need groceries.",
+            "ai_analysis": {
+                "urgency_score": 6,
+                "category": "Mobility",
+                "summary": "Wheelchair Ramp Blocked",
+                "is_critical": False
+            },
+            "status": "OPEN"
+        },
+        {
+            "title": "Driveway Clearing",
+            "location": "321 Elm St, Brookline MA",
+            "request_text": "Just need my driveway cleared so I can get to work tomorrow. Not urgent, but would appreciate help.",
+            "ai_analysis": {
+                "urgency_score": 3,
+                "category": "General",
+                "summary": "Driveway Clearing",
+                "is_critical": False
+            },
+            "status": "OPEN"
+        },
+        {
+            "title": "Oxygen Delivery Blocked",
+            "location": "555 Cedar Ln, Newton MA",
+            "request_text": "Oxygen tank delivery can't reach my house. Driveway and walkway completely blocked. I have backup but running low.",
+            "ai_analysis": {
+                "urgency_score": 9,
+                "category": "Medical",
+                "summary": "Oxygen Delivery Blocked",
+                "is_critical": True
+            },
+            "status": "OPEN"
+        }
+    ]
+
+
+def locate(job, geocoder):
+    """Adds coordinates to a job from its address; left empty if the address isn't known."""
+    point = geocoder.geocode(job["location"]) if geocoder else None
+    job["lat"], job["lon"] = point or (None, None)
+    return job
+
+
+def seed_if_empty(store, geocoder=None):
+    """Loads the demo jobs into a store with no jobs at all; True if it did."""
+    if store.count_by_status():
+        return False
+    store.reset([locate(job, geocoder) for job in seed_demo_jobs()])
+    return True
+
+
+class SnowBridgeService:
+    """
+    One process's view of the shared job store, with everything the request
+    and volunteer flows need kept current by it. Other processes writing
+    the same database are picked up by `sync()`.
+
+    Without an `llm`, requests keep their keyword score; with one, a
+    background TriageWorker upgrades them to an AI analysis.
+
+    Opening only loads the jobs and the cheap indexes; `duplicates`,
+    `search_index` and `stats` are built the first time they're used, or
+    ahead of time by `warm_up()`. Submitting, the sidebar counts and the
+    category list don't wait for them (see `built()`).
+    """
+
+    def __init__(self, db_path="snowbridge.db", llm=None, geocoder=None, seed=True):
+        self.store = JobStore(db_path)
+        self.geocoder = geocoder
+        self.llm = llm
+        self.triage_cache = TriageCache(db_path, prompt_version=PROMPT_VERSION)
+        if seed:
+            seed_if_empty(self.store, geocoder)
+        self.triage_worker = TriageWorker(self.store, llm, cache=self.triage_cache) if llm else None
+        self.nearby = self._register(SpatialIndex())
+        self._lazy = {}
+        self._lazy_locks = {name: threading.Lock() for name in LAZY_INDEXES}
+        # Held from the duplicate check to the insert, so two sessions submitting
+        # the same request can't both miss each other
+        self._submit_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, db_path=None, seed=True):
+        """
+        Configured like the app: `db_path` or SNOWBRIDGE_DB_PATH, the local
+        gazetteer, and AI triage when OPENAI_API_KEY is set (LLM_BUDGET_SECONDS per call).
+        """
+        llm = None
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key:
+            from snowbridge.llm import LLMClient
+
+            llm = LLMClient(api_key, budget=float(os.getenv("LLM_BUDGET_SECONDS", "8")))
+        db_path = db_path or os.getenv("SNOWBRIDGE_DB_PATH", "snowbridge.db")
+        return cls(db_path, llm=llm, geocoder=load_default_geocoder(), seed=seed)
+
+    def _register(self, index):
+        self.store.register_index(index)
+        return index
+
+    def _lazy_index(self, name):
+        """The index `name` from LAZY_INDEXES, built and registered on first use (other callers wait for it)."""
+        index = self._lazy.get(name)
+        if index is None:
+            with self._lazy_locks[name]:
+                index = self._lazy.get(name)
+                if index is None:
+                    index = self._lazy[name] = self._register(LAZY_INDEXES[name]())
+        return index
+
+    def built(self, name):
+        """The index `name` from LAZY_INDEXES if it's built already, else None (never waits for it)."""
+        return self._lazy.get(name)
+
+    @property
+    def duplicates(self):
+        return self._lazy_index("duplicates")
+
+    @property
+    def search_index(self):
+        return self._lazy_index("search_index")
+
+    @property
+    def stats(self):
+        return self._lazy_index("stats")
+
+    def warm_up(self, freeze=False):
+        """
+        Builds the lazy indexes on a background thread, so the first submit
+        or search doesn't pay for it. The store stays usable meanwhile.
+        With `freeze` (for a server's entry point), gc.freeze() runs once
+        when they're built: the jobs and indexes live as long as the
+        process, so later collections can skip them.
+        """
+        thread = threading.Thread(target=self._build_lazy_indexes, args=(freeze,), daemon=True)
+        thread.start()
+        return thread
+
+    def _build_lazy_indexes(self, freeze=False):
+        for name in LAZY_INDEXES:
+            self._lazy_index(name)
+        if freeze:
+            gc.freeze()
+
+    def close(self):
+        if self.triage_worker is not None:
+            self.triage_worker.shutdown()
+        self.triage_cache.close()
+        self.store.close()
+
+    def sync(self):
+        """Picks up jobs written by other processes; returns how many changed."""
+        return self.store.sync()
+
+    def locate(self, job):
+        return locate(job, self.geocoder)
+
+    def count_by_status(self):
+        """Jobs per status, from the stats index or, while it builds, one query."""
+        stats = self.built("stats")
+        return stats.count_by_status() if stats is not None else self.store.count_by_status()
+
+    def categories(self):
+        """Categories with at least one job, from the search index or, while it builds, the store."""
+        search_index = self.built("search_index")
+        return search_index.categories() if search_index is not None else self.store.categories()
+
+    def reset(self, jobs=None, actor=None):
+        """Replaces every job with `jobs`, or the demo jobs. Jobs without coordinates are located here."""
+        jobs = seed_demo_jobs() if jobs is None else jobs
+        self.store.reset([job if "lat" in job else self.locate(job) for job in jobs], actor=actor)
+
+    def submit(self, title, location, request_text, actor="requester"):
+        """
+        Stores a new request with an instant keyword score and queues it for
+        AI review. Returns (job, False), or (existing job, True) when the same
+        household already has a similar open request; a duplicate never
+        reaches the model. A critical request is never folded into one that
+        isn't. A similar request from another address is stored with
+        `similar_to` set, for a coordinator to check. Until the duplicate
+        index is built, only a repeat of the same text at the same address
+        is caught.
+        """
+        analysis = keyword_triage(request_text, title)
+        job = self.locate({
+            "title": title,
+            "location": location,
+            "request_text": request_text,
+            "ai_analysis": analysis,
+            "status": STATUS_OPEN,
+            "similar_to": None
+        })
+        duplicates = self.built("duplicates")
+        with self._submit_lock:
+            if duplicates is not None:
+                match = duplicates.find(location, request_text)
+            else:
+                # Until the index is built, only the same text at the same address counts (one indexed query)
+                job_id = self.store.open_job_with_key(dedup_key(job), time.time() - DEDUP_WINDOW_SECONDS)
+                match = (job_id, 1.0, True) if job_id is not None else None
+            if match:
+                job_id, _, same_location = match
+                existing = self.store.get(job_id)
+                if existing is not None and existing["status"] == STATUS_OPEN:
+                    escalates = analysis.get("is_critical") and not existing["ai_analysis"].get("is_critical")
+                    if same_location and not escalates:
+                        return existing, True
+                    job["similar_to"] = job_id
+            # The store adds it to the duplicate index before returning
+            job = self.store.insert(job, actor=actor)
+        if self.triage_worker:
+            self.triage_worker.submit(job)
+        return job, False
+
+    def claim(self, job_id, claimant=""):
+        """Claims an open job; a ClaimResult says whether this caller won it."""
+        return self.store.claim(job_id, claimant=claimant)
+
+    @METRICS.timed("feed_read")
+    def feed_page(self, page=1, my_location="", radius_km=10, query="", status=STATUS_OPEN, category=None,
+                  min_urgency=0, page_size=FEED_PAGE_SIZE):
+        """
+        One page of jobs (near `my_location` and matching the search, if
+        given) plus what's needed to show it: totals, the page actually
+        returned (clamped to the last one), distances by job id (or the town,
+        for jobs only placed at a town centroid), and whether the location was
+        found and the nearby list was capped.
+        """
+        feed = {"my_point": None, "capped": False, "distances": {}, "towns": {}}
+        searching = (query, status, category, min_urgency) != ("", STATUS_OPEN, None, 0)
+        feed["searching"] = searching
+
+        # Near me: open jobs within the radius, by urgency then distance
+        my_point = self.geocoder.geocode(my_location) if my_location and self.geocoder else None
+        feed["my_point"] = my_point
+        nearby = None
+        if my_point:
+            # Searches are filtered during the scan, so the cap keeps the most urgent matches
+            # and no read sorts (or collects) more than MAX_NEARBY_RESULTS of them
+            where = self.search_index.matcher(query, status, category, min_urgency) if searching else None
+            nearby = self.nearby.nearby(my_point[0], my_point[1], radius_km, limit=MAX_NEARBY_RESULTS + 1, where=where)
+        if nearby is not None and len(nearby) > MAX_NEARBY_RESULTS:
+            feed["capped"] = True
+            nearby = nearby[:MAX_NEARBY_RESULTS]
+        feed["nearby"] = nearby is not None
+        feed["distances"] = dict(nearby) if nearby is not None else {}
+
+        # Search without near me: one page of matches, ranked by the search index
+        if nearby is None and searching:
+            total, job_ids = self.search_index.search(query, status, category, min_urgency, (page - 1) * page_size, page_size)
+            page_count = max(1, -(-total // page_size))
+            if page > page_count:
+                total, job_ids = self.search_index.search(query, status, category, min_urgency, (page_count - 1) * page_size, page_size)
+            feed["total_open"] = total
+        else:
+            feed["total_open"] = len(nearby) if nearby is not None else self.store.count_open()
+        feed["page_count"] = max(1, -(-feed["total_open"] // page_size))
+        feed["page"] = min(max(page, 1), feed["page_count"])
+        offset = (feed["page"] - 1) * page_size
+        if nearby is not None:
+            feed["jobs"] = [job for job in (self.store.get(job_id) for job_id, _ in nearby[offset:offset + page_size]) if job]
+            for job in feed["jobs"]:
+                town = self.geocoder.centroid_town(job["lat"], job["lon"])
+                if town is not None:
+                    feed["towns"][job["id"]] = town
+                    del feed["distances"][job["id"]]
+        elif searching:
+            feed["jobs"] = [job for job in map(self.store.get, job_ids) if job is not None]
+        else:
+            # One page of open jobs, read pre-sorted from the store's priority index
+            feed["jobs"] = self.store.list_open(limit=page_size, offset=offset)
+        return feed
@@ -0,0 +1,176 @@
+"""
+Incremental job statistics for the sidebar and the admin dashboard.
+
+JobStats is a store index: it sees every insert, claim, re-score and reset
+as add/remove calls and keeps its totals up to date as they happen, so a
+dashboard read never touches the jobs themselves. Time-window figures live
+in per-minute buckets keyed on the job's own timestamps (created_at,
+claimed_at), so jobs loaded at startup land in the right minute too.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from snowbridge.store import STATUS_CLAIMED, STATUS_OPEN
+
+# Urgency buckets, same thresholds as the feed card colors
+URGENCY_BUCKETS = ("critical", "high", "standard")
+
+# Rolling windows, in minutes
+SUBMISSION_WINDOW = 15
+CLAIM_WINDOW = 60
+# Per-minute buckets older than this are dropped
+RETENTION_MINUTES = 24 * 60
+
+# Time-to-claim histogram: bin i holds durations below 2**i minutes (the last bin is open)
+CLAIM_BINS = 16
+
+# Critical jobs still open after this many minutes are flagged
+STALE_CRITICAL_MINUTES = 30
+
+
+def urgency_bucket(analysis):
+    score = int(analysis["urgency_score"])
+    if score >= 8 or analysis.get("is_critical", False):
+        return "critical"
+    if score >= 4:
+        return "high"
+    return "standard"
+
+
+def _minute(timestamp):
+    return int(timestamp // 60)
+
+
+def _claim_bin(seconds):
+    minutes = seconds / 60
+    if minutes <= 1:
+        return 0
+    return min(CLAIM_BINS - 1, math.ceil(math.log2(minutes)))
+
+
+class JobStats:
+    """
+    Counters by status, category, urgency bucket and criticality, plus
+    rolling submission and time-to-claim windows. Register it with
+    `JobStore.register_index()`; `snapshot()` is the O(1) read.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._totals = Counter()       # (status,), (status, "category", c), (status, "urgency", b)
+            self._submitted = Counter()    # minute -> jobs created that minute
+            self._claimed = {}             # minute -> [claims per time-to-claim bin]
+            self._open_critical = []       # sorted (created_at, id) of open critical jobs
+            self._pruned_minute = None
+
+    def _update(self, job, sign):
+        status = job["status"]
+        analysis = job["ai_analysis"]
+        bucket = urgency_bucket(analysis)
+        self._totals[(status,)] += sign
+        self._totals[(status, "category", analysis.get("category", "General"))] += sign
+        self._totals[(status, "urgency", bucket)] += sign
+
+        horizon = _minute(self._clock()) - RETENTION_MINUTES
+        created = _minute(job["created_at"])
+        if created >= horizon:
+            self._submitted[created] += sign
+            if self._submitted[created] <= 0:
+                del self._submitted[created]
+
+        if status == STATUS_CLAIMED and job.get("claimed_at"):
+            claimed = _minute(job["claimed_at"])
+            if claimed >= horizon:
+                bins = self._claimed.setdefault(claimed, [0] * CLAIM_BINS)
+                bins[_claim_bin(job["claimed_at"] - job["created_at"])] += sign
+
+        if status == STATUS_OPEN and bucket == "critical":
+            key = (job["created_at"], job["id"])
+            if sign > 0:
+                insort(self._open_critical, key)
+            else:
+                pos = bisect_left(self._open_critical, key)
+                if pos < len(self._open_critical) and self._open_critical[pos] == key:
+                    del self._open_critical[pos]
+
+    def _prune(self, current):
+        """Drops buckets past the retention horizon, at most once a minute."""
+        if current == self._pruned_minute:
+            return
+        self._pruned_minute = current
+        horizon = current - RETENTION_MINUTES
+        for minute in [minute for minute in self._submitted if minute < horizon]:
+            del self._submitted[minute]
+        for minute in [minute for minute in self._claimed if minute < horizon]:
+            del self._claimed[minute]
+
+    def add(self, job):
+        with self._lock:
+            self._update(job, 1)
+
+    def remove(self, job):
+        with self._lock:
+            self._update(job, -1)
+
+    def count_by_status(self):
+        """Same shape as `JobStore.count_by_status()`, without the query."""
+        with self._lock:
+            return {key[0]: count for key, count in self._totals.items() if len(key) == 1 and count}
+
+    def snapshot(self, stale_minutes=STALE_CRITICAL_MINUTES):
+        """Every dashboard figure. Cost depends on the window sizes, not on the number of jobs."""
+        now = self._clock()
+        current = _minute(now)
+        with self._lock:
+            self._prune(current)
+            by_status = {key[0]: count for key, count in self._totals.items() if len(key) == 1 and count}
+            open_by_category = {
+                key[2]: count for key, count in self._totals.items()
+                if len(key) == 3 and key[0] == STATUS_OPEN and key[1] == "category" and count
+            }
+            open_by_urgency = {bucket: self._totals[(STATUS_OPEN, "urgency", bucket)] for bucket in URGENCY_BUCKETS}
+            submitted = sum(self._submitted.get(minute, 0) for minute in range(current - SUBMISSION_WINDOW + 1, current + 1))
+
+            claim_bins = [0] * CLAIM_BINS
+            for minute in range(current - CLAIM_WINDOW + 1, current + 1):
+                for i, count in enumerate(self._claimed.get(minute, ())):
+                    claim_bins[i] += count
+
+            stale_before = (now - stale_minutes * 60, math.inf)
+            stale_critical = bisect_left(self._open_critical, stale_before)
+            oldest_critical = self._open_critical[0][0] if self._open_critical else None
+
+        return {
+            "by_status": by_status,
+            "total": sum(by_status.values()),
+            "open_by_category": open_by_category,
+            "open_by_urgency": open_by_urgency,
+            "open_critical": open_by_urgency["critical"],
+            "submissions_per_minute": submitted / SUBMISSION_WINDOW,
+            "claims_last_hour": sum(claim_bins),
+            "median_minutes_to_claim": _median_minutes(claim_bins),
+            "stale_critical": stale_critical,
+            "oldest_critical_minutes": (now - oldest_critical) / 60 if oldest_critical is not None else None,
+        }
+
+
+def _median_minutes(bins):
+    """Median time-to-claim from the histogram, as the upper edge of the median bin (minutes)."""
+    total = sum(bins)
+    if not total:
+        return None
+    seen = 0
+    for i, count in enumerate(bins):
+        seen += count
+        if seen * 2 >= total:
+            return float(2 ** i)
+    return float(2 ** (CLAIM_BINS - 1))
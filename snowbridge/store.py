@@ -0,0 +1,745 @@
+"""SQLite-backed job store shared by every SnowBridge session."""
+
+import hashlib
+import json
+import marshal
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+
+from snowbridge.changes import CHANGE_CLAIM, CHANGE_DELETE, CHANGE_INSERT, CHANGE_UPDATE, ChangeFeed
+from snowbridge.feed import PriorityIndex
+from snowbridge.metrics import METRICS
+from snowbridge.text import normalize
+
+# Statuses a job moves through
+STATUS_OPEN = "OPEN"
+STATUS_CLAIMED = "CLAIMED"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    location TEXT NOT NULL,
+    request_text TEXT NOT NULL,
+    ai_analysis TEXT NOT NULL,
+    urgency_score INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_urgency ON jobs (status, urgency_score DESC, id);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    job_id INTEGER,
+    actor TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_job ON events (job_id, seq);
+"""
+
+# Event log entries, one per mutation
+EVENT_CREATE = "create"
+EVENT_TRIAGE = "triage"
+EVENT_CLAIM = "claim"
+EVENT_RESET = "reset"
+
+# Changes between automatic snapshots of the in-memory jobs
+SNAPSHOT_EVERY = 10000
+# Snapshot file format; bump when the job dict changes shape
+SNAPSHOT_FORMAT = 2
+
+# Columns added after the first release: (name, type)
+MIGRATIONS = [
+    ("claimed_by", "TEXT"),
+    ("claimed_at", "REAL"),
+    ("lat", "REAL"),
+    ("lon", "REAL"),
+    ("version", "INTEGER NOT NULL DEFAULT 1"),
+    ("seq", "INTEGER NOT NULL DEFAULT 0"),
+    ("similar_to", "INTEGER"),
+    ("dedup_key", "BLOB"),
+]
+
+# Indexes on migrated columns, created once the columns exist
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_jobs_seq ON jobs (seq);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedup_key ON jobs (dedup_key);
+"""
+
+JOB_COLUMNS = (
+    "id, title, location, request_text, ai_analysis, status, created_at, claimed_by, claimed_at, lat, lon, version, seq, "
+    "similar_to"
+)
+
+# Rows per statement when backfilling or looking up dedup keys
+DEDUP_KEY_CHUNK = 500
+
+
+def dedup_key(job):
+    """Same location and same request text, ignoring case and spacing."""
+    key = normalize(job["location"]) + "\n" + normalize(job["request_text"])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class ClaimResult(str, Enum):
+    """Outcome of `JobStore.claim()`."""
+    CLAIMED = "CLAIMED"
+    ALREADY_CLAIMED = "ALREADY_CLAIMED"
+    NOT_FOUND = "NOT_FOUND"
+
+
+def _row_to_job(row):
+    """Converts a `jobs` row back into the job dict used by the views."""
+    (job_id, title, location, request_text, ai_analysis, status, created_at, claimed_by, claimed_at, lat, lon,
+     version, seq, similar_to) = row
+    return {
+        "id": job_id,
+        "title": title,
+        "location": location,
+        "request_text": request_text,
+        "ai_analysis": json.loads(ai_analysis),
+        "status": status,
+        "created_at": created_at,
+        "claimed_by": claimed_by,
+        "claimed_at": claimed_at,
+        "lat": lat,
+        "lon": lon,
+        "version": version,
+        "seq": seq,
+        "similar_to": similar_to,
+    }
+
+
+def _job_record(job):
+    """A job's fields as logged in its "create" event."""
+    return {key: value for key, value in job.items() if key not in ("id", "version", "seq")}
+
+
+def _row_to_event(row):
+    seq, at, kind, job_id, actor, data = row
+    return {"seq": seq, "at": at, "kind": kind, "job_id": job_id, "actor": actor, "data": json.loads(data)}
+
+
+def _copy_job(job):
+    """Copies a job so callers can't mutate the store's index."""
+    return {**job, "ai_analysis": dict(job["ai_analysis"])}
+
+
+class JobTables:
+    """
+    The jobs, events and counters tables on one SQLite connection (WAL mode):
+    schema, migrations, and the write steps every writer shares (sequence
+    numbers, id allocation, logged inserts). JobStore adds the in-memory
+    jobs and indexes on top; JobWriter uses them as they are.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.executescript(POST_MIGRATION_SCHEMA)
+
+    def _migrate(self):
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, column_type in MIGRATIONS:
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+        if "dedup_key" not in existing:
+            self._backfill_dedup_keys()
+
+    def _backfill_dedup_keys(self):
+        """Keys for rows written before the dedup_key column existed."""
+        with self._transaction():
+            while True:
+                rows = self._conn.execute(
+                    "SELECT id, location, request_text FROM jobs WHERE dedup_key IS NULL LIMIT ?", (DEDUP_KEY_CHUNK,)
+                ).fetchall()
+                if not rows:
+                    break
+                self._conn.executemany(
+                    "UPDATE jobs SET dedup_key = ? WHERE id = ?",
+                    [(dedup_key({"location": location, "request_text": text}), job_id) for job_id, location, text in rows],
+                )
+
+    def existing_keys(self, keys):
+        """The subset of `keys` (from dedup_key) some stored job already has."""
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), DEDUP_KEY_CHUNK):
+            chunk = keys[start:start + DEDUP_KEY_CHUNK]
+            found.update(
+                row[0]
+                for row in self._conn.execute(
+                    f"SELECT dedup_key FROM jobs WHERE dedup_key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+            )
+        return found
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; BEGIN IMMEDIATE also serializes other processes."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _counter(self, name):
+        row = self._conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_counter(self, name, value):
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (name, value),
+        )
+
+    def _next_seqs(self, count):
+        """Reserves `count` sequence numbers inside a write transaction; returns the first."""
+        first = self._counter("change_seq") + 1
+        self._set_counter("change_seq", first + count - 1)
+        return first
+
+    def _allocate_id(self):
+        """
+        Hands out job ids from a persisted counter, so ids only ever go up,
+        even across resets and restarts: an id (and its event history)
+        always belongs to one job. Any "id" on a job passed in is ignored.
+        """
+        row = self._conn.execute("SELECT value FROM counters WHERE name = 'job_id'").fetchone()
+        if row is None:
+            # First run, or a database created before the counter existed
+            row = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()
+        last_id = row[0]
+        job_id = last_id + 1
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES ('job_id', ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (job_id,),
+        )
+        return job_id
+
+    def _select_job(self, job_id):
+        """The job as its row stands now, or None. Inside a write, that includes other processes' changes."""
+        row = self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def _log(self, seq, kind, job_id=None, actor=None, data=None):
+        self._conn.execute(
+            "INSERT INTO events (seq, at, kind, job_id, actor, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (seq, time.time(), kind, job_id, actor, json.dumps(data or {})),
+        )
+
+    def _insert_row(self, job, seq, actor=None):
+        analysis = dict(job["ai_analysis"])
+        stored = {
+            "id": self._allocate_id(),
+            "title": job.get("title", ""),
+            "location": job["location"],
+            "request_text": job["request_text"],
+            "ai_analysis": analysis,
+            "status": job.get("status", STATUS_OPEN),
+            "created_at": job.get("created_at") or time.time(),
+            "claimed_by": job.get("claimed_by"),
+            "claimed_at": job.get("claimed_at"),
+            "lat": job.get("lat"),
+            "lon": job.get("lon"),
+            "version": 1,
+            "seq": seq,
+            "similar_to": job.get("similar_to"),
+        }
+        self._log(seq, EVENT_CREATE, stored["id"], actor=actor, data=_job_record(stored))
+        self._conn.execute(
+            "INSERT INTO jobs (id, title, location, request_text, ai_analysis, urgency_score, status, "
+            "created_at, claimed_by, claimed_at, lat, lon, version, seq, similar_to, dedup_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                stored["id"],
+                stored["title"],
+                stored["location"],
+                stored["request_text"],
+                json.dumps(analysis),
+                int(analysis["urgency_score"]),
+                stored["status"],
+                stored["created_at"],
+                stored["claimed_by"],
+                stored["claimed_at"],
+                stored["lat"],
+                stored["lon"],
+                stored["version"],
+                stored["seq"],
+                stored["similar_to"],
+                dedup_key(stored),
+            ),
+        )
+        return stored
+
+
+class JobStore(JobTables):
+    """
+    Process-wide job store backed by SQLite in WAL mode.
+    One instance is shared by every session, so all reads and writes go through
+    a single connection guarded by a lock. Jobs are also kept in an id -> job
+    index so lookups and claims never scan.
+
+    In-memory indexes (anything with add/remove/clear taking job dicts) are
+    kept in step with every mutation under the same lock; `feed` is the
+    priority index the volunteer view reads from. Every change to a job
+    bumps its "version", so anything derived from a job (e.g. rendered
+    cards) can be cached on (id, version).
+
+    Every mutation also takes the next store-wide sequence number ("seq"),
+    saved on the row. `sync()` uses it to pick up inserts, claims and
+    re-scores made by other processes, and `changes` lists every change
+    this process has seen, for sessions that only want the delta.
+
+    Each mutation is also appended to the `events` table in the same
+    transaction (who did what, and when), which is the audit trail. The
+    jobs table is the compacted state of that log; a marshal snapshot of
+    it next to the database lets a restart load every job at once and only
+    replay the rows changed after the snapshot was taken.
+    """
+
+    def __init__(self, path="snowbridge.db"):
+        super().__init__(path)
+        self._lock = threading.Lock()
+        self.snapshot_path = path + ".snapshot"
+        self._store_id = self._ensure_store_id()
+        self._indexes = []
+        self.changes = ChangeFeed()
+        self._since_snapshot = 0
+        self._snapshot_thread = None
+        self._reload()
+        self.feed = PriorityIndex()
+        self.register_index(self.feed)
+
+    @property
+    def version(self):
+        """Latest change this process has seen; pass it to `changes.since()` later."""
+        return self.changes.version
+
+    def _ensure_store_id(self):
+        """Random id of this database, so a snapshot is never applied to a different one."""
+        with self._transaction():
+            store_id = self._counter("store_id")
+            if not store_id:
+                store_id = random.getrandbits(62) or 1
+                self._set_counter("store_id", store_id)
+        return store_id
+
+    def _read_snapshot(self, reset_seq, change_seq):
+        """(seq, jobs) from the snapshot file, or None if it's missing, foreign or from before a reset."""
+        try:
+            # One read + loads(); marshal.load() on the file object is several times slower
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if (
+            not isinstance(snapshot, dict)
+            or snapshot.get("format") != SNAPSHOT_FORMAT
+            or snapshot.get("store_id") != self._store_id
+            or not reset_seq <= snapshot["seq"] <= change_seq
+        ):
+            return None
+        return snapshot["seq"], snapshot["jobs"]
+
+    @METRICS.timed("store", op="load")
+    def _reload(self):
+        """
+        Reads every job again and rebuilds the indexes from them: the snapshot
+        plus the rows changed since it, or the whole table if there's no
+        usable snapshot.
+        """
+        self._conn.execute("BEGIN")
+        try:
+            change_seq = self._counter("change_seq")
+            snapshot = self._read_snapshot(self._counter("reset_seq"), change_seq)
+            seq, jobs = snapshot or (0, [])
+            if snapshot is None:
+                rows = self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs").fetchall()
+            else:
+                rows = self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE seq > ?", (seq,)).fetchall()
+        finally:
+            self._conn.execute("COMMIT")
+        self._jobs = {job["id"]: job for job in jobs}
+        for row in rows:
+            job = _row_to_job(row)
+            self._jobs[job["id"]] = job
+        self._synced_seq = change_seq
+        self._since_snapshot = len(rows)
+        for index in self._indexes:
+            index.clear()
+            self._index_load(index, self._jobs.values())
+        self.changes.reset()
+
+    def _index_load(self, index, jobs):
+        """Bulk-loads `jobs` into `index` (add_many() if it has one, else add() per job)."""
+        add_many = getattr(index, "add_many", None)
+        if add_many is not None:
+            add_many(jobs)
+        else:
+            for job in jobs:
+                index.add(job)
+
+    @METRICS.timed("store", op="snapshot")
+    def save_snapshot(self):
+        """
+        Writes every job to the snapshot file (atomically). Jobs are never
+        mutated in place, so only the list of them is taken under the lock.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+            seq = self._synced_seq
+            self._since_snapshot = 0
+        data = marshal.dumps({"format": SNAPSHOT_FORMAT, "store_id": self._store_id, "seq": seq, "jobs": jobs})
+        partial = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, self.snapshot_path)
+
+    def _maybe_snapshot(self):
+        """Starts a background snapshot once SNAPSHOT_EVERY changes have piled up. Call with the lock held."""
+        if self._since_snapshot < SNAPSHOT_EVERY:
+            return
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        self._since_snapshot = 0
+        self._snapshot_thread = threading.Thread(target=self.save_snapshot, daemon=True)
+        self._snapshot_thread.start()
+
+    def _record(self, job_id, kind):
+        self.changes.record(job_id, kind)
+        self._since_snapshot += 1
+
+    def register_index(self, index):
+        """
+        Loads every current job into `index` and keeps it updated from now on.
+        The bulk load runs without the store lock, so a big index can be
+        built while other sessions keep reading and writing; what changed
+        meanwhile is applied before the index goes live.
+        """
+        with self._lock:
+            jobs = dict(self._jobs)
+            version = self.changes.version
+        self._index_load(index, jobs.values())
+        with self._lock:
+            changed = self.changes.since(version)
+            if changed is None:
+                # Reset, reloaded or too far behind: load it again, this time under the lock
+                index.clear()
+                self._index_load(index, self._jobs.values())
+            else:
+                for job_id in dict.fromkeys(change.job_id for change in changed):
+                    if job_id in jobs:
+                        index.remove(jobs[job_id])
+                    if job_id in self._jobs:
+                        index.add(self._jobs[job_id])
+            self._indexes.append(index)
+
+    def _index_add(self, job):
+        for index in self._indexes:
+            index.add(job)
+
+    def _index_replace(self, old, new):
+        for index in self._indexes:
+            index.remove(old)
+            index.add(new)
+
+    def _forget(self, job):
+        """Drops a cached job whose row is gone (another process reset the store)."""
+        del self._jobs[job["id"]]
+        for index in self._indexes:
+            index.remove(job)
+        self._record(job["id"], CHANGE_DELETE)
+
+    def close(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        with self._lock:
+            self._conn.close()
+
+    def _committed(self, first, count):
+        """
+        Moves the sync watermark over seqs this process just committed, when
+        they follow it directly (nobody else wrote in between), so snapshots
+        and sync() don't read our own changes back. Call after the commit.
+        """
+        if first == self._synced_seq + 1:
+            self._synced_seq = first + count - 1
+
+    def insert(self, job, actor=None):
+        """Stores a new job and returns it as saved (including its assigned id)."""
+        return self.insert_many([job], actor=actor)[0]
+
+    @METRICS.timed("store", op="insert")
+    def insert_many(self, jobs, actor=None):
+        """Stores many new jobs in one transaction; returns them as saved. `actor` is logged as the source."""
+        with self._lock:
+            with self._transaction():
+                first = self._next_seqs(len(jobs))
+                stored = [self._insert_row(job, first + i, actor) for i, job in enumerate(jobs)]
+            self._committed(first, len(jobs))
+            for job in stored:
+                self._jobs[job["id"]] = job
+                self._index_add(job)
+                self._record(job["id"], CHANGE_INSERT)
+            self._maybe_snapshot()
+        return [_copy_job(job) for job in stored]
+
+    @METRICS.timed("store", op="sync")
+    def sync(self):
+        """
+        Picks up changes other processes (bulk ingestion, other app servers)
+        made since the last sync: one indexed range query on seq, or a full
+        reload if one of them reset the store. Returns how many jobs changed.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                reset = self._counter("reset_seq") > self._synced_seq
+                rows = [] if reset else self._conn.execute(
+                    f"SELECT {JOB_COLUMNS} FROM jobs WHERE seq > ? ORDER BY seq", (self._synced_seq,)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+            if reset:
+                self._reload()
+                self._maybe_snapshot()
+                return len(self._jobs)
+
+            changed = 0
+            for row in rows:
+                job = _row_to_job(row)
+                self._synced_seq = job["seq"]
+                old = self._jobs.get(job["id"])
+                if old is not None and old["seq"] >= job["seq"]:
+                    continue  # our own change
+                self._jobs[job["id"]] = job
+                if old is None:
+                    self._index_add(job)
+                    self._record(job["id"], CHANGE_INSERT)
+                else:
+                    self._index_replace(old, job)
+                    self._record(job["id"], CHANGE_CLAIM if old["status"] != job["status"] else CHANGE_UPDATE)
+                changed += 1
+            self._maybe_snapshot()
+        return changed
+
+    def get(self, job_id):
+        """Returns the job with this id, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return _copy_job(job) if job else None
+
+    def list_open(self, limit=None, offset=0):
+        """One page of open jobs in feed order (highest urgency, then oldest, first)."""
+        with self._lock:
+            ids = self.feed.page(STATUS_OPEN, offset, limit)
+            return [_copy_job(self._jobs[job_id]) for job_id in ids]
+
+    def count_open(self):
+        with self._lock:
+            return self.feed.count(STATUS_OPEN)
+
+    def categories(self):
+        """Categories with at least one job, sorted. Scans every job; SearchIndex keeps the same list indexed."""
+        with self._lock:
+            return sorted({job["ai_analysis"].get("category") for job in self._jobs.values()} - {None})
+
+    def open_job_with_key(self, key, since):
+        """Id of the newest open job created since `since` whose dedup_key is `key`, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status = ? AND created_at >= ? ORDER BY id DESC LIMIT 1",
+                (key, STATUS_OPEN, since),
+            ).fetchone()
+        return row[0] if row else None
+
+    @METRICS.timed("store", op="claim")
+    def claim(self, job_id, claimant="", claimed_at=None):
+        """
+        Compare-and-set OPEN -> CLAIMED, recording who claimed it and when.
+        Only the first caller wins; everyone after gets ALREADY_CLAIMED.
+        A job we haven't synced yet (another process inserted it) is still
+        claimed through the database and cached from its row.
+        """
+        claimed_at = claimed_at or time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] != STATUS_OPEN:
+                return ClaimResult.ALREADY_CLAIMED
+            # The status guard also covers other processes writing the same file
+            with self._transaction():
+                seq = self._next_seqs(1)
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, claimed_by = ?, claimed_at = ?, version = version + 1, seq = ? "
+                    "WHERE id = ? AND status = ?",
+                    (STATUS_CLAIMED, claimant, claimed_at, seq, job_id, STATUS_OPEN),
+                )
+                if cursor.rowcount == 1:
+                    self._log(seq, EVENT_CLAIM, job_id, actor=claimant, data={"claimed_at": claimed_at})
+                # Cache the row, not our copy: other processes may have changed it since our last sync
+                current = self._select_job(job_id)
+            self._committed(seq, 1)
+            if current is None:
+                if job is not None:
+                    self._forget(job)
+                return ClaimResult.NOT_FOUND
+            self._jobs[job_id] = current
+            if job is None:
+                self._index_add(current)
+                self._record(job_id, CHANGE_INSERT)
+            else:
+                self._index_replace(job, current)
+                self._record(job_id, CHANGE_CLAIM)
+            if cursor.rowcount != 1:
+                return ClaimResult.ALREADY_CLAIMED
+            self._maybe_snapshot()
+        return ClaimResult.CLAIMED
+
+    def update_analysis(self, job_id, analysis, actor=None):
+        """Replaces a job's triage result (e.g. the AI upgrade of a keyword score)."""
+        updated = self.update_analyses({job_id: analysis}, actor=actor)
+        return updated[0] if updated else None
+
+    @METRICS.timed("store", op="update")
+    def update_analyses(self, analyses, actor=None):
+        """
+        Replaces the triage result of many jobs ({id: analysis}) in one
+        transaction. `actor` is logged as who did it (e.g. "ai", "rescore").
+        """
+        with self._lock:
+            changes = []
+            gone = []
+            with self._transaction():
+                first = seq = self._next_seqs(len(analyses))
+                for job_id, analysis in analyses.items():
+                    job = self._jobs.get(job_id)
+                    # Start from the row, not our copy: other processes may have claimed it since our last sync
+                    current = self._select_job(job_id) if job is not None else None
+                    if current is None:
+                        if job is not None:
+                            gone.append(job)
+                        continue
+                    analysis = dict(analysis)
+                    self._conn.execute(
+                        "UPDATE jobs SET ai_analysis = ?, urgency_score = ?, version = version + 1, seq = ? WHERE id = ?",
+                        (json.dumps(analysis), int(analysis["urgency_score"]), seq, job_id),
+                    )
+                    self._log(seq, EVENT_TRIAGE, job_id, actor=actor, data={
+                        "urgency_score": int(analysis["urgency_score"]),
+                        "previous_urgency_score": int(current["ai_analysis"]["urgency_score"]),
+                        "source": analysis.get("source"),
+                    })
+                    changes.append((job, {**current, "ai_analysis": analysis, "version": current["version"] + 1, "seq": seq}))
+                    seq += 1
+            self._committed(first, len(analyses))
+            for job in gone:
+                self._forget(job)
+            for job, updated in changes:
+                self._jobs[job["id"]] = updated
+                self._index_replace(job, updated)
+                self._record(job["id"], CHANGE_CLAIM if job["status"] != updated["status"] else CHANGE_UPDATE)
+            self._maybe_snapshot()
+        return [_copy_job(updated) for _, updated in changes]
+
+    def list_all(self):
+        """Every job, in id order."""
+        with self._lock:
+            return [_copy_job(self._jobs[job_id]) for job_id in sorted(self._jobs)]
+
+    def count_by_status(self):
+        """Number of jobs per status, e.g. {"OPEN": 4, "CLAIMED": 1}."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    @METRICS.timed("store", op="reset")
+    def reset(self, jobs=(), actor=None):
+        """
+        Deletes every job and loads `jobs` in a single transaction. The reset
+        itself is logged (with `actor`); earlier events stay in the log.
+        """
+        with self._lock:
+            with self._transaction():
+                self._conn.execute("DELETE FROM jobs")
+                # Other processes see reset_seq move past their last sync and reload
+                first = self._next_seqs(len(jobs) + 1)
+                self._set_counter("reset_seq", first)
+                self._log(first, EVENT_RESET, actor=actor, data={"deleted": len(self._jobs), "loaded": len(jobs)})
+                stored = [self._insert_row(job, first + 1 + i, actor) for i, job in enumerate(jobs)]
+            self._jobs = {job["id"]: job for job in stored}
+            self._synced_seq = first + len(stored)
+            for index in self._indexes:
+                index.clear()
+                self._index_load(index, self._jobs.values())
+            self.changes.reset()
+
+    def history(self, job_id):
+        """Every logged event for one job, oldest first: the audit trail of who did what and when."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, at, kind, job_id, actor, data FROM events WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [_row_to_event(row) for row in rows]
+
+    def recent_events(self, limit=50):
+        """The latest `limit` events across all jobs, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, at, kind, job_id, actor, data FROM events ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_row_to_event(row) for row in rows]
+
+
+class JobWriter(JobTables):
+    """
+    Write-only access to the job store for bulk loads. Nothing is cached or
+    indexed in memory, so memory stays flat however many jobs the database
+    holds; running JobStores pick the new rows up through sync().
+    """
+
+    def __init__(self, path="snowbridge.db"):
+        super().__init__(path)
+
+    def insert_many(self, jobs, actor=None):
+        """
+        Stores the jobs whose dedup_key isn't in the database yet, in one
+        transaction, and returns how many were written. The check runs inside
+        the write lock, so concurrent writers can't both add the same job.
+        """
+        with self._transaction():
+            keys = [dedup_key(job) for job in jobs]
+            existing = self.existing_keys(keys)
+            fresh = []
+            for job, key in zip(jobs, keys):
+                if key not in existing:
+                    existing.add(key)
+                    fresh.append(job)
+            if fresh:
+                first = self._next_seqs(len(fresh))
+                for offset, job in enumerate(fresh):
+                    self._insert_row(job, first + offset, actor=actor)
+        return len(fresh)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,29 @@
+"""
+Text normalization shared by the triage cache, duplicate detection and
+geocoding. Plain string work only, so importing it stays cheap.
+"""
+
+import re
+
+STREET_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "av": "ave", "road": "rd", "lane": "ln", "drive": "dr",
+    "court": "ct", "place": "pl", "boulevard": "blvd", "terrace": "ter", "circle": "cir",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "apartment": "apt", "unit": "apt", "suite": "apt",
+}
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form of a form field."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def normalize_location(location):
+    """
+    Address key: the part before the first comma (street address, not town),
+    lowercased, punctuation dropped and street words abbreviated, so
+    "123 Maple Street, Boston" and "123 maple st." give the same key.
+    """
+    street = (location or "").split(",")[0].lower().replace("#", " apt ")
+    words = re.findall(r"\w+", street)
+    return " ".join(STREET_ABBREVIATIONS.get(word, word) for word in words)
@@ -0,0 +1,299 @@
+"""
+Triage logic: turns a free-text request into an urgency analysis.
+AI triage goes through the shared LLMClient; keyword triage is the
+instant, offline fallback.
+"""
+
+import json
+import logging
+import time
+
+from snowbridge.keywords import MEDICAL_TERMS
+from snowbridge.llm import LLMUnavailable
+from snowbridge.metrics import METRICS
+from snowbridge.scoring import DEFAULT_WEIGHTS, score_texts
+from snowbridge.triage_cache import prompt_version
+
+logger = logging.getLogger(__name__)
+
+TRIAGE_MODEL = "gpt-3.5-turbo"
+
+SYSTEM_PROMPT = """You are an Emergency Dispatcher for a snow removal crisis response platform.
+Analyze the user's request and determine urgency. Look for keywords like: dialysis, chemo, oxygen, medicine,
+stuck, emergency exit, doctor appointment, medical, mobility issues, wheelchair, etc.
+
+Return ONLY valid JSON in this exact format:
+{
+  "urgency_score": [Integer 1-10],  // 10 = Medical Emergency, 1 = Low priority
+  "category": [String: "Medical", "Mobility", "Access", "General"],
+  "summary": [String: Max 5 words],
+  "is_critical": [Boolean]
+}"""
+
+BATCH_SYSTEM_PROMPT = """You are an Emergency Dispatcher for a snow removal crisis response platform.
+You will receive a JSON array of requests, each with an "id", "title", "location" and "request".
+Analyze each request's urgency independently. Look for keywords like: dialysis, chemo, oxygen, medicine,
+stuck, emergency exit, doctor appointment, medical, mobility issues, wheelchair, etc.
+
+Return ONLY a valid JSON array with one object per request, in this exact format:
+[
+  {
+    "id": [String: the request's id],
+    "urgency_score": [Integer 1-10],  // 10 = Medical Emergency, 1 = Low priority
+    "category": [String: "Medical", "Mobility", "Access", "General"],
+    "summary": [String: Max 5 words],
+    "is_critical": [Boolean]
+  }
+]"""
+
+# Cached AI results are only reused while the prompts are unchanged
+PROMPT_VERSION = prompt_version(SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT)
+
+CATEGORIES = ("Medical", "Mobility", "Access", "General")
+
+# Requests packed into one model call, and the reply tokens allowed per request
+BATCH_SIZE = 20
+TOKENS_PER_ITEM = 60
+
+# Which step produced an analysis, stored as ai_analysis["source"]
+SOURCE_AI = "ai"
+SOURCE_KEYWORD = "keyword"
+
+
+def parse_analysis(result_text):
+    """Extracts the JSON analysis from a model reply (handles markdown code blocks)."""
+    result_text = result_text.strip()
+    if "```" in result_text:
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+    return json.loads(result_text)
+
+
+def validate_analysis(data):
+    """Checks a model analysis against the schema. Returns a clean copy or raises ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError(f"analysis is not an object: {data!r}")
+    score = data.get("urgency_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or score != int(score) or not 1 <= score <= 10:
+        raise ValueError(f"urgency_score must be an integer 1-10, got {score!r}")
+    if data.get("category") not in CATEGORIES:
+        raise ValueError(f"unknown category {data.get('category')!r}")
+    if not isinstance(data.get("summary"), str):
+        raise ValueError("summary must be a string")
+    if not isinstance(data.get("is_critical"), bool):
+        raise ValueError("is_critical must be a boolean")
+    return {
+        "urgency_score": int(score),
+        "category": data["category"],
+        "summary": data["summary"],
+        "is_critical": data["is_critical"],
+        "source": SOURCE_AI
+    }
+
+
+def ai_triage(llm, request_text, title="", location="", cache=None):
+    """
+    Scores a request with the model, reusing a cached result when the same
+    request was seen before. Raises if the API call or parsing fails.
+    """
+    if cache is not None:
+        cached = cache.get(title, location, request_text, TRIAGE_MODEL)
+        if cached is not None:
+            cached.setdefault("source", SOURCE_AI)
+            return cached
+
+    user_prompt = f"Title: {title}\nLocation: {location}\nRequest: {request_text}\n\nAnalyze urgency and return JSON only."
+
+    result_text = llm.complete(
+        model=TRIAGE_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.3,
+        max_tokens=150
+    )
+
+    with METRICS.span("triage_parse"):
+        analysis = validate_analysis(parse_analysis(result_text))
+    if cache is not None:
+        cache.put(title, location, request_text, TRIAGE_MODEL, analysis)
+    return analysis
+
+
+def ai_triage_batch(llm, requests, cache=None):
+    """
+    Scores many requests with a single model call. Returns {position: analysis}
+    for every request that got a valid answer (cached or fresh); positions
+    left out were missing or malformed in the reply, or the call failed, and
+    need a fallback.
+    """
+    results = {}
+    pending = []
+    for i, req in enumerate(requests):
+        if cache is not None:
+            cached = cache.get(req.get("title", ""), req.get("location", ""), req["request_text"], TRIAGE_MODEL)
+            if cached is not None:
+                cached.setdefault("source", SOURCE_AI)
+                results[i] = cached
+                continue
+        pending.append(i)
+    if not pending:
+        return results
+
+    # Replies are matched back by the request's position in this call, which
+    # is unique even when some requests have a job id and others don't
+    positions = {str(i): i for i in pending}
+    items = [
+        {
+            "id": key,
+            "title": requests[i].get("title", ""),
+            "location": requests[i].get("location", ""),
+            "request": requests[i]["request_text"],
+        }
+        for key, i in positions.items()
+    ]
+
+    try:
+        result_text = llm.complete(
+            items=len(items),
+            model=TRIAGE_MODEL,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(items)}
+            ],
+            temperature=0.3,
+            max_tokens=TOKENS_PER_ITEM * len(items) + 50
+        )
+        with METRICS.span("triage_parse", batch=True):
+            answers = parse_analysis(result_text)
+        if not isinstance(answers, list):
+            raise ValueError("batch reply is not a JSON array")
+    except LLMUnavailable:
+        return results
+    except Exception as e:
+        logger.warning("Batch AI triage failed (%s); using keyword fallback", e)
+        return results
+
+    for answer in answers:
+        i = positions.get(str(answer.get("id"))) if isinstance(answer, dict) else None
+        if i is None or i in results:
+            continue
+        try:
+            analysis = validate_analysis(answer)
+        except ValueError as e:
+            logger.info("Dropping malformed batch answer for %s: %s", answer.get("id"), e)
+            continue
+        results[i] = analysis
+        if cache is not None:
+            req = requests[i]
+            cache.put(req.get("title", ""), req.get("location", ""), req["request_text"], TRIAGE_MODEL, analysis)
+    return results
+
+
+def _keyword_analysis(urgency_score, hits, request_text, title):
+    tiers = {tier for _, tier in hits}
+
+    category = "General"
+    if "critical" in tiers:
+        category = "Medical"
+    elif "high" in tiers:
+        category = "Medical" if any(term in MEDICAL_TERMS for term, _ in hits) else "Mobility"
+    elif "medium" in tiers:
+        category = "Access"
+
+    summary_words = title.split()[:5] if title else request_text.split()[:5]
+    summary = " ".join(summary_words)
+
+    return {
+        "urgency_score": int(urgency_score),
+        "category": category,
+        "summary": summary,
+        "is_critical": "critical" in tiers,
+        "keywords": list(dict.fromkeys(term for term, _ in hits)),
+        "source": SOURCE_KEYWORD
+    }
+
+
+def keyword_triage_batch(requests, weights=DEFAULT_WEIGHTS):
+    """
+    Keyword-model triage for many requests at once (dicts with "request_text"
+    and optionally "title"). Returns one analysis per request, in the same
+    schema as `triage_request()`. Scores are deterministic.
+    """
+    titles = [req.get("title", "") for req in requests]
+    texts = [title + " " + req["request_text"] for title, req in zip(titles, requests)]
+    scores, hit_lists = score_texts(texts, weights)
+    return [
+        _keyword_analysis(score, hits, req["request_text"], title)
+        for score, hits, req, title in zip(scores, hit_lists, requests, titles)
+    ]
+
+
+def keyword_triage(request_text, title=""):
+    """
+    Keyword-based urgency scoring. Instant and works without an API key.
+    The matched keywords are returned under "keywords" so volunteers can
+    see why a request was rated the way it was.
+    """
+    return keyword_triage_batch([{"request_text": request_text, "title": title}])[0]
+
+
+def rescore_backlog(store, weights=DEFAULT_WEIGHTS):
+    """Re-scores every keyword-scored job with `weights`; returns how many changed."""
+    jobs = [job for job in store.list_all() if job["ai_analysis"].get("source") == SOURCE_KEYWORD]
+    analyses = keyword_triage_batch(jobs, weights)
+    changed = {
+        job["id"]: analysis
+        for job, analysis in zip(jobs, analyses)
+        if analysis["urgency_score"] != job["ai_analysis"]["urgency_score"]
+    }
+    store.update_analyses(changed, actor="rescore")
+    return len(changed)
+
+
+def triage_request(request_text, title="", location="", llm=None, cache=None):
+    """
+    Analyzes natural language request and returns structured JSON with urgency score.
+    Uses the model if `llm` is given, otherwise (or if the call fails) falls back
+    to keyword-based logic.
+    """
+    started = time.perf_counter()
+    path = "keyword"
+    if llm is not None:
+        try:
+            analysis = ai_triage(llm, request_text, title, location, cache=cache)
+            METRICS.observe("triage", time.perf_counter() - started, path="ai")
+            return analysis
+        except LLMUnavailable:
+            # Breaker is open; the sidebar already shows that AI triage is degraded
+            llm.note_fallback()
+        except Exception as e:
+            logger.warning("AI triage failed (%s); using keyword fallback", e)
+            llm.note_fallback()
+        path = "fallback"
+    analysis = keyword_triage(request_text, title)
+    METRICS.observe("triage", time.perf_counter() - started, path=path)
+    return analysis
+
+
+@METRICS.timed("triage_batch")
+def triage_batch(requests, llm=None, cache=None, weights=DEFAULT_WEIGHTS, batch_size=BATCH_SIZE):
+    """
+    Batch version of `triage_request()`: one analysis per request, in order.
+    With `llm`, requests are sent `batch_size` at a time in a single prompt;
+    any request the model skipped or answered badly gets a keyword score.
+    """
+    results = {}
+    if llm is not None:
+        for start in range(0, len(requests), batch_size):
+            found = ai_triage_batch(llm, requests[start:start + batch_size], cache=cache)
+            results.update((start + i, analysis) for i, analysis in found.items())
+
+    missing = [i for i in range(len(requests)) if i not in results]
+    if llm is not None and missing:
+        llm.note_fallback(len(missing))
+    fallbacks = keyword_triage_batch([requests[i] for i in missing], weights) if missing else []
+    results.update(zip(missing, fallbacks))
+    return [results[i] for i in range(len(requests))]
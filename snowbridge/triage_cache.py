@@ -0,0 +1,137 @@
+"""Cache of AI triage results, so resubmitted requests don't pay for another LLM call."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from snowbridge.text import normalize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage_cache (
+    key TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_triage_cache_created ON triage_cache (created_at);
+"""
+
+# Writes between sweeps of expired rows out of the SQLite table
+PRUNE_EVERY = 500
+
+
+def prompt_version(system_prompt):
+    """Short fingerprint of the system prompt; changes whenever the prompt is edited."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(title, location, request_text, model, version):
+    fields = [normalize(title), normalize(location), normalize(request_text), model, version]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
+
+class TriageCache:
+    """
+    Two-tier cache: an in-memory LRU in front of a SQLite table.
+    Entries expire after `ttl_seconds`; expired rows are deleted on startup
+    and every PRUNE_EVERY writes, so the table doesn't grow without bound.
+    Entries written under a different prompt version are purged on startup,
+    and `invalidate()` drops the rest.
+    """
+
+    def __init__(self, path, prompt_version, ttl_seconds=24 * 3600, max_memory_entries=1024):
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._puts_since_prune = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        # The prompt changed since these were written, so they may be scored differently now
+        self._conn.execute("DELETE FROM triage_cache WHERE prompt_version != ?", (prompt_version,))
+        self._prune(time.time())
+
+    def _prune(self, now):
+        """Deletes expired rows (one indexed range delete). Call with the lock held, or from __init__."""
+        self._conn.execute("DELETE FROM triage_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._puts_since_prune = 0
+
+    def _expired(self, created_at, now):
+        return now - created_at > self.ttl_seconds
+
+    def _remember(self, key, analysis, created_at):
+        self._memory[key] = (analysis, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, title, location, request_text, model):
+        """Cached analysis for this request, or None."""
+        key = cache_key(title, location, request_text, model, self.prompt_version)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                analysis, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return dict(analysis)
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT analysis, created_at FROM triage_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                analysis, created_at = json.loads(row[0]), row[1]
+                if not self._expired(created_at, now):
+                    self._remember(key, analysis, created_at)
+                    self.hits += 1
+                    return dict(analysis)
+                self._conn.execute("DELETE FROM triage_cache WHERE key = ?", (key,))
+
+            self.misses += 1
+            return None
+
+    def put(self, title, location, request_text, model, analysis):
+        key = cache_key(title, location, request_text, model, self.prompt_version)
+        now = time.time()
+        with self._lock:
+            self._remember(key, dict(analysis), now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO triage_cache (key, analysis, model, prompt_version, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(analysis), model, self.prompt_version, now),
+            )
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= PRUNE_EVERY:
+                self._prune(now)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def invalidate(self):
+        """Drops every cached result, e.g. after retuning the prompt or the model."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM triage_cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
@@ -0,0 +1,98 @@
+"""Background AI triage, so submitting a request never waits on the model."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from snowbridge.triage import BATCH_SIZE, SOURCE_KEYWORD, triage_batch
+
+logger = logging.getLogger(__name__)
+
+
+class TriageWorker:
+    """
+    Worker threads that upgrade keyword-scored jobs to an AI analysis.
+    Jobs are stored with their keyword score first, so they reach the
+    volunteer feed immediately. Each thread takes up to `batch_size` queued
+    jobs (waiting at most `max_wait` seconds for a batch to fill), scores
+    them with one model call and writes the upgrades in one transaction.
+    """
+
+    def __init__(self, store, llm, cache=None, max_workers=4, batch_size=BATCH_SIZE, max_wait=0.2):
+        self.store = store
+        self.llm = llm
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"triage-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job):
+        """Queues `job` for AI triage and returns a Future of the updated job (or None)."""
+        future = Future()
+        with self._lock:
+            self.pending += 1
+        self._queue.put((job, future))
+        return future
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutting down: finish this batch, and let the next loop see the sentinel
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run(batch)
+
+    def _run(self, batch):
+        jobs = [job for job, _ in batch]
+        updated = {}
+        try:
+            analyses = triage_batch(jobs, llm=self.llm, cache=self.cache, batch_size=self.batch_size)
+            upgrades = {}
+            for job, analysis in zip(jobs, analyses):
+                if analysis["source"] == SOURCE_KEYWORD:
+                    # AI unavailable for this one; the keyword score it was stored with stands
+                    continue
+                # Keep the keyword hits so volunteers still see what flagged the request
+                analysis.setdefault("keywords", job["ai_analysis"].get("keywords", []))
+                upgrades[job["id"]] = analysis
+            updated = {job["id"]: job for job in self.store.update_analyses(upgrades, actor="ai")}
+        except Exception:
+            logger.exception("Background triage failed for jobs %s", [job["id"] for job in jobs])
+        finally:
+            with self._lock:
+                self.pending -= len(batch)
+            for job, future in batch:
+                future.set_result(updated.get(job["id"]))
+
+    def shutdown(self, wait=True):
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
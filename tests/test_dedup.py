@@ -0,0 +1,50 @@
+"""Duplicate detection on submit, and the index following deletes."""
+
+import threading
+
+from snowbridge.service import SnowBridgeService
+from snowbridge.store import ClaimResult, JobStore
+
+REQUEST = ("Shovel", "12 Oak St", "Driveway buried under two feet of snow, I can't get my car out for work")
+
+
+def test_concurrent_identical_submits_store_one_job(tmp_path):
+    service = SnowBridgeService(str(tmp_path / "jobs.db"), seed=False)
+    start = threading.Barrier(8)
+    results = []
+
+    def submit():
+        start.wait()
+        results.append(service.submit(*REQUEST))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({job["id"] for job, _ in results}) == 1
+    assert sum(not duplicate for _, duplicate in results) == 1
+    service.store.close()
+
+
+def test_job_deleted_elsewhere_leaves_the_index(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    service = SnowBridgeService(path, seed=False)
+    job, _ = service.submit(*REQUEST)
+    other = JobStore(path)
+    other.reset()
+    other.close()
+
+    assert service.claim(job["id"], "bob") == ClaimResult.NOT_FOUND
+    assert service.duplicates.find(REQUEST[1], REQUEST[2]) is None
+    assert job["id"] not in service.duplicates._entries
+    service.store.close()
+
+
+def test_exact_repeat_is_caught_before_the_index_is_built(tmp_path):
+    service = SnowBridgeService(str(tmp_path / "jobs.db"), seed=False)
+    job, _ = service.submit(*REQUEST)
+    again, duplicate = service.submit(REQUEST[0], "12 OAK st", REQUEST[2].upper())
+    assert service.built("duplicates") is None
+    assert duplicate and again["id"] == job["id"]
+    service.store.close()
@@ -0,0 +1,34 @@
+"""Near-me feed with a gazetteer that mixes street rows and town centroids."""
+
+import subprocess
+import sys
+
+from snowbridge.cards import render_card
+from snowbridge.geo import Geocoder
+from snowbridge.service import SnowBridgeService
+
+GAZETTEER = """street,town,state,lat,lon
+,Boston,MA,42.3601,-71.0589
+Maple Street,Boston,MA,42.3500,-71.0700
+"""
+
+
+def test_centroid_matches_show_the_town_not_a_distance(tmp_path):
+    gazetteer = tmp_path / "gazetteer.csv"
+    gazetteer.write_text(GAZETTEER)
+    service = SnowBridgeService(str(tmp_path / "jobs.db"), geocoder=Geocoder(str(gazetteer)), seed=False)
+    on_street, _ = service.submit("Walk", "12 Maple St, Boston MA", "Front walk is icy")
+    in_town, _ = service.submit("Drive", "4 Unlisted Rd, Boston MA", "Driveway buried")
+
+    feed = service.feed_page(my_location="Boston, MA", radius_km=10)
+    assert feed["towns"] == {in_town["id"]: "Boston"}
+    assert set(feed["distances"]) == {on_street["id"]}
+    assert feed["distances"][on_street["id"]] > 0
+    assert "in Boston" in render_card(in_town, town="Boston")
+    assert "km away" not in render_card(in_town, town="Boston")
+    service.store.close()
+
+
+def test_geo_does_not_import_numpy():
+    code = "import sys, snowbridge.geo; print('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == "False"
@@ -0,0 +1,43 @@
+"""Bulk ingest: duplicates are found in the database, and running stores see the new jobs."""
+
+import json
+
+from snowbridge.ingest import ingest
+from snowbridge.store import JobStore, JobWriter
+
+ROWS = [
+    {"title": "Driveway", "location": "12 Oak St", "request_text": "Driveway buried, need to get to work"},
+    {"title": "Walk", "location": "9 Elm Ave", "request_text": "Front walk is icy"},
+    {"title": "Driveway again", "location": "12  OAK st", "request_text": "driveway buried, need to get to work"},
+]
+
+
+def write_rows(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return str(path)
+
+
+def test_reingesting_a_file_inserts_nothing(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    rows = write_rows(tmp_path / "rows.jsonl", ROWS)
+    writer = JobWriter(db)
+    try:
+        first = ingest(rows, writer)
+        second = ingest(rows, writer, batch_size=1)
+    finally:
+        writer.close()
+    assert (first["inserted"], first["duplicates"]) == (2, 1)
+    assert (second["inserted"], second["duplicates"]) == (0, 3)
+
+
+def test_running_store_syncs_ingested_jobs(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    store = JobStore(db)
+    writer = JobWriter(db)
+    try:
+        ingest(write_rows(tmp_path / "rows.jsonl", ROWS), writer)
+        store.sync()
+        assert sorted(job["location"] for job in store.list_all()) == ["12 Oak St", "9 Elm Ave"]
+    finally:
+        writer.close()
+        store.close()
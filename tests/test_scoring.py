@@ -0,0 +1,25 @@
+"""Keyword score bands: the top tier hit decides the band, extra lower-tier terms never cross it."""
+
+import itertools
+
+from snowbridge.scoring import MAX_TERMS, TIERS, feature_matrix, score_features
+from snowbridge.triage import keyword_triage
+
+BANDS = {"critical": (9, 10), "high": (6, 8), "medium": (4, 5), None: (3, 3)}
+
+
+def test_every_hit_combination_stays_in_its_band():
+    for counts in itertools.product(range(MAX_TERMS + 2), repeat=len(TIERS)):
+        hits = [(f"{tier}-{n}", tier) for tier, count in zip(TIERS, counts) for n in range(count)]
+        top = next((tier for tier, count in zip(TIERS, counts) if count), None)
+        score = int(score_features(feature_matrix([hits]))[0])
+        low, high = BANDS[top]
+        assert low <= score <= high, (counts, score)
+
+
+def test_many_high_and_medium_terms_stay_below_critical():
+    crowded = keyword_triage("mobility elderly disabled door driveway mailbox")
+    critical = keyword_triage("dialysis")
+    assert not crowded["is_critical"]
+    assert crowded["urgency_score"] == 8
+    assert critical["urgency_score"] > crowded["urgency_score"]
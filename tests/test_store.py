@@ -0,0 +1,50 @@
+"""JobStore writes seen from two stores (two API workers) on one database file."""
+
+import pytest
+
+from snowbridge.store import STATUS_CLAIMED, ClaimResult, JobStore
+
+
+def new_job(location):
+    return {"title": "Shovel", "location": location, "request_text": "Driveway buried", "ai_analysis": {"urgency_score": 5}}
+
+
+@pytest.fixture
+def stores(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first, second = JobStore(path), JobStore(path)
+    yield first, second
+    second.close()
+    first.close()
+
+
+def test_claim_job_inserted_by_another_store(stores):
+    first, second = stores
+    job_id = first.insert(new_job("12 Oak St"))["id"]
+
+    assert second.claim(job_id, "bob") == ClaimResult.CLAIMED
+    assert second.get(job_id)["status"] == STATUS_CLAIMED
+    assert job_id not in {job["id"] for job in second.list_open()}
+    assert second.claim(job_id, "carol") == ClaimResult.ALREADY_CLAIMED
+    first.sync()
+    assert first.get(job_id)["claimed_by"] == "bob"
+
+
+def test_claim_missing_job(stores):
+    first, second = stores
+    first.insert(new_job("12 Oak St"))
+    assert second.claim(999, "bob") == ClaimResult.NOT_FOUND
+    assert second.get(999) is None
+
+
+def test_reset_never_reuses_ids(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    old = store.insert({**new_job("12 Oak St"), "id": 1})
+    store.claim(old["id"], "bob")
+    store.reset([{**new_job("9 Elm Ave"), "id": 1}])
+
+    (new,) = store.list_all()
+    assert new["id"] != old["id"]
+    assert [event["kind"] for event in store.history(old["id"])] == ["create", "claim"]
+    assert [event["kind"] for event in store.history(new["id"])] == ["create"]
+    store.close()